@@ -0,0 +1,87 @@
+"""
+Measures what opening a database connection costs per request, by
+replaying requests with the connection handling of a real server:
+connections are closed or kept at the start and end of each request
+according to CONN_MAX_AGE, and health-checked when CONN_HEALTH_CHECKS
+is on (see drf_api/db.py).
+
+Against a remote Postgres each new connection pays the TCP and TLS
+handshakes and authentication, so the per-request mode is expected to
+be markedly slower there than against a local SQLite file.
+"""
+import statistics
+import time
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from .runner import make_client, percentile
+
+# (mode, CONN_MAX_AGE, CONN_HEALTH_CHECKS) under benchmark
+CONNECTION_MODES = [
+    ('per-request', 0, False),
+    ('persistent', 600, False),
+    ('health-checked', 600, True),
+]
+
+
+def connect_time(alias='default', repeat=10):
+    """
+    Returns the median time in milliseconds to open a new connection.
+    """
+    connection = connections[alias]
+    timings = []
+    for _ in range(repeat):
+        connection.close()
+        start = time.perf_counter()
+        connection.ensure_connection()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def measure_connection_cost(url='/comments/', repeat=50, alias='default'):
+    """
+    Requests url repeat times in each connection mode and returns a list
+    of dicts with the number of connections opened and the p50 and p95
+    latency in milliseconds. The connection settings are restored
+    afterwards.
+    """
+    connection = connections[alias]
+    original = {
+        key: connection.settings_dict.get(key)
+        for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')
+    }
+    created = []
+
+    def count_connection(sender, connection, **kwargs):
+        if connection.alias == alias:
+            created.append(connection)
+
+    client = make_client()
+    results = []
+    connection_created.connect(count_connection)
+    try:
+        for mode, max_age, health_checks in CONNECTION_MODES:
+            connection.close()
+            connection.settings_dict.update(
+                CONN_MAX_AGE=max_age, CONN_HEALTH_CHECKS=health_checks
+            )
+            created.clear()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                # The test client skips the handler's connection
+                # handling, so it is done here as for a real request
+                close_old_connections()
+                client.get(url)
+                close_old_connections()
+                timings.append((time.perf_counter() - start) * 1000)
+            results.append({
+                'mode': mode,
+                'connections': len(created),
+                'p50_ms': statistics.median(timings),
+                'p95_ms': percentile(timings, 95),
+            })
+    finally:
+        connection_created.disconnect(count_connection)
+        connection.close()
+        connection.settings_dict.update(original)
+    return results
@@ -0,0 +1,114 @@
+"""
+Runs EXPLAIN on the queries behind the hot list and filter paths and
+reports the ones the database answers with a sequential (full table)
+scan instead of an index.
+
+Plans are parsed for SQLite ('SCAN <table>' without an index) and
+PostgreSQL ('Seq Scan on <table>'). Other backends are explained but
+not analysed.
+"""
+import re
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from blocks.models import Block
+from comments.models import Comment, path_segment
+from comments.threads import subtree
+from contacts.models import Contact
+from feeds.fanout import home_feed_entries, home_feed_pulled
+from followers.models import Follower
+from likes.models import Like
+from posts.models import Post
+from posts.views import get_post_queryset
+from profiles.models import Profile
+
+PAGE_SIZE = 10
+
+# Query builders by name. Each takes a sample user and post and returns
+# the queryset (one page) that the matching endpoint or filter runs
+HOT_QUERIES = {
+    'posts': lambda user, post: (
+        get_post_queryset(AnonymousUser())[:PAGE_SIZE]
+    ),
+    'posts by owner': lambda user, post: (
+        Post.objects.filter(owner=user).order_by('-created_at')[:PAGE_SIZE]
+    ),
+    'posts by category': lambda user, post: (
+        Post.objects.filter(category=post.category_id)
+        .order_by('-created_at')[:PAGE_SIZE]
+    ),
+    'posts by likes count': lambda user, post: (
+        Post.objects.order_by('-likes_count')[:PAGE_SIZE]
+    ),
+    'comments of post': lambda user, post: (
+        Comment.objects.filter(post=post).order_by('-created_at')[:PAGE_SIZE]
+    ),
+    'replies of comment': lambda user, post: (
+        subtree(Comment(path=path_segment(1), depth=0))[:PAGE_SIZE]
+    ),
+    'likes of post': lambda user, post: (
+        Like.objects.filter(post=post).order_by('-created_at')[:PAGE_SIZE]
+    ),
+    'likes by owner': lambda user, post: (
+        Like.objects.filter(owner=user).order_by('-created_at')[:PAGE_SIZE]
+    ),
+    'followers of user': lambda user, post: (
+        Follower.objects.filter(followed=user)
+        .order_by('-created_at')[:PAGE_SIZE]
+    ),
+    'blockers of user': lambda user, post: (
+        Block.objects.filter(target=user).order_by()
+        .values_list('owner', flat=True)
+    ),
+    'profiles': lambda user, post: (
+        Profile.objects.order_by('-created_at')[:PAGE_SIZE]
+    ),
+    'profiles by followers count': lambda user, post: (
+        Profile.objects.order_by('-followers_count')[:PAGE_SIZE]
+    ),
+    'home feed entries': lambda user, post: home_feed_entries(
+        user, PAGE_SIZE, (post.created_at, post.id)
+    ),
+    'home feed pulled posts': lambda user, post: home_feed_pulled(
+        user, PAGE_SIZE, (post.created_at, post.id)
+    ),
+    'contacts by owner': lambda user, post: (
+        Contact.objects.filter(owner=user).order_by('-created_at')[:PAGE_SIZE]
+    ),
+}
+
+SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)(?!.*\bUSING\b)'),
+    'postgresql': re.compile(r'\bSeq Scan on (\w+)'),
+}
+
+
+def sequential_scans(plan, vendor=None):
+    """
+    Returns the names of the tables the plan reads with a full scan.
+    """
+    pattern = SCAN_PATTERNS.get(vendor or connection.vendor)
+    if pattern is None:
+        return []
+    return [
+        match.group(1)
+        for line in plan.splitlines()
+        for match in [pattern.search(line)] if match
+    ]
+
+
+def explain_hot_queries(user, post, names=None):
+    """
+    Explains each hot query for the sample user and post and returns
+    a list of dicts with the name, plan and sequentially scanned tables.
+    """
+    results = []
+    for name, build in HOT_QUERIES.items():
+        if names and name not in names:
+            continue
+        plan = build(user, post).explain()
+        results.append({
+            'name': name,
+            'plan': plan,
+            'scans': sequential_scans(plan),
+        })
+    return results
@@ -0,0 +1,49 @@
+"""
+Concurrent HTTP load generator, used to compare the WSGI and ASGI
+serving modes (see gunicorn.conf.py) against a running server.
+"""
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from .runner import percentile
+
+
+def fetch(url, timeout=10):
+    """
+    Requests the url once. Returns (status, elapsed seconds).
+    """
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    except OSError:
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def run_load(url, requests=200, concurrency=20, timeout=10):
+    """
+    Sends requests GET requests to url from concurrency threads and
+    returns the throughput, latency percentiles and error count.
+    """
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(
+            lambda _: fetch(url, timeout), range(requests)
+        ))
+    elapsed = time.perf_counter() - started
+    timings = [seconds * 1000 for _, seconds in results]
+    return {
+        'url': url,
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': sum(1 for status, _ in results if status != 200),
+        'rps': requests / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(timings, 50),
+        'p95_ms': percentile(timings, 95),
+        'p99_ms': percentile(timings, 99),
+    }
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from benchmarks.runner import ENDPOINTS, run_benchmarks
+from benchmarks.seed import DEFAULT_DATASET, seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic dataset and measure query counts, latency and '
+        'memory for the list endpoints. The dataset is rolled back '
+        'afterwards unless --keep is given.'
+    )
+
+    def add_arguments(self, parser):
+        for size, default in DEFAULT_DATASET.items():
+            parser.add_argument(
+                f'--{size.replace("_", "-")}', type=int, default=default,
+                dest=size, help=f'Dataset size: {size} (default {default})'
+            )
+        parser.add_argument(
+            '--repeat', type=int, default=10,
+            help='Requests per endpoint and mode'
+        )
+        parser.add_argument(
+            '--endpoint', action='append', choices=list(ENDPOINTS),
+            help='Only benchmark the given endpoint(s)'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Keep the seeded dataset instead of rolling it back'
+        )
+
+    def handle(self, *args, **options):
+        sizes = {size: options[size] for size in DEFAULT_DATASET}
+        with transaction.atomic():
+            users = seed_dataset(seed=options['seed'], **sizes)
+            results = (
+                run_benchmarks(None, options['repeat'], options['endpoint'])
+                + run_benchmarks(
+                    users[0], options['repeat'], options['endpoint']
+                )
+            )
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"{'Endpoint':<16} {'Mode':<14} {'Status':>6} {'Queries':>8} "
+            f"{'Budget':>7} {'p50 ms':>8} {'p95 ms':>8} {'Peak KiB':>9}"
+        )
+        self.stdout.write('=' * 82)
+        for result in results:
+            line = (
+                f"{result['endpoint']:<16} {result['mode']:<14} "
+                f"{result['status']:>6} {result['queries']:>8} "
+                f"{result['budget']:>7} {result['p50_ms']:>8.1f} "
+                f"{result['p95_ms']:>8.1f} {result['peak_kib']:>9.0f}"
+            )
+            style = (
+                self.style.ERROR if result['over_budget']
+                else self.style.SUCCESS
+            )
+            self.stdout.write(style(line))
+
+        over_budget = [
+            f"{result['endpoint']} ({result['mode']})"
+            for result in results if result['over_budget']
+        ]
+        if over_budget:
+            raise CommandError(
+                'Query budget exceeded: ' + ', '.join(over_budget)
+            )
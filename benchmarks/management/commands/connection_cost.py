@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from benchmarks.connections import connect_time, measure_connection_cost
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the cost of opening a database connection per request '
+        'against persistent and health-checked connections.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default='/comments/',
+            help='Path to request, not served from the response cache'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50, help='Requests per mode'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'Database: {connection.vendor}, new connection in '
+            f'{connect_time():.2f} ms'
+        )
+        self.stdout.write(
+            f"{'Mode':<16} {'Connections':>11} {'p50 ms':>8} {'p95 ms':>8}"
+        )
+        self.stdout.write('=' * 46)
+        for result in measure_connection_cost(
+            options['path'], options['repeat']
+        ):
+            self.stdout.write(
+                f"{result['mode']:<16} {result['connections']:>11} "
+                f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}"
+            )
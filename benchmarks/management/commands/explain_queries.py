@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from benchmarks.explain import HOT_QUERIES, explain_hot_queries
+from benchmarks.seed import seed_dataset
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN on the queries behind the hot list and filter paths '
+        'and report sequential scans. A small dataset is seeded and rolled '
+        'back unless --no-seed is given, in which case the existing rows '
+        'are used.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--query', action='append', choices=list(HOT_QUERIES),
+            help='Only explain the given query (or queries)'
+        )
+        parser.add_argument(
+            '--no-seed', action='store_true',
+            help='Explain against the existing data'
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Print the full plan of every query'
+        )
+        parser.add_argument(
+            '--fail-on-scan', action='store_true',
+            help='Exit with an error if any query scans a whole table'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not options['no_seed']:
+                seed_dataset(prefix='explain')
+            post = Post.objects.select_related('owner').first()
+            if post is None:
+                raise CommandError('There are no posts to explain against.')
+            results = explain_hot_queries(
+                post.owner, post, options['query']
+            )
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'Database: {connection.vendor}')
+        for result in results:
+            if result['scans']:
+                self.stdout.write(self.style.WARNING(
+                    f"{result['name']}: sequential scan of "
+                    f"{', '.join(result['scans'])}"
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{result['name']}: ok"
+                ))
+            if options['verbose_plans'] or result['scans']:
+                for line in result['plan'].splitlines():
+                    self.stdout.write(f'    {line}')
+
+        scanned = [result['name'] for result in results if result['scans']]
+        if scanned and options['fail_on_scan']:
+            raise CommandError(
+                'Sequential scans in: ' + ', '.join(scanned)
+            )
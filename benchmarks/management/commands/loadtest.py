@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks.loadtest import run_load
+
+
+class Command(BaseCommand):
+    help = (
+        'Send concurrent GET requests to a running server and report '
+        'throughput and latency, e.g. to compare SERVER_MODE wsgi and asgi.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default='http://127.0.0.1:8000',
+            help='Address of the running server'
+        )
+        parser.add_argument(
+            '--path', action='append',
+            help='Path(s) to request (default /posts/)'
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--timeout', type=float, default=10)
+
+    def handle(self, *args, **options):
+        paths = options['path'] or ['/posts/']
+        self.stdout.write(
+            f"{'Path':<24} {'Conc':>5} {'Errors':>7} {'Req/s':>8} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        self.stdout.write('=' * 74)
+        failed = []
+        for path in paths:
+            result = run_load(
+                options['base_url'].rstrip('/') + path,
+                options['requests'], options['concurrency'],
+                options['timeout'],
+            )
+            line = (
+                f"{path:<24} {result['concurrency']:>5} "
+                f"{result['errors']:>7} {result['rps']:>8.1f} "
+                f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+                f"{result['p99_ms']:>8.1f}"
+            )
+            style = (
+                self.style.ERROR if result['errors'] else self.style.SUCCESS
+            )
+            self.stdout.write(style(line))
+            if result['errors']:
+                failed.append(path)
+        if failed:
+            raise CommandError('Requests failed for: ' + ', '.join(failed))
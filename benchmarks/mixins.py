@@ -0,0 +1,36 @@
+"""
+Test-case mixin for asserting the query budgets of list endpoints
+against the synthetic benchmark dataset.
+"""
+from .runner import ENDPOINTS, QUERY_BUDGETS, make_client, measure
+from .seed import seed_dataset
+
+
+class QueryBudgetMixin:
+    """
+    Mixin for TestCase classes. Seeds the benchmark dataset once per
+    class and provides assertWithinQueryBudget.
+    Override benchmark_dataset to change the size of the dataset.
+    """
+    benchmark_dataset = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.benchmark_users = seed_dataset(**cls.benchmark_dataset)
+
+    def assertWithinQueryBudget(self, endpoint, user=None):
+        """
+        Fails if one page of the endpoint takes more queries than its
+        budget. Returns the measured result for further assertions.
+        """
+        result = measure(make_client(user), ENDPOINTS[endpoint], repeat=1)
+        mode = 'anonymous' if user is None else 'authenticated'
+        budget = QUERY_BUDGETS[endpoint][mode]
+        self.assertEqual(result['status'], 200)
+        self.assertLessEqual(
+            result['queries'], budget,
+            f'{endpoint} ({mode}) took {result["queries"]} queries, '
+            f'budget is {budget}'
+        )
+        return result
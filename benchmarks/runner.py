@@ -0,0 +1,116 @@
+"""
+Measures query counts, latency and allocated memory for the list
+endpoints, and compares the query counts against per-page budgets.
+"""
+import statistics
+import time
+import tracemalloc
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+# List endpoints under benchmark, by name
+ENDPOINTS = {
+    'PostList': '/posts/',
+    'ProfileList': '/profiles/',
+    'CommentList': '/comments/',
+    'LikeList': '/likes/',
+    'FollowerList': '/followers/',
+    'HashtagViewSet': '/hashtags/',
+}
+
+# Maximum number of queries allowed for one page of each endpoint,
+# for an anonymous and an authenticated request
+QUERY_BUDGETS = {
+    'PostList': {'anonymous': 3, 'authenticated': 3},
+    'ProfileList': {'anonymous': 2, 'authenticated': 4},
+    'CommentList': {'anonymous': 2, 'authenticated': 2},
+    'LikeList': {'anonymous': 2, 'authenticated': 2},
+    'FollowerList': {'anonymous': 2, 'authenticated': 2},
+    'HashtagViewSet': {'anonymous': 2, 'authenticated': 2},
+}
+
+# Anonymous list responses are cached (drf_api/response_cache.py), so
+# after the warm-up request every request would be a cache hit. The
+# response cache is turned off while measuring to count the queries
+# that actually build a page.
+NO_RESPONSE_CACHE = {name: 0 for name in ENDPOINTS}
+
+
+def percentile(samples, percent):
+    """
+    Returns the given percentile of the samples (nearest-rank method).
+    """
+    ordered = sorted(samples)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def make_client(user=None):
+    """
+    Returns an API client, authenticated as user if one is given.
+    'localhost' is used as host so the client passes ALLOWED_HOSTS
+    outside of the test runner too.
+    """
+    client = APIClient(SERVER_NAME='localhost')
+    if user is not None:
+        client.force_authenticate(user)
+    return client
+
+
+def measure(client, url, repeat=10):
+    """
+    Requests url repeat times and returns a dict with the status code,
+    the query count of the last request, the p50 and p95 latency in
+    milliseconds and the peak memory allocated per request in KiB.
+    One untimed request is made first so that caches are warm and the
+    results reflect steady-state traffic; the response cache is off.
+    """
+    with override_settings(RESPONSE_CACHE_TIMEOUTS=NO_RESPONSE_CACHE):
+        return measure_requests(client, url, repeat)
+
+
+def measure_requests(client, url, repeat):
+    client.get(url)
+    timings = []
+    peaks = []
+    queries = 0
+    status_code = None
+    for _ in range(repeat):
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+        queries = len(captured)
+        status_code = response.status_code
+    return {
+        'status': status_code,
+        'queries': queries,
+        'p50_ms': statistics.median(timings),
+        'p95_ms': percentile(timings, 95),
+        'peak_kib': max(peaks),
+    }
+
+
+def run_benchmarks(user=None, repeat=10, endpoints=None):
+    """
+    Measures every endpoint (or the given subset) and returns a list of
+    result dicts including the budget and whether it was exceeded.
+    """
+    client = make_client(user)
+    mode = 'anonymous' if user is None else 'authenticated'
+    results = []
+    for name in endpoints or ENDPOINTS:
+        result = measure(client, ENDPOINTS[name], repeat)
+        budget = QUERY_BUDGETS[name][mode]
+        result.update({
+            'endpoint': name,
+            'mode': mode,
+            'budget': budget,
+            'over_budget': result['queries'] > budget,
+        })
+        results.append(result)
+    return results
@@ -0,0 +1,113 @@
+"""
+Seeds a synthetic dataset of users, posts, likes, comments, follows,
+blocks and hashtags for the benchmark suite.
+
+Rows are inserted with bulk_create, so the denormalized counters and
+the search documents are recomputed once at the end instead of through
+the per-row signals.
+"""
+import random
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from blocks.models import Block
+from comments.models import Comment
+from drf_api.counters import recount_counters
+from followers.models import Follower
+from hashtags.models import Hashtag
+from likes.models import Like
+from posts.models import Post
+from posts.search import index_posts
+from profiles.models import Profile
+
+DEFAULT_DATASET = {
+    'users': 30,
+    'posts_per_user': 4,
+    'likes_per_post': 5,
+    'comments_per_post': 3,
+    'follows_per_user': 8,
+    'blocks_per_user': 1,
+    'hashtags': 40,
+    'hashtags_per_post': 3,
+}
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+def seed_dataset(seed=0, prefix='bench', **sizes):
+    """
+    Creates the synthetic dataset and returns the created users.
+    Any size not given falls back to DEFAULT_DATASET.
+    """
+    sizes = {**DEFAULT_DATASET, **sizes}
+    rng = random.Random(seed)
+    password = make_password(BENCHMARK_PASSWORD)
+
+    User.objects.bulk_create([
+        User(username=f'{prefix}_user_{i}', password=password)
+        for i in range(sizes['users'])
+    ])
+    users = list(
+        User.objects.filter(username__startswith=f'{prefix}_user_')
+    )
+    Profile.objects.bulk_create(
+        [Profile(owner=user) for user in users], ignore_conflicts=True
+    )
+
+    Hashtag.objects.bulk_create([
+        Hashtag(name=f'{prefix}_tag_{i}') for i in range(sizes['hashtags'])
+    ], ignore_conflicts=True)
+    hashtags = list(
+        Hashtag.objects.filter(name__startswith=f'{prefix}_tag_')
+    )
+
+    Post.objects.bulk_create([
+        Post(owner=user, title=f'{user.username} post {i}')
+        for user in users
+        for i in range(sizes['posts_per_user'])
+    ])
+    posts = list(Post.objects.filter(owner__in=users))
+
+    PostHashtag = Post.hashtags.through
+    PostHashtag.objects.bulk_create([
+        PostHashtag(post=post, hashtag=hashtag)
+        for post in posts
+        for hashtag in rng.sample(
+            hashtags, min(sizes['hashtags_per_post'], len(hashtags))
+        )
+    ])
+
+    likes_per_post = min(sizes['likes_per_post'], len(users))
+    Like.objects.bulk_create([
+        Like(owner=owner, post=post)
+        for post in posts
+        for owner in rng.sample(users, likes_per_post)
+    ])
+    Comment.objects.bulk_create([
+        Comment(owner=rng.choice(users), post=post, content=f'comment {i}')
+        for post in posts
+        for i in range(sizes['comments_per_post'])
+    ])
+
+    follows = []
+    blocks = []
+    for user in users:
+        others = [other for other in users if other != user]
+        picked = rng.sample(
+            others,
+            min(sizes['follows_per_user'] + sizes['blocks_per_user'],
+                len(others))
+        )
+        follows += [
+            Follower(owner=user, followed=other)
+            for other in picked[:sizes['follows_per_user']]
+        ]
+        blocks += [
+            Block(owner=user, target=other)
+            for other in picked[sizes['follows_per_user']:]
+        ]
+    Follower.objects.bulk_create(follows)
+    Block.objects.bulk_create(blocks)
+
+    recount_counters()
+    index_posts([post.pk for post in posts])
+    return users
@@ -0,0 +1,255 @@
+"""
+Query budget tests for the list endpoints.
+
+Each test requests one page of an endpoint against the synthetic
+benchmark dataset and fails if it takes more queries than the budget
+defined in benchmarks.runner.QUERY_BUDGETS.
+"""
+import json
+from io import StringIO
+from asgiref.sync import SyncToAsync, async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import (
+    LiveServerTestCase, RequestFactory, TransactionTestCase, override_settings
+)
+from rest_framework.test import APITestCase
+from drf_api.db import close_unhealthy_connections
+from drf_api.instrumentation import (
+    RequestMetrics, RequestMetricsMiddleware, query_shape
+)
+from posts.models import Post
+from .connections import CONNECTION_MODES
+from .explain import HOT_QUERIES, sequential_scans
+from .loadtest import run_load
+from .mixins import QueryBudgetMixin
+from .runner import ENDPOINTS
+
+
+# Budgets describe production traffic, which runs with a real cache
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ListEndpointQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """
+    Checks every list endpoint, anonymously and as a logged in user.
+    """
+    benchmark_dataset = {'users': 12, 'posts_per_user': 2}
+
+    def setUp(self):
+        cache.clear()
+
+    def test_anonymous_query_budgets(self):
+        for endpoint in ENDPOINTS:
+            with self.subTest(endpoint=endpoint):
+                result = self.assertWithinQueryBudget(endpoint)
+                # Counted without the anonymous response cache
+                self.assertGreater(result['queries'], 0)
+
+    def test_authenticated_query_budgets(self):
+        user = self.benchmark_users[0]
+        for endpoint in ENDPOINTS:
+            with self.subTest(endpoint=endpoint):
+                self.assertWithinQueryBudget(endpoint, user)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BenchmarkCommandTests(APITestCase):
+    """
+    Tests for the benchmark management command.
+    """
+    def setUp(self):
+        cache.clear()
+
+    def test_command_reports_every_endpoint(self):
+        """
+        Ensure the command reports each endpoint for both modes.
+        """
+        out = StringIO()
+        call_command(
+            'benchmark', users=4, posts_per_user=1, repeat=1, stdout=out
+        )
+        for endpoint in ENDPOINTS:
+            self.assertEqual(out.getvalue().count(endpoint), 2)
+
+
+class ExplainQueriesTests(APITestCase):
+    """
+    Tests for the EXPLAIN based index checks.
+    """
+    def test_sequential_scans_are_detected(self):
+        """
+        Ensure full scans are reported and index scans are not.
+        """
+        sqlite_plan = (
+            '2 0 0 SCAN posts_post\n'
+            '5 0 0 SCAN profiles_profile USING INDEX profile_created_idx\n'
+            '7 0 0 SEARCH likes_like USING INDEX like_post_created_idx'
+        )
+        self.assertEqual(
+            sequential_scans(sqlite_plan, 'sqlite'), ['posts_post']
+        )
+        postgres_plan = (
+            'Limit  (cost=0.00..1.10 rows=10 width=8)\n'
+            '  ->  Seq Scan on posts_post  (cost=0.00..11.00 rows=100)'
+        )
+        self.assertEqual(
+            sequential_scans(postgres_plan, 'postgresql'), ['posts_post']
+        )
+
+    def test_hot_queries_use_indexes(self):
+        """
+        Ensure none of the hot queries scans a whole table.
+        """
+        out = StringIO()
+        call_command('explain_queries', fail_on_scan=True, stdout=out)
+        for name in HOT_QUERIES:
+            self.assertIn(f'{name}: ok', out.getvalue())
+
+
+class LoadTestTests(LiveServerTestCase):
+    """
+    Tests for the concurrent load generator.
+    """
+    def test_run_load_reports_throughput(self):
+        """
+        Ensure every request is counted and failures are reported.
+        """
+        result = run_load(
+            f'{self.live_server_url}/posts/', requests=8, concurrency=4
+        )
+        self.assertEqual(result['errors'], 0)
+        self.assertGreater(result['rps'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+        result = run_load(
+            f'{self.live_server_url}/missing/', requests=2, concurrency=2
+        )
+        self.assertEqual(result['errors'], 2)
+
+
+class ConnectionCostTests(TransactionTestCase):
+    """
+    Tests for the connection health checks and the connection_cost
+    benchmark, outside of a test transaction as in a real request.
+    """
+    def test_healthy_connection_is_kept(self):
+        """
+        Ensure a health-checked connection that responds stays open.
+        """
+        connection.settings_dict['CONN_HEALTH_CHECKS'] = True
+        try:
+            connection.ensure_connection()
+            close_unhealthy_connections()
+            self.assertIsNotNone(connection.connection)
+        finally:
+            connection.settings_dict['CONN_HEALTH_CHECKS'] = False
+
+    def test_command_reports_every_mode(self):
+        """
+        Ensure each mode is reported and the settings are restored.
+        """
+        max_age = connection.settings_dict['CONN_MAX_AGE']
+        out = StringIO()
+        call_command('connection_cost', repeat=2, stdout=out)
+        for mode, _, _ in CONNECTION_MODES:
+            self.assertIn(mode, out.getvalue())
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], max_age)
+
+
+@override_settings(SERVER_TIMING_HEADER=True, N_PLUS_ONE_THRESHOLD=3)
+class RequestMetricsTests(APITestCase):
+    """
+    Tests for the request metrics middleware and view mixin.
+    """
+    def setUp(self):
+        cache.clear()
+
+    def test_queries_differing_in_parameters_share_a_shape(self):
+        """
+        Ensure a per-row lookup is reported as a repeated query.
+        """
+        self.assertEqual(
+            query_shape('SELECT * FROM t WHERE id IN (%s, %s) LIMIT 21'),
+            query_shape('SELECT * FROM t WHERE id IN (%s) LIMIT 1'),
+        )
+        metrics = RequestMetrics()
+        for _ in range(3):
+            metrics.add_query('SELECT * FROM t WHERE id = %s LIMIT 21', 0)
+        metrics.add_query('SELECT COUNT(*) FROM t', 0)
+        self.assertEqual(metrics.queries, 4)
+        self.assertEqual(metrics.repeated_queries(), [
+            {'sql': 'SELECT * FROM t WHERE id = %s LIMIT N', 'count': 3}
+        ])
+
+    def test_metrics_are_reported(self):
+        """
+        Ensure the Server-Timing header and the log line report the
+        queries, serialization and rendering of the request.
+        """
+        user = User.objects.create_user(username='metrics', password='pass')
+        Post.objects.create(owner=user, title='title')
+        with self.assertLogs('drf_api.requests', 'INFO') as logs:
+            response = self.client.get('/posts/')
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="3 queries"', timing)
+        self.assertIn('serialize;dur=', timing)
+        self.assertIn('render;dur=', timing)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'PostList')
+        self.assertEqual(record['queries'], 3)
+        self.assertEqual(record['repeated_queries'], [])
+
+    def test_repeated_queries_are_logged_as_warning(self):
+        """
+        Ensure a request repeating a query per row logs a warning.
+        """
+        user = User.objects.create_user(username='metrics', password='pass')
+        posts = [
+            Post.objects.create(owner=user, title=f'title {i}')
+            for i in range(3)
+        ]
+
+        def per_row_view(request):
+            for post in posts:
+                Post.objects.filter(pk=post.pk).first()
+            return HttpResponse()
+
+        middleware = RequestMetricsMiddleware(per_row_view)
+        with self.assertLogs('drf_api.requests', 'WARNING') as logs:
+            middleware(RequestFactory().get('/posts/'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['queries'], 3)
+        self.assertEqual(record['repeated_queries'][0]['count'], 3)
+
+    def test_asgi_middleware_chain_stays_async(self):
+        """
+        Ensure the middleware runs natively in the ASGI chain instead of
+        wrapping the whole chain in a thread-sensitive sync_to_async.
+        """
+        chain = ASGIHandler()._middleware_chain
+        self.assertNotIsInstance(chain, SyncToAsync)
+        self.assertTrue(iscoroutinefunction(chain))
+
+    def test_async_requests_are_reported(self):
+        """
+        Ensure requests through an async chain are measured too.
+        """
+        async def async_view(request):
+            return HttpResponse()
+
+        middleware = RequestMetricsMiddleware(async_view)
+        with self.assertLogs('drf_api.requests', 'INFO') as logs:
+            response = async_to_sync(middleware)(
+                RequestFactory().get('/posts/')
+            )
+        self.assertIn('total;dur=', response['Server-Timing'])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['status'], 200)
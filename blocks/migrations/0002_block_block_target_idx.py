@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blocks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='block',
+            index=models.Index(fields=['target', 'owner'], name='block_target_idx'),
+        ),
+    ]
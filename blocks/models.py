@@ -1,5 +1,11 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 from django.contrib.auth.models import User
+from profiles.models import Profile
+from drf_api.counters import adjust_counter
+from drf_api.response_cache import invalidate_on_change
 
 
 class Block(models.Model):
@@ -26,6 +32,68 @@ class Block(models.Model):
         ordering = ['-created_at']
         # Ensures that the same user cannot block another user more than once
         unique_together = ['owner', 'target']
+        # Looks up who blocks a user without reading the table rows
+        indexes = [
+            models.Index(fields=['target', 'owner'], name='block_target_idx'),
+        ]
 
     def __str__(self):
         return f'{self.owner} {self.target}'
+
+
+def blocked_ids_cache_key(user_id):
+    return f'blocks:blocked-ids:{user_id}'
+
+
+def get_blocked_ids(user):
+    """
+    Returns the ids of the users the given user blocks.
+    The set is cached per user and invalidated whenever one of the
+    user's blocks is created or deleted, so filtering out blocked
+    users costs no query on hot reads.
+    """
+    if not user.is_authenticated:
+        return []
+    key = blocked_ids_cache_key(user.id)
+    blocked_ids = cache.get(key)
+    if blocked_ids is None:
+        blocked_ids = list(
+            Block.objects.filter(owner=user).values_list('target', flat=True)
+        )
+        cache.set(key, blocked_ids, settings.BLOCK_CACHE_TIMEOUT)
+    return blocked_ids
+
+
+def exclude_blocked(queryset, user, field='owner'):
+    """
+    Excludes the rows whose 'field' is a user the given user blocks.
+    """
+    blocked_ids = get_blocked_ids(user)
+    if blocked_ids:
+        queryset = queryset.exclude(**{f'{field}__in': blocked_ids})
+    return queryset
+
+
+def block_changed(instance, delta):
+    """
+    Adjust the blocking_count of the owner and the blocked_count
+    of the target by delta, and drop the owner's cached block set.
+    """
+    cache.delete(blocked_ids_cache_key(instance.owner_id))
+    adjust_counter(Profile, 'blocking_count', delta, owner=instance.owner_id)
+    adjust_counter(Profile, 'blocked_count', delta, owner=instance.target_id)
+
+
+def block_created(sender, instance, created, **kwargs):
+    if created:
+        block_changed(instance, 1)
+
+
+def block_deleted(sender, instance, **kwargs):
+    block_changed(instance, -1)
+
+
+post_save.connect(block_created, sender=Block)
+post_delete.connect(block_deleted, sender=Block)
+# Cached anonymous profile lists can be ordered by the block counters
+invalidate_on_change(Block, 'profiles')
@@ -1,10 +1,14 @@
 from django.contrib.auth.models import User
-from django.test import TransactionTestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.urls import reverse
 from .models import Block
 from posts.models import Post
+from comments.models import Comment
 
 
 class BlockTests(TransactionTestCase):
@@ -18,6 +22,7 @@ class BlockTests(TransactionTestCase):
         Set up the test environment.
         This method creates two test users and logs in the first user.
         """
+        cache.clear()
         self.user1 = User.objects.create_user(
             username='user1',
             password='password1'
@@ -108,6 +113,7 @@ class BlockPostTests(APITestCase):
         """
         Set up necessary preconditions and initialize objects before each test.
         """
+        cache.clear()
         self.user1 = User.objects.create_user(
             username='user1',
             password='password1'
@@ -219,3 +225,70 @@ class BlockPostTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         post_titles = [post['title'] for post in response.data['results']]
         self.assertIn('Post by User 2', post_titles)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class BlockCacheTests(APITestCase):
+    """
+    Tests for the cached set of blocked users applied to list views.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user1 = User.objects.create_user(
+            username='user1',
+            password='password1'
+        )
+        self.user2 = User.objects.create_user(
+            username='user2',
+            password='password2'
+        )
+        post = Post.objects.create(owner=self.user1, title='a title')
+        Comment.objects.create(owner=self.user2, post=post, content='hi')
+        self.client.force_authenticate(self.user1)
+
+    def get_comment_owners(self):
+        response = self.client.get('/comments/')
+        return [comment['owner'] for comment in response.data['results']]
+
+    def test_blocked_users_comments_are_hidden(self):
+        """
+        Ensure comments by blocked users are hidden, and shown again
+        once the block is deleted.
+        """
+        self.assertEqual(self.get_comment_owners(), ['user2'])
+        block = Block.objects.create(owner=self.user1, target=self.user2)
+        self.assertEqual(self.get_comment_owners(), [])
+        block.delete()
+        self.assertEqual(self.get_comment_owners(), ['user2'])
+
+    def test_block_set_is_not_queried_on_every_request(self):
+        """
+        Ensure the block set is loaded once and then read from the cache.
+        """
+        Block.objects.create(owner=self.user1, target=self.user2)
+        self.get_comment_owners()
+        with CaptureQueriesContext(connection) as queries:
+            self.get_comment_owners()
+        self.assertFalse(any(
+            'blocks_block' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+    def test_blocks_refresh_cached_profile_order(self):
+        """
+        Ensure anonymous profile lists ordered by block counters are not
+        served stale from the response cache.
+        """
+        def blocked_order():
+            response = self.client.get('/profiles/?ordering=-blocked_count')
+            return [profile['owner'] for profile in response.data['results']]
+
+        self.client.force_authenticate(None)
+        user3 = User.objects.create_user(username='user3', password='pw')
+        Block.objects.create(owner=self.user2, target=self.user1)
+        self.assertEqual(blocked_order()[0], 'user1')
+        Block.objects.create(owner=self.user1, target=user3)
+        Block.objects.create(owner=self.user2, target=user3)
+        self.assertEqual(blocked_order()[0], 'user3')
@@ -1,4 +1,5 @@
 from django.db import models
+from drf_api.response_cache import invalidate_on_change
 
 
 class Category(models.Model):
@@ -12,3 +13,7 @@ class Category(models.Model):
 
     def __str__(self):
         return self.name
+
+
+# Invalidate cached anonymous category and post lists
+invalidate_on_change(Category, 'categories', 'posts')
@@ -3,13 +3,16 @@ from .models import Category
 from .serializers import CategorySerializer, CategoryDetailSerializer
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_api.permissions import IsOwnerOrReadOnly
+from drf_api.response_cache import AnonymousResponseCacheMixin
 
 
-class CategoryList(generics.ListAPIView):
+class CategoryList(AnonymousResponseCacheMixin, generics.ListAPIView):
     """
     API view to list all categories.
-    Allows filtering by name.
+    Allows filtering by name. Anonymous responses are cached.
     """
+    cache_namespaces = ('categories',)
+    cache_timeout = 600
     serializer_class = CategorySerializer
     queryset = Category.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -1,20 +1,96 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 from django.contrib.auth.models import User
 from posts.models import Post
+from drf_api.counters import adjust_counter
+from drf_api.response_cache import invalidate_on_change
+
+
+# Replies form a tree stored as a materialized path: the ids of a
+# comment's ancestors and of the comment itself, each zero-padded to
+# PATH_SEGMENT_WIDTH digits. A subtree is a range of paths and sorting
+# by path lists a thread depth-first, oldest reply first. The path has
+# no separators, so it sorts the same under any database collation.
+PATH_SEGMENT_WIDTH = 10
+MAX_DEPTH = 25
+
+
+def path_segment(pk):
+    return str(pk).zfill(PATH_SEGMENT_WIDTH)
 
 
 class Comment(models.Model):
     """
     Comment model, related to User and Post
+    A comment with a parent is a reply; replies_count counts its
+    direct replies.
     """
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
     post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    parent = models.ForeignKey(
+        'self', on_delete=models.CASCADE, null=True, blank=True,
+        related_name='replies'
+    )
+    path = models.CharField(
+        max_length=PATH_SEGMENT_WIDTH * MAX_DEPTH, default='', editable=False
+    )
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    replies_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     content = models.TextField()
 
     class Meta:
         ordering = ['-created_at']
+        # Comments are listed per post, newest first
+        indexes = [
+            models.Index(
+                fields=['post', '-created_at'],
+                name='comment_post_created_idx'
+            ),
+            # Subtrees are path ranges, direct replies a parent's range
+            models.Index(fields=['path'], name='comment_path_idx'),
+            models.Index(
+                fields=['parent', 'path'], name='comment_parent_path_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.content
+
+
+def comment_created(sender, instance, created, **kwargs):
+    """
+    Set the path and depth of a new comment, which need its id, and
+    increment the post's comments_count and the parent's replies_count.
+    """
+    if not created:
+        return
+    parent = instance.parent
+    instance.path = (parent.path if parent else '') + path_segment(
+        instance.pk
+    )
+    instance.depth = parent.depth + 1 if parent else 0
+    Comment.objects.filter(pk=instance.pk).update(
+        path=instance.path, depth=instance.depth
+    )
+    adjust_counter(Post, 'comments_count', 1, pk=instance.post_id)
+    if parent:
+        adjust_counter(Comment, 'replies_count', 1, pk=parent.pk)
+
+
+def comment_deleted(sender, instance, **kwargs):
+    """
+    Decrement the post's comments_count and the parent's replies_count
+    when a comment is deleted. Deleting a comment deletes its replies.
+    """
+    adjust_counter(Post, 'comments_count', -1, pk=instance.post_id)
+    if instance.parent_id:
+        adjust_counter(
+            Comment, 'replies_count', -1, pk=instance.parent_id
+        )
+
+
+post_save.connect(comment_created, sender=Comment)
+post_delete.connect(comment_deleted, sender=Comment)
+invalidate_on_change(Comment, 'posts')
@@ -1,41 +1,76 @@
-from django.contrib.humanize.templatetags.humanize import naturaltime
 from rest_framework import serializers
-from .models import Comment
+from drf_api.serializers import NaturalTimeField
+from .models import MAX_DEPTH, Comment
 
 
 class CommentSerializer(serializers.ModelSerializer):
     """
     Serializer for the Comment model
     Adds three extra fields when returning a list of Comment instances
+    Reads the owner and profile fields from the 'owner__profile' join
+    made by the comment views
     """
     owner = serializers.ReadOnlyField(source='owner.username')
     is_owner = serializers.SerializerMethodField()
     profile_id = serializers.ReadOnlyField(source='owner.profile.id')
     profile_image = serializers.ReadOnlyField(source='owner.profile.image.url')
-    created_at = serializers.SerializerMethodField()
-    updated_at = serializers.SerializerMethodField()
+    created_at = NaturalTimeField()
+    updated_at = NaturalTimeField()
 
     def get_is_owner(self, obj):
         request = self.context['request']
-        return request.user == obj.owner
+        return request.user.id == obj.owner_id
 
-    def get_created_at(self, obj):
-        return naturaltime(obj.created_at)
-
-    def get_updated_at(self, obj):
-        return naturaltime(obj.updated_at)
+    def validate(self, data):
+        """
+        A reply must belong to its parent's post and cannot be nested
+        deeper than MAX_DEPTH levels.
+        """
+        parent = data.get('parent')
+        if parent is not None:
+            if parent.post_id != data['post'].id:
+                raise serializers.ValidationError({
+                    'parent': 'The parent comment belongs to another post.'
+                })
+            if parent.depth + 1 >= MAX_DEPTH:
+                raise serializers.ValidationError({
+                    'parent': 'Replies are too deeply nested.'
+                })
+        return data
 
     class Meta:
         model = Comment
         fields = [
             'id', 'owner', 'is_owner', 'profile_id', 'profile_image',
-            'post', 'created_at', 'updated_at', 'content'
+            'post', 'parent', 'depth', 'replies_count',
+            'created_at', 'updated_at', 'content'
         ]
+        read_only_fields = ['replies_count']
+
+
+class CommentThreadSerializer(CommentSerializer):
+    """
+    Serializer for the top-level comments of a post, each with a
+    preview of its first replies, loaded by the view into
+    'reply_preview'.
+    """
+    replies = serializers.SerializerMethodField()
+
+    def get_replies(self, obj):
+        return CommentSerializer(
+            getattr(obj, 'reply_preview', []), many=True,
+            context=self.context
+        ).data
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['replies']
 
 
 class CommentDetailSerializer(CommentSerializer):
     """
     Serializer for the Comment model used in Detail view
     Post is a read only field so that we dont have to set it on each update
+    and so is the parent, a reply cannot be moved to another comment
     """
     post = serializers.ReadOnlyField(source='post.id')
+    parent = serializers.ReadOnlyField(source='parent_id')
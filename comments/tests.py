@@ -9,11 +9,18 @@ initialized & configured before executing the tests.
 The test cases are custom coded with inspiration from sources
 listed in the README chapter Credits, Content.
 """
+from datetime import timedelta
+from django.core.cache import cache
 from django.contrib.auth.models import User
+from django.contrib.humanize.templatetags.humanize import (
+    naturaltime as naturaltime_filter
+)
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 from .models import Comment
 from posts.models import Post
+from drf_api.humanize import naturaltime
 
 
 def fail_first(test_func):
@@ -47,6 +54,7 @@ class CommentTests(APITestCase):
         """
         Set up the test environment.
         """
+        cache.clear()
         self.user = User.objects.create_user(
             username='testuser',
             password='testpassword'
@@ -204,5 +212,183 @@ class CommentTests(APITestCase):
             self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class PostCommentListTests(APITestCase):
+    """
+    Tests for the comments-by-post endpoint.
+    """
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(username=f'user{i}', password='pass')
+            for i in range(3)
+        ]
+        self.post = Post.objects.create(owner=self.users[0], title='Post')
+        self.other_post = Post.objects.create(
+            owner=self.users[0], title='Other post'
+        )
+
+    def add_comments(self, count):
+        for i in range(count):
+            Comment.objects.create(
+                owner=self.users[i % len(self.users)], post=self.post,
+                content=f'comment {i}'
+            )
+
+    def test_lists_only_the_posts_comments(self):
+        """
+        Ensure only the post's comments are listed, with their authors.
+        """
+        self.add_comments(3)
+        Comment.objects.create(
+            owner=self.users[0], post=self.other_post, content='elsewhere'
+        )
+        response = self.client.get(f'/posts/{self.post.id}/comments/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(
+            comment['post'] == self.post.id for comment in results
+        ))
+        self.assertEqual(results[0]['owner'], 'user2')
+        self.assertEqual(results[0]['created_at'], 'now')
+
+    def test_query_count_does_not_grow_with_the_thread(self):
+        """
+        A page of comments takes one query however many comments and
+        authors the thread has, and the cursor reaches every comment.
+        """
+        self.add_comments(25)
+        url = f'/posts/{self.post.id}/comments/'
+        seen = []
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            seen += [comment['id'] for comment in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+    def test_naturaltime_matches_the_filter(self):
+        """
+        Ensure the relative timestamps read like the naturaltime filter.
+        """
+        now = timezone.now()
+        for seconds in (0, 30, 90, 7200, 90000, 86400 * 40):
+            for moment in (
+                now - timedelta(seconds=seconds),
+                now + timedelta(seconds=seconds, milliseconds=500),
+            ):
+                with self.subTest(moment=moment):
+                    self.assertEqual(
+                        naturaltime(moment, now), naturaltime_filter(moment)
+                    )
+
+
+class CommentThreadTests(APITestCase):
+    """
+    Tests for threaded replies.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='threaduser', password='pass'
+        )
+        self.post = Post.objects.create(owner=self.user, title='Post')
+
+    def comment(self, parent=None, post=None):
+        return Comment.objects.create(
+            owner=self.user, post=post or self.post, parent=parent,
+            content='comment'
+        )
+
+    def build_thread(self):
+        """
+        Creates root > (reply_a > nested, reply_b) and a sibling root
+        with a reply of its own.
+        """
+        root = self.comment()
+        reply_a = self.comment(root)
+        nested = self.comment(reply_a)
+        reply_b = self.comment(root)
+        sibling = self.comment()
+        self.comment(sibling)
+        return root, reply_a, nested, reply_b
+
+    def test_paths_depths_and_counters(self):
+        """
+        Ensure replies extend their parent's path and counters follow
+        replies being added and deleted.
+        """
+        root, reply_a, nested, reply_b = self.build_thread()
+        nested.refresh_from_db()
+        self.assertEqual(nested.depth, 2)
+        self.assertTrue(nested.path.startswith(reply_a.path))
+        self.assertEqual(len(nested.path), 30)
+        root.refresh_from_db()
+        self.assertEqual(root.replies_count, 2)
+
+        reply_a.delete()
+        root.refresh_from_db()
+        self.post.refresh_from_db()
+        self.assertEqual(root.replies_count, 1)
+        self.assertFalse(Comment.objects.filter(pk=nested.pk).exists())
+        self.assertEqual(self.post.comments_count, 4)
+
+    def test_replies_are_listed_depth_first(self):
+        """
+        Ensure a subtree is listed depth-first, without the replies of
+        other comments, in two queries, and can be limited in depth.
+        """
+        root, reply_a, nested, reply_b = self.build_thread()
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/comments/{root.id}/replies/')
+        self.assertEqual(
+            [reply['id'] for reply in response.data['results']],
+            [reply_a.id, nested.id, reply_b.id]
+        )
+        response = self.client.get(f'/comments/{root.id}/replies/?depth=1')
+        self.assertEqual(
+            [reply['id'] for reply in response.data['results']],
+            [reply_a.id, reply_b.id]
+        )
+        response = self.client.get(f'/comments/{root.id}/replies/?depth=x')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_comments_include_reply_previews(self):
+        """
+        Ensure the post's thread lists top-level comments with their
+        first replies, in two queries.
+        """
+        root = self.comment()
+        replies = [self.comment(root) for _ in range(5)]
+        self.comment(replies[0])
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/posts/{self.post.id}/comments/')
+        results = response.data['results']
+        self.assertEqual([comment['id'] for comment in results], [root.id])
+        self.assertEqual(results[0]['replies_count'], 5)
+        self.assertEqual(
+            [reply['id'] for reply in results[0]['replies']],
+            [reply.id for reply in replies[:3]]
+        )
+
+    def test_reply_must_be_on_the_parents_post(self):
+        """
+        Ensure a reply to a comment of another post is rejected.
+        """
+        other_post = Post.objects.create(owner=self.user, title='Other')
+        parent = self.comment(post=other_post)
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/comments/', {
+            'post': self.post.id, 'parent': parent.id, 'content': 'reply'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/comments/', {
+            'post': other_post.id, 'parent': parent.id, 'content': 'reply'
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['depth'], 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,62 @@
+"""
+Queries over comment threads, using the materialized path of each
+comment (see comments.models).
+
+- subtree() loads every reply below a comment, at any depth, with one
+  range scan of comment_path_idx, in depth-first order.
+- reply_previews() loads the first replies of each of several comments
+  with one query, ranking the replies of each parent with a window
+  function over comment_parent_path_idx.
+"""
+from collections import defaultdict
+from django.db.models import F, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+from .models import Comment
+
+
+def path_successor(path):
+    """
+    Returns the smallest path sorting after every path starting with
+    the given one: paths are digits only, so it is the path plus one.
+    """
+    return str(int(path) + 1).zfill(len(path))
+
+
+def subtree(comment, queryset=None, max_depth=None):
+    """
+    Returns the replies below a comment in depth-first order, down to
+    max_depth levels below it when given.
+    """
+    queryset = Comment.objects.all() if queryset is None else queryset
+    replies = queryset.filter(
+        path__gt=comment.path, path__lt=path_successor(comment.path)
+    )
+    if max_depth is not None:
+        replies = replies.filter(depth__lte=comment.depth + max_depth)
+    return replies.order_by('path')
+
+
+def reply_previews(parent_ids, limit=3, queryset=None):
+    """
+    Returns {parent id: [reply, ...]} with the first limit direct
+    replies of each parent, oldest first.
+    """
+    if not parent_ids:
+        return {}
+    queryset = Comment.objects.all() if queryset is None else queryset
+    ranked = queryset.filter(parent_id__in=parent_ids).annotate(
+        reply_rank=Window(
+            RowNumber(), partition_by=[F('parent_id')],
+            order_by=F('path').asc(),
+        )
+    ).order_by().values('id', 'reply_rank')
+    sql, params = ranked.query.sql_with_params()
+    replies = queryset.filter(id__in=RawSQL(
+        f'SELECT id FROM ({sql}) ranked WHERE reply_rank <= %s',
+        (*params, limit),
+    )).order_by('path')
+    previews = defaultdict(list)
+    for reply in replies:
+        previews[reply.parent_id].append(reply)
+    return previews
@@ -1,7 +1,18 @@
 from django.urls import path
+from drf_api.asynchronous import serving_view
 from comments import views
 
 urlpatterns = [
-    path('comments/', views.CommentList.as_view()),
-    path('comments/<int:pk>/', views.CommentDetail.as_view())
+    path('comments/', serving_view(views.CommentList.as_view())),
+    path('comments/<int:pk>/', views.CommentDetail.as_view()),
+    path(
+        'comments/<int:pk>/replies/',
+        serving_view(views.CommentReplyList.as_view()),
+        name='comment-reply-list'
+    ),
+    path(
+        'posts/<int:pk>/comments/',
+        serving_view(views.PostCommentList.as_view()),
+        name='post-comment-list'
+    ),
 ]
@@ -1,11 +1,22 @@
+from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
 from django_filters.rest_framework import DjangoFilterBackend
+from blocks.models import exclude_blocked
+from drf_api.pagination import (
+    CreatedAtCursorPagination, CursorOrPageNumberPagination
+)
 from drf_api.permissions import IsOwnerOrReadOnly
+from drf_api.instrumentation import RequestMetricsMixin
 from .models import Comment
-from .serializers import CommentSerializer, CommentDetailSerializer
+from .serializers import (
+    CommentSerializer, CommentDetailSerializer, CommentThreadSerializer
+)
+from .threads import reply_previews, subtree
 
 
-class CommentList(generics.ListCreateAPIView):
+class CommentList(RequestMetricsMixin, generics.ListCreateAPIView):
     """
     List all comments, create a new comment
     if authenticated. Associate the current
@@ -13,19 +24,99 @@ class CommentList(generics.ListCreateAPIView):
     """
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     serializer_class = CommentSerializer
-    queryset = Comment.objects.all()
+    pagination_class = CursorOrPageNumberPagination
+    queryset = Comment.objects.select_related('owner__profile')
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['post']
+    filterset_fields = ['post', 'parent']
+
+    def get_queryset(self):
+        """
+        Hide comments written by users the logged in user blocks.
+        """
+        return exclude_blocked(self.queryset, self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
 
-class CommentDetail(generics.RetrieveUpdateDestroyAPIView):
+class PostCommentList(RequestMetricsMixin, generics.ListAPIView):
+    """
+    List the top-level comments of one post, newest first, each with
+    its first replies. Cursor pagination makes every page of a long
+    thread cost one query, plus one for the reply previews when any
+    comment of the page has replies.
+    """
+    serializer_class = CommentThreadSerializer
+    pagination_class = CreatedAtCursorPagination
+    reply_preview_size = 3
+
+    def get_comments(self):
+        """
+        Hide comments written by users the logged in user blocks.
+        """
+        return exclude_blocked(
+            Comment.objects.select_related('owner__profile'),
+            self.request.user,
+        )
+
+    def get_queryset(self):
+        return self.get_comments().filter(
+            post_id=self.kwargs['pk'], parent__isnull=True
+        )
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        previews = reply_previews(
+            [comment.id for comment in page if comment.replies_count],
+            self.reply_preview_size, self.get_comments(),
+        )
+        for comment in page:
+            comment.reply_preview = previews.get(comment.id, [])
+        return page
+
+
+class PathCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a thread in depth-first (path) order.
+    """
+    ordering = 'path'
+
+
+class CommentReplyList(RequestMetricsMixin, generics.ListAPIView):
+    """
+    List the replies below a comment at any depth, depth-first with the
+    oldest reply first, or only the first levels with '?depth=<n>'.
+    """
+    serializer_class = CommentSerializer
+    pagination_class = PathCursorPagination
+
+    def get_queryset(self):
+        comment = get_object_or_404(
+            Comment.objects.only('path', 'depth'), pk=self.kwargs['pk']
+        )
+        max_depth = self.request.query_params.get('depth')
+        if max_depth is not None:
+            if not max_depth.isdigit() or int(max_depth) < 1:
+                raise ValidationError(
+                    {'depth': 'Must be a positive integer.'}
+                )
+            max_depth = int(max_depth)
+        return subtree(
+            comment,
+            exclude_blocked(
+                Comment.objects.select_related('owner__profile'),
+                self.request.user,
+            ),
+            max_depth,
+        )
+
+
+class CommentDetail(RequestMetricsMixin,
+                    generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve a comment
     update or delete a comment if owner
     """
     permission_classes = [IsOwnerOrReadOnly]
     serializer_class = CommentDetailSerializer
-    queryset = Comment.objects.all()
+    queryset = Comment.objects.select_related('owner__profile')
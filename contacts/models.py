@@ -19,6 +19,12 @@ class Contact(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['owner', '-created_at'],
+                name='contact_owner_created_idx'
+            ),
+        ]
 
     def __str__(self):
         """
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class DrfApiConfig(AppConfig):
+    name = 'drf_api'
+
+    def ready(self):
+        # Connect the database connection health checks and the query
+        # recorder of the request metrics
+        from . import db, instrumentation  # noqa: F401
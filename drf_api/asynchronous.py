@@ -0,0 +1,76 @@
+"""
+Async entry points for the read-heavy endpoints when serving over ASGI.
+
+Django 3.2 runs every sync view of an ASGI application in one shared
+thread (sync_to_async with thread_sensitive=True), so one slow database
+or Cloudinary call holds up every other request of the worker process.
+Django 3.2 has no async ORM and DRF views are sync, so async_view()
+runs the whole DRF view in a dedicated thread pool instead, letting
+requests proceed in parallel while the event loop stays free.
+
+Each pool thread has its own database connection; it is closed,
+recycled or health-checked around every request, as CONN_MAX_AGE and
+CONN_HEALTH_CHECKS prescribe, because the request_started and
+request_finished signals only handle the connection of the thread
+serving the signal.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from .db import prepare_connections
+
+_executor = None
+
+
+def executor():
+    """
+    Returns the thread pool the async views run in. Its size bounds the
+    number of database connections held by one worker process.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'ASYNC_VIEW_THREADS', 16),
+            thread_name_prefix='async-views',
+        )
+    return _executor
+
+
+def async_view(view):
+    """
+    Wraps a sync view (e.g. SomeAPIView.as_view()) into an async view
+    that runs it, including response rendering, in the thread pool.
+    """
+    def run(request, *args, **kwargs):
+        prepare_connections()
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+            return response
+        finally:
+            close_old_connections()
+
+    async def wrapper(request, *args, **kwargs):
+        return await sync_to_async(
+            run, thread_sensitive=False, executor=executor()
+        )(request, *args, **kwargs)
+
+    # Keep what Django and DRF read from the view function
+    for attribute in ('csrf_exempt', 'cls', 'initkwargs', 'view_class'):
+        if hasattr(view, attribute):
+            setattr(wrapper, attribute, getattr(view, attribute))
+    wrapper.__name__ = getattr(view, '__name__', 'view')
+    wrapper.__doc__ = view.__doc__
+    return wrapper
+
+
+def serving_view(view):
+    """
+    Returns the async version of the view when serving over ASGI
+    (SERVER_MODE 'asgi'), and the view itself otherwise.
+    """
+    if getattr(settings, 'SERVER_MODE', 'wsgi') == 'asgi':
+        return async_view(view)
+    return view
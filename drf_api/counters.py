@@ -0,0 +1,97 @@
+"""
+Helpers for the denormalized counter columns on Post, Profile,
+Hashtag and Comment.
+
+The counters are adjusted with atomic F() updates from model signals
+whenever a related row is created or deleted, and can be recomputed
+from scratch with the 'recount_counters' management command.
+"""
+from django.apps import apps as global_apps
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def adjust_counter(model, field, delta, **lookup):
+    """
+    Atomically adds delta to a counter field of the rows matching lookup.
+    Decrements never take a counter below zero.
+    """
+    if delta < 0:
+        lookup[f'{field}__gte'] = -delta
+    model.objects.filter(**lookup).update(**{field: F(field) + delta})
+
+
+def count_of(model, related_field, outer_field='pk'):
+    """
+    Builds a subquery counting the rows of model that point at the
+    outer row through related_field, defaulting to 0 when none do.
+    """
+    counts = model.objects.filter(
+        **{related_field: OuterRef(outer_field)}
+    ).order_by().values(related_field).annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(
+        Subquery(counts, output_field=IntegerField()), 0
+    )
+
+
+def recount_post_counters(apps=global_apps):
+    """
+    Recomputes the like and comment counters of every post.
+    Accepts an app registry so that migrations can pass their
+    historical models.
+    """
+    Post = apps.get_model('posts', 'Post')
+    Like = apps.get_model('likes', 'Like')
+    Comment = apps.get_model('comments', 'Comment')
+    Post.objects.update(
+        likes_count=count_of(Like, 'post'),
+        comments_count=count_of(Comment, 'post'),
+    )
+
+
+def recount_profile_counters(apps=global_apps):
+    """
+    Recomputes the post, follower and block counters of every profile.
+    """
+    Post = apps.get_model('posts', 'Post')
+    Profile = apps.get_model('profiles', 'Profile')
+    Follower = apps.get_model('followers', 'Follower')
+    Block = apps.get_model('blocks', 'Block')
+    Profile.objects.update(
+        posts_count=count_of(Post, 'owner', 'owner'),
+        followers_count=count_of(Follower, 'followed', 'owner'),
+        following_count=count_of(Follower, 'owner', 'owner'),
+        blocked_count=count_of(Block, 'target', 'owner'),
+        blocking_count=count_of(Block, 'owner', 'owner'),
+    )
+
+
+def recount_hashtag_counters(apps=global_apps):
+    """
+    Recomputes the usage counter of every hashtag.
+    """
+    Post = apps.get_model('posts', 'Post')
+    Hashtag = apps.get_model('hashtags', 'Hashtag')
+    Hashtag.objects.update(
+        posts_count=count_of(Post.hashtags.through, 'hashtag'),
+    )
+
+
+def recount_comment_counters(apps=global_apps):
+    """
+    Recomputes the reply counter of every comment.
+    """
+    Comment = apps.get_model('comments', 'Comment')
+    Comment.objects.update(replies_count=count_of(Comment, 'parent'))
+
+
+def recount_counters(apps=global_apps):
+    """
+    Recomputes every counter column from the related tables.
+    """
+    recount_post_counters(apps)
+    recount_profile_counters(apps)
+    recount_hashtag_counters(apps)
+    recount_comment_counters(apps)
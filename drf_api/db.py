@@ -0,0 +1,45 @@
+"""
+Database connection health checks.
+
+With persistent connections (CONN_MAX_AGE > 0) a connection can be
+dropped by the server, a pooler or the network while it sits idle
+between requests, and the next request would fail on its first query.
+Django 4.1 checks reused connections when the CONN_HEALTH_CHECKS
+database setting is True; this backports the check to Django 3.2.
+
+At the start of each request, after Django has closed the connections
+that are obsolete or broken, every connection that is still open and
+has CONN_HEALTH_CHECKS enabled is pinged once and closed if the ping
+fails, so the request reconnects instead of erroring.
+"""
+from django.core.signals import request_started
+from django.db import close_old_connections, connections
+
+
+def close_unhealthy_connections(**kwargs):
+    """
+    Closes the open connections with health checks enabled that no
+    longer respond. Connections inside a transaction are left alone.
+    """
+    for connection in connections.all():
+        if (
+            connection.connection is None
+            or connection.in_atomic_block
+            or not connection.settings_dict.get('CONN_HEALTH_CHECKS')
+        ):
+            continue
+        if not connection.is_usable():
+            connection.close()
+
+
+def prepare_connections():
+    """
+    Does what request_started does for the connections of the current
+    thread, for threads that serve requests outside of the handler's
+    thread (see drf_api/asynchronous.py).
+    """
+    close_old_connections()
+    close_unhealthy_connections()
+
+
+request_started.connect(close_unhealthy_connections)
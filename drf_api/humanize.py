@@ -0,0 +1,51 @@
+"""
+Relative timestamps ("3 minutes ago") computed from a given moment.
+
+Django's naturaltime filter reads the clock on every call, so a list
+rendering two timestamps per row reads it twice per row, and the rows
+of one response are described relative to slightly different moments.
+naturaltime() below is the same formatting with 'now' as an argument,
+so a whole response can be rendered relative to one moment.
+"""
+from datetime import date, datetime
+from django.contrib.humanize.templatetags.humanize import (
+    NaturalTimeFormatter
+)
+from django.utils import timezone
+from django.utils.timesince import timesince, timeuntil
+
+
+def naturaltime(value, now=None):
+    """
+    Returns the naturaltime filter's description of value, relative to
+    now (the current time if not given).
+    """
+    if not isinstance(value, date):
+        return value
+    if now is None:
+        now = timezone.now() if timezone.is_aware(value) else datetime.now()
+    strings = NaturalTimeFormatter.time_strings
+    if value < now:
+        tense, delta = 'past', now - value
+    else:
+        tense, delta = 'future', value - now
+    if delta.days != 0:
+        if tense == 'past':
+            text = timesince(
+                value, now, time_strings=NaturalTimeFormatter.past_substrings
+            )
+        else:
+            text = timeuntil(
+                value, now,
+                time_strings=NaturalTimeFormatter.future_substrings
+            )
+        return strings[f'{tense}-day'] % {'delta': text}
+    if delta.seconds == 0:
+        return strings['now']
+    if delta.seconds < 60:
+        unit, count = 'second', delta.seconds
+    elif delta.seconds < 60 * 60:
+        unit, count = 'minute', delta.seconds // 60
+    else:
+        unit, count = 'hour', delta.seconds // (60 * 60)
+    return strings[f'{tense}-{unit}'] % {'count': count}
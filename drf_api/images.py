@@ -0,0 +1,280 @@
+"""
+Image pipeline for post and profile uploads.
+
+Variants are generated by a background task (see taskqueue/), so the
+upload request returns as soon as the original is stored.
+
+Uploads are validated from their header only: Pillow's Image.open reads
+the format and dimensions lazily, so no pixel data is decoded to check
+them. After the instance is saved, the upload is decoded once (at a
+reduced scale for JPEGs, via draft mode), and resized and re-encoded to
+the thumbnail, feed and full variants in parallel on a shared thread
+pool. Pillow releases the GIL while resizing and encoding, so the
+variants are rendered concurrently.
+
+Variants are written to IMAGE_VARIANT_STORAGE (the default file storage
+unless configured, a local FileSystemStorage under test) and their URLs
+and sizes are stored in the instance's 'image_variants' field.
+
+Serializers expose the avatar, thumbnail, feed and full URLs of an image
+through image_urls(). Stored variants are used when present; otherwise
+the URLs are derived from the storage's transformation URL scheme
+(Cloudinary's '/upload/<transformation>/'), cached per image name.
+"""
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import get_storage_class
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image, ImageOps, features
+from rest_framework import serializers
+from taskqueue.registry import task
+
+# Bounding box of each variant, in pixels
+VARIANT_SIZES = {
+    'thumbnail': (320, 320),
+    'feed': (1080, 1080),
+    'full': (2048, 2048),
+}
+# Cloudinary delivery transformation for each URL variant
+TRANSFORMATIONS = {
+    'avatar': 'c_fill,g_face,w_80,h_80,f_auto,q_auto',
+    'thumbnail': 'c_limit,w_320,h_320,f_auto,q_auto',
+    'feed': 'c_limit,w_1080,h_1080,f_auto,q_auto',
+    'full': 'c_limit,w_2048,h_2048,f_auto,q_auto',
+}
+CLOUDINARY_UPLOAD_SEGMENT = '/upload/'
+MAX_UPLOAD_BYTES = 2 * 1024 * 1024
+MAX_DIMENSION = 4096
+QUALITY = 80
+
+_executor = None
+
+
+def variant_format():
+    """
+    Returns the (Pillow format, extension) variants are encoded as:
+    WebP when Pillow supports it, JPEG otherwise.
+    """
+    if getattr(settings, 'IMAGE_VARIANT_FORMAT', 'webp') == 'webp' and (
+        features.check('webp')
+    ):
+        return 'WEBP', 'webp'
+    return 'JPEG', 'jpg'
+
+
+def variant_storage():
+    """
+    Returns the storage the variants are written to.
+    """
+    storage_class = getattr(settings, 'IMAGE_VARIANT_STORAGE', None)
+    return get_storage_class(storage_class)()
+
+
+def executor():
+    """
+    Returns the shared thread pool that renders variants.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_VARIANT_WORKERS', 4),
+            thread_name_prefix='image-variants',
+        )
+    return _executor
+
+
+def image_dimensions(upload):
+    """
+    Returns (width, height) of an uploaded image from its header.
+    DRF's ImageField leaves the header-parsed image on the upload;
+    otherwise the file is opened lazily, without decoding its pixels.
+    """
+    image = getattr(upload, 'image', None)
+    if image is not None:
+        return image.size
+    position = upload.tell()
+    try:
+        with Image.open(upload) as image:
+            return image.size
+    finally:
+        upload.seek(position)
+
+
+def validate_image_upload(value):
+    """
+    Checks the size of an upload in bytes and its dimensions, reading
+    only the image header. Raises a ValidationError when too large.
+    """
+    if value.size > MAX_UPLOAD_BYTES:
+        raise serializers.ValidationError('Image size larger than 2MB!')
+    width, height = image_dimensions(value)
+    if height > MAX_DIMENSION:
+        raise serializers.ValidationError('Image height larger than 4096px!')
+    if width > MAX_DIMENSION:
+        raise serializers.ValidationError('Image width larger than 4096px!')
+    return value
+
+
+def decode_upload(upload):
+    """
+    Decodes an upload once, at the smallest scale that still covers the
+    largest variant, applying the EXIF orientation.
+    """
+    upload.seek(0)
+    with Image.open(upload) as image:
+        # Only JPEG supports draft mode, other formats ignore it
+        image.draft('RGB', max(VARIANT_SIZES.values()))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            has_alpha = (
+                image.mode in ('LA', 'PA')
+                or 'transparency' in image.info
+            )
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+        image.load()
+    return image
+
+
+def render_variant(image, size, image_format):
+    """
+    Resizes a copy of the image to fit the box and encodes it.
+    Returns the encoded bytes and the resulting (width, height).
+    """
+    variant = image.copy()
+    variant.thumbnail(size, Image.LANCZOS, reducing_gap=3.0)
+    if image_format == 'JPEG' and variant.mode != 'RGB':
+        variant = variant.convert('RGB')
+    buffer = io.BytesIO()
+    variant.save(buffer, image_format, quality=QUALITY, optimize=True)
+    return buffer.getvalue(), variant.size
+
+
+def generate_variants(upload, stem):
+    """
+    Renders every variant of the upload on the thread pool, writes them
+    to the variant storage as '<stem>_<variant>.<ext>' and returns a
+    {variant: {'url', 'width', 'height'}} dict.
+    """
+    image = decode_upload(upload)
+    image_format, extension = variant_format()
+    futures = {
+        name: executor().submit(render_variant, image, size, image_format)
+        for name, size in VARIANT_SIZES.items()
+    }
+    storage = variant_storage()
+    variants = {}
+    for name, future in futures.items():
+        data, (width, height) = future.result()
+        saved = storage.save(
+            f'{stem}_{name}.{extension}', ContentFile(data)
+        )
+        variants[name] = {
+            'url': storage.url(saved), 'width': width, 'height': height,
+        }
+    return variants
+
+
+def variant_stem(instance, field_name='image'):
+    """
+    Returns the storage path prefix for an instance's variants.
+    """
+    image_name = getattr(instance, field_name).name or ''
+    base = os.path.splitext(os.path.basename(image_name))[0] or 'image'
+    return f'variants/{instance._meta.model_name}/{instance.pk}/{base}'
+
+
+def process_image_upload(instance, upload, field_name='image'):
+    """
+    Generates the variants of a saved instance's uploaded image and
+    stores them in its 'image_variants' field. Uses an update query,
+    so the instance's save signals do not run a second time.
+    """
+    variants = generate_variants(upload, variant_stem(instance, field_name))
+    type(instance).objects.filter(pk=instance.pk).update(
+        image_variants=variants
+    )
+    instance.image_variants = variants
+    return variants
+
+
+@task(name='images.generate_variants')
+def generate_image_variants(app_label, model_name, pk, field_name='image'):
+    """
+    Background task: reads the stored image of an instance back from
+    storage and generates its variants.
+    """
+    model = apps.get_model(app_label, model_name)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not getattr(instance, field_name):
+        return None
+    with getattr(instance, field_name).open('rb') as stored:
+        return process_image_upload(instance, stored, field_name)
+
+
+class ImageVariantsMixin:
+    """
+    Serializer mixin that queues the generation of the image variants of
+    the instance after it is saved, whenever a new image was uploaded.
+    """
+    image_field_name = 'image'
+
+    def save(self, **kwargs):
+        upload = self.validated_data.get(self.image_field_name)
+        instance = super().save(**kwargs)
+        if self.image_field_name in self.validated_data:
+            # The image was replaced or reset, its old variants no
+            # longer apply; new ones are stored when the task runs
+            type(instance).objects.filter(pk=instance.pk).update(
+                image_variants={}
+            )
+            instance.image_variants = {}
+        if isinstance(upload, UploadedFile):
+            generate_image_variants.delay(
+                instance._meta.app_label,
+                instance._meta.model_name,
+                instance.pk,
+                self.image_field_name,
+            )
+        return instance
+
+
+@lru_cache(maxsize=4096)
+def transformed_urls(storage, name):
+    """
+    Returns (transformed, {variant: url}) for an image name, built from
+    the storage's URL once per name. Cloudinary URLs get the variant's
+    transformation; other storages serve the original for every variant
+    and transformed is False.
+    """
+    url = storage.url(name)
+    if CLOUDINARY_UPLOAD_SEGMENT not in url:
+        return False, {variant: url for variant in TRANSFORMATIONS}
+    base, path = url.split(CLOUDINARY_UPLOAD_SEGMENT, 1)
+    return True, {
+        variant: f'{base}{CLOUDINARY_UPLOAD_SEGMENT}{transformation}/{path}'
+        for variant, transformation in TRANSFORMATIONS.items()
+    }
+
+
+def image_urls(field_file, stored_variants=None):
+    """
+    Returns the avatar, thumbnail, feed and full URLs of an image field,
+    preferring the variants stored by the image pipeline. Without a
+    transformation scheme, the avatar falls back to the thumbnail.
+    """
+    if not field_file:
+        return None
+    transformed, urls = transformed_urls(field_file.storage, field_file.name)
+    urls = dict(urls)
+    stored_variants = stored_variants or {}
+    for variant, stored in stored_variants.items():
+        if variant in urls:
+            urls[variant] = stored['url']
+    if not transformed and 'thumbnail' in stored_variants:
+        urls['avatar'] = urls['thumbnail']
+    return urls
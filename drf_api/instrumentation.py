@@ -0,0 +1,225 @@
+"""
+Per-request query and timing instrumentation.
+
+RequestMetricsMiddleware collects, for every request:
+- the number of SQL queries and the time spent running them, through a
+  database execute wrapper installed on every new connection,
+- the time spent serializing and rendering, for views using
+  RequestMetricsMixin,
+- repeated query shapes: the same SQL with different parameters run
+  N_PLUS_ONE_THRESHOLD times or more, the signature of an N+1 pattern
+  such as a per-row lookup in a SerializerMethodField.
+
+The metrics are emitted as a Server-Timing header (when
+SERVER_TIMING_HEADER is on) and as one JSON log line per request on the
+'drf_api.requests' logger, at WARNING level when an N+1 pattern is
+found. They are held in a context variable, so queries run by the
+async views in their thread pool (see drf_api/asynchronous.py) are
+counted for the request too.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger('drf_api.requests')
+
+_metrics = ContextVar('request_metrics', default=None)
+
+# Placeholder lists of any length and numeric literals, so queries that
+# only differ in their parameters have the same shape
+PLACEHOLDER_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+NUMBER = re.compile(r'\b\d+\b')
+
+
+def query_shape(sql):
+    """
+    Returns the SQL with its parameter lists and numbers normalized.
+    """
+    return NUMBER.sub('N', PLACEHOLDER_LIST.sub('(...)', sql))
+
+
+class RequestMetrics:
+    """
+    Query count, timings in seconds and query shapes of one request.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.timings = Counter()
+        self.shapes = Counter()
+
+    def add_query(self, sql, elapsed):
+        self.queries += 1
+        self.timings['db'] += elapsed
+        self.shapes[query_shape(sql)] += 1
+
+    def repeated_queries(self):
+        """
+        Returns the query shapes run at least N_PLUS_ONE_THRESHOLD times.
+        """
+        threshold = getattr(settings, 'N_PLUS_ONE_THRESHOLD', 5)
+        return [
+            {'sql': shape, 'count': count}
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+    def server_timing(self, total):
+        """
+        Formats the metrics as a Server-Timing header value.
+        """
+        entries = [
+            f'db;dur={self.timings["db"] * 1000:.1f};'
+            f'desc="{self.queries} queries"'
+        ]
+        for name in ('serialize', 'render'):
+            if name in self.timings:
+                entries.append(f'{name};dur={self.timings[name] * 1000:.1f}')
+        entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
+
+
+def add_timing(name, elapsed):
+    """
+    Adds elapsed seconds to the named timing of the current request.
+    """
+    metrics = _metrics.get()
+    if metrics is not None:
+        metrics.timings[name] += elapsed
+
+
+@contextmanager
+def timed(name):
+    """
+    Adds the time spent in the block to the named timing of the current
+    request, if it is being instrumented.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(name, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper timing every query of an instrumented
+    request.
+    """
+    metrics = _metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+class RequestMetricsMiddleware:
+    """
+    Collects the metrics of each request and reports them in the
+    Server-Timing header and the 'drf_api.requests' log.
+    Works in both sync and async chains, so under ASGI it does not
+    force the whole chain onto Django's single thread-sensitive thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, 'REQUEST_METRICS', True):
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        return self.report(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'REQUEST_METRICS', True):
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        return self.report(request, response, metrics)
+
+    def report(self, request, response, metrics):
+        total = time.perf_counter() - metrics.started
+        if getattr(settings, 'SERVER_TIMING_HEADER', False):
+            response['Server-Timing'] = metrics.server_timing(total)
+        self.log(request, response, metrics, total)
+        return response
+
+    def log(self, request, response, metrics, total):
+        repeated = metrics.repeated_queries()
+        match = request.resolver_match
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.func.__name__ if match else None,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(metrics.timings['db'] * 1000, 1),
+            'serialize_ms': round(metrics.timings['serialize'] * 1000, 1),
+            'render_ms': round(metrics.timings['render'] * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+            'repeated_queries': repeated,
+        }
+        level = logging.WARNING if repeated else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps(record), extra={'metrics': record})
+
+
+class RequestMetricsMixin:
+    """
+    View mixin timing serialization and rendering for the request
+    metrics. Read serializers are evaluated, and their data cached, as
+    soon as they are created, which is what the generic views do next.
+    """
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if args and 'data' not in kwargs:
+            with timed('serialize'):
+                serializer.data
+        return serializer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if _metrics.get() is not None:
+            # The response is rendered right after the view returns
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: add_timing(
+                    'render', time.perf_counter() - started
+                )
+            )
+        return response
@@ -0,0 +1,193 @@
+"""
+Pagination classes for the feed-style list endpoints.
+
+Page-number pagination runs an OFFSET query plus a COUNT(*) over the
+whole filtered queryset on every request, which gets slower the deeper
+a client pages. Cursor pagination seeks on the ordering columns
+instead, so every page costs the same and no count query is made.
+"""
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import (
+    BasePagination,
+    Cursor,
+    CursorPagination,
+    PageNumberPagination,
+)
+
+
+def get_limit(request, default, maximum):
+    """
+    Reads the 'limit' query parameter of unpaginated top-N endpoints,
+    clamped to 1..maximum.
+    """
+    try:
+        limit = int(request.query_params.get('limit', default))
+    except ValueError:
+        limit = default
+    return max(1, min(limit, maximum))
+
+
+# Fields that never change once a row is written. Cursors store the
+# position of the last row in the first ordering field, so ordering by
+# a mutable column such as likes_count would skip or repeat rows whose
+# value changes between two pages.
+CURSOR_FIELDS = {'created_at', 'id'}
+
+
+def is_cursor_ordering(ordering):
+    """
+    Checks if every field of the ordering can be used as a cursor.
+    """
+    return all(field.lstrip('-') in CURSOR_FIELDS for field in ordering)
+
+
+def requested_ordering(request, queryset, view):
+    """
+    Returns the ordering chosen by the view's OrderingFilter,
+    or None if the view has no ordering filter or none was requested.
+    """
+    for backend in getattr(view, 'filter_backends', []):
+        if issubclass(backend, OrderingFilter):
+            return backend().get_ordering(request, queryset, view)
+    return None
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (-created_at, -id), the default ordering of
+    posts, comments, likes and followers. An ordering requested through
+    the view's OrderingFilter is honoured instead when it only uses
+    immutable fields (see CURSOR_FIELDS).
+    """
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = requested_ordering(request, queryset, view)
+        if not ordering or not is_cursor_ordering(ordering):
+            return self.ordering
+        ordering = tuple(ordering)
+        if 'id' not in ordering and '-id' not in ordering:
+            ordering += ('-id',)
+        return ordering
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination over (created_at, id) keys returned by a function
+    instead of a queryset, for lists merged from several tables (see
+    feeds/fanout.py). The cursor holds the key of the last row shown.
+    """
+
+    def encode_position(self, key):
+        created_at, pk = key
+        return f'{created_at.isoformat()}_{pk}'
+
+    def decode_position(self, position):
+        created_at, _, pk = position.rpartition('_')
+        created_at = parse_datetime(created_at)
+        if created_at is None or not pk.isdigit():
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, int(pk)
+
+    def paginate_keys(self, load_keys, request):
+        """
+        Returns the keys of the requested page, newest first.
+        load_keys(limit, position, reverse) must return up to limit keys
+        after position (None for the first page), newest first, or
+        oldest first when reverse.
+        """
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        self.position = None
+        if cursor is not None and cursor.position is not None:
+            self.position = self.decode_position(cursor.position)
+        reverse = cursor is not None and cursor.reverse
+        keys = list(load_keys(self.page_size + 1, self.position, reverse))
+        has_more = len(keys) > self.page_size
+        self.keys = keys[:self.page_size]
+        if reverse:
+            self.keys.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        if self.has_next or self.has_previous:
+            self.display_page_controls = True
+        return self.keys
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        key = self.keys[-1] if self.keys else self.position
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=False, position=self.encode_position(key)
+        ))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        key = self.keys[0] if self.keys else self.position
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=True, position=self.encode_position(key)
+        ))
+
+
+class CursorOrPageNumberPagination(BasePagination):
+    """
+    Page-number pagination by default so existing clients keep working,
+    switching to cursor pagination when the client passes a 'cursor'
+    or 'pagination=cursor' query parameter.
+    Orderings on mutable counters (e.g. 'likes_count') or across
+    relations (e.g. 'likes__created_at') cannot be used as a cursor
+    position and always use page numbers.
+    """
+    page_number_class = PageNumberPagination
+    cursor_class = CreatedAtCursorPagination
+    mode_query_param = 'pagination'
+
+    def __init__(self):
+        self.paginator = self.page_number_class()
+
+    def use_cursor(self, queryset, request, view):
+        """
+        Checks if the request asked for cursor pagination and its
+        ordering can be used as a cursor position.
+        """
+        params = request.query_params
+        if (
+            self.cursor_class.cursor_query_param not in params
+            and params.get(self.mode_query_param) != 'cursor'
+        ):
+            return False
+        ordering = requested_ordering(request, queryset, view) or ()
+        return is_cursor_ordering(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(queryset, request, view):
+            self.paginator = self.cursor_class()
+        else:
+            self.paginator = self.page_number_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.paginator.get_paginated_response_schema(schema)
+
+    @property
+    def display_page_controls(self):
+        return self.paginator.display_page_controls
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_schema_fields(self, view):
+        return self.paginator.get_schema_fields(view)
+
+    def get_schema_operation_parameters(self, view):
+        return self.paginator.get_schema_operation_parameters(view)
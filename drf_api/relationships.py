@@ -0,0 +1,85 @@
+"""
+Resolves the relationships between the requesting user (the viewer)
+and a batch of other users, so serializers can render relationship
+fields for a whole page without querying once per row.
+
+relationship_status() answers the same for lists of profile and post
+ids, for the '/relationships/' endpoint, so clients can refresh the
+follow, block and like state of objects they already hold.
+"""
+from blocks.models import Block
+from followers.models import Follower
+from likes.models import Like
+
+# Maximum number of profile ids and of post ids per status request
+MAX_STATUS_IDS = 100
+
+
+class ViewerRelationships:
+    """
+    Follow and block edges from the viewer to a set of users.
+    Loads each relationship type with a single query and exposes
+    dictionaries mapping the other user's id to the relationship id.
+    """
+    def __init__(self, user, user_ids):
+        self.user_ids = set(user_ids)
+        self.following = {}
+        self.blocking = {}
+        if user.is_authenticated and self.user_ids:
+            self.following = dict(
+                Follower.objects.filter(
+                    owner=user, followed__in=self.user_ids
+                ).values_list('followed', 'id')
+            )
+            self.blocking = dict(
+                Block.objects.filter(
+                    owner=user, target__in=self.user_ids
+                ).values_list('target', 'id')
+            )
+
+    def covers(self, user_id):
+        """
+        Checks if the relationships for the given user have been loaded.
+        """
+        return user_id in self.user_ids
+
+
+def relationship_status(user, profile_ids=(), post_ids=()):
+    """
+    Returns the viewer's follow and block ids for each profile id and
+    like id for each post id, None where there is no relationship:
+    {'profiles': {id: {'following_id', 'blocking_id'}},
+     'posts': {id: {'like_id'}}}
+    Takes one query per relationship type, through the (owner, ...)
+    unique indexes, and none for an anonymous viewer.
+    """
+    following, blocking, likes = {}, {}, {}
+    if user.is_authenticated and profile_ids:
+        following = dict(
+            Follower.objects.filter(
+                owner=user, followed__profile__in=profile_ids
+            ).order_by().values_list('followed__profile', 'id')
+        )
+        blocking = dict(
+            Block.objects.filter(
+                owner=user, target__profile__in=profile_ids
+            ).order_by().values_list('target__profile', 'id')
+        )
+    if user.is_authenticated and post_ids:
+        likes = dict(
+            Like.objects.filter(
+                owner=user, post__in=post_ids
+            ).order_by().values_list('post', 'id')
+        )
+    return {
+        'profiles': {
+            profile_id: {
+                'following_id': following.get(profile_id),
+                'blocking_id': blocking.get(profile_id),
+            }
+            for profile_id in profile_ids
+        },
+        'posts': {
+            post_id: {'like_id': likes.get(post_id)} for post_id in post_ids
+        },
+    }
@@ -0,0 +1,115 @@
+"""
+Response caching for anonymous read endpoints.
+
+Anonymous GET responses are cached per view and per query string
+(filters, search, ordering and page), for a per-view timeout.
+Every cached view belongs to one or more namespaces (e.g. 'posts').
+Each namespace has a generation number that is part of the cache key;
+model signals bump the generation when related rows change, which
+invalidates all cached pages of the namespace at once. This works with
+any cache backend, as no key patterns have to be deleted.
+"""
+import hashlib
+import time
+from functools import partial
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from rest_framework.response import Response
+
+
+def generation_key(namespace):
+    return f'response-cache:generation:{namespace}'
+
+
+def get_generations(namespaces):
+    """
+    Returns the current generation of each namespace, starting unknown
+    namespaces at the current time so they never reuse old keys.
+    """
+    keys = [generation_key(namespace) for namespace in namespaces]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            generations[key] = time.time_ns()
+            cache.add(key, generations[key], None)
+    return [generations[key] for key in keys]
+
+
+def invalidate(*namespaces):
+    """
+    Bumps the generation of each namespace, invalidating its responses.
+    """
+    for namespace in namespaces:
+        key = generation_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate_on_change(sender, *namespaces):
+    """
+    Invalidates the namespaces whenever a sender instance is saved or
+    deleted, or a many-to-many relation through sender changes.
+    """
+    def handler(sender, **kwargs):
+        invalidate(*namespaces)
+
+    post_save.connect(handler, sender=sender, weak=False)
+    post_delete.connect(handler, sender=sender, weak=False)
+    m2m_changed.connect(handler, sender=sender, weak=False)
+
+
+class AnonymousResponseCacheMixin:
+    """
+    Mixin for list views that caches responses to anonymous GET requests.
+    Set 'cache_namespaces' to the namespaces invalidating the view and
+    'cache_timeout' to the number of seconds a response is cached.
+    The timeout can be overridden per view class in the
+    RESPONSE_CACHE_TIMEOUTS setting.
+    """
+    cache_namespaces = ()
+    cache_timeout = 60
+
+    def get_cache_timeout(self):
+        timeouts = getattr(settings, 'RESPONSE_CACHE_TIMEOUTS', {})
+        return timeouts.get(type(self).__name__, self.cache_timeout)
+
+    def get_response_cache_key(self, request):
+        """
+        Builds the cache key from the view, the namespace generations,
+        the path and the sorted query parameters.
+        """
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        generations = get_generations(self.cache_namespaces)
+        digest = hashlib.md5(
+            f'{request.path}?{query}|{generations}'.encode()
+        ).hexdigest()
+        return f'response-cache:{type(self).__name__}:{digest}'
+
+    def cached_response(self, request, respond, shared=False):
+        """
+        Returns the cached response data for the request, or calls
+        respond() and caches its data if the response is a 200.
+        Only anonymous requests are cached unless shared is True, for
+        responses that do not depend on the user.
+        """
+        timeout = self.get_cache_timeout()
+        if not timeout or (request.user.is_authenticated and not shared):
+            return respond()
+
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = respond()
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request, partial(super().list, request, *args, **kwargs)
+        )
@@ -1,5 +1,7 @@
 from dj_rest_auth.serializers import UserDetailsSerializer
+from django.utils import timezone
 from rest_framework import serializers
+from .humanize import naturaltime
 
 
 class CurrentUserSerializer(UserDetailsSerializer):
@@ -10,3 +12,16 @@ class CurrentUserSerializer(UserDetailsSerializer):
         fields = UserDetailsSerializer.Meta.fields + (
             'profile_id', 'profile_image'
         )
+
+
+class NaturalTimeField(serializers.ReadOnlyField):
+    """
+    Read-only field rendering a datetime like the naturaltime filter.
+    Every row of a response is rendered relative to the same moment,
+    taken once and kept in the serializer context as 'now'.
+    """
+    def to_representation(self, value):
+        context = self.context
+        if 'now' not in context:
+            context['now'] = timezone.now()
+        return naturaltime(value, context['now'])
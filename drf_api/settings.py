@@ -76,6 +76,11 @@ INSTALLED_APPS = [
     'contacts',
     'blocks',
     'category',
+    'benchmarks',
+    'feeds',
+    'taskqueue',
+    'recommendations',
+    'drf_api',
 
 ]
 
@@ -83,6 +88,7 @@ SITE_ID = 1
 
 # Middleware
 MIDDLEWARE = [
+    'drf_api.instrumentation.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -116,21 +122,115 @@ TEMPLATES = [
 # WSGI application
 WSGI_APPLICATION = 'drf_api.wsgi.application'
 
+
+def env_flag(name, default=False):
+    """
+    Reads a boolean environment variable ('1', 'true', 'yes' or 'on').
+    """
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
+# - DB_CONN_MAX_AGE: seconds a connection is reused across requests
+#   (default 600 in production, 0 in development: one per request).
+# - DB_CONN_HEALTH_CHECKS: ping a reused connection at the start of each
+#   request and reconnect if it was dropped (default on, drf_api/db.py).
+# - DB_POOLER=transaction: running behind a transaction-mode pooler such
+#   as PgBouncer, where consecutive transactions may use different
+#   server connections, so server-side cursors (used by .iterator())
+#   are disabled. DB_DISABLE_SERVER_SIDE_CURSORS overrides this.
+# - DB_CONNECT_TIMEOUT: seconds to wait for a new Postgres connection.
+DB_POOLER = os.environ.get('DB_POOLER', '')
 if 'DEV' in os.environ:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
 
         }
     }
 else:
     DATABASES = {
-        'default': dj_database_url.parse(os.environ.get("DATABASE_URL"))
+        'default': dj_database_url.parse(
+            os.environ.get("DATABASE_URL"),
+            conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        )
 
     }
+    DATABASES['default'].setdefault('OPTIONS', {})['connect_timeout'] = int(
+        os.environ.get('DB_CONNECT_TIMEOUT', 5)
+    )
+DATABASES['default'].update(
+    CONN_HEALTH_CHECKS=env_flag('DB_CONN_HEALTH_CHECKS', True),
+    DISABLE_SERVER_SIDE_CURSORS=env_flag(
+        'DB_DISABLE_SERVER_SIDE_CURSORS', DB_POOLER == 'transaction'
+    ),
+)
+
+# Caches
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Set CACHE_URL to choose the backend:
+# - locmem:// (default) per-process memory
+# - file:///path/to/dir shared between processes on one machine
+# - redis://host:port/db or rediss://... (requires django-redis)
+# - memcached://host:port (requires pymemcache)
+
+
+def parse_cache_url(url):
+    """
+    Translates a CACHE_URL into a Django cache configuration.
+    """
+    scheme, _, location = url.partition('://')
+    if scheme == 'locmem':
+        return {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': location,
+        }
+    if scheme == 'file':
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        }
+    if scheme in ('redis', 'rediss'):
+        return {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': url,
+        }
+    if scheme == 'memcached':
+        return {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': location,
+        }
+    if scheme == 'dummy':
+        return {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+    raise ValueError(f'Unsupported CACHE_URL scheme: {scheme}')
+
+
+CACHES = {
+    'default': parse_cache_url(
+        os.environ.get('CACHE_URL', 'locmem://')
+    )
+}
+# Whether every worker process sees the same cache. A per-process cache
+# is only invalidated in the process that made the change, so state
+# that must not go stale for long is kept for a few seconds instead
+SHARED_CACHE = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Seconds anonymous list responses are cached, per view class.
+# Views not listed here use their own default.
+RESPONSE_CACHE_TIMEOUTS = {
+    view: int(os.environ[f'{view.upper()}_CACHE_TIMEOUT'])
+    for view in ('PostList', 'ProfileList', 'CategoryList', 'HashtagViewSet')
+    if f'{view.upper()}_CACHE_TIMEOUT' in os.environ
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -191,6 +291,15 @@ MEDIA_URL = '/media/'   # Define Media Storage
 # Define Default File Storage to Cloudinary
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
+# Resized post and profile image variants (see drf_api/images.py).
+# Stored with the default file storage unless IMAGE_VARIANT_STORAGE is
+# set
+IMAGE_VARIANT_STORAGE = os.environ.get(
+    'IMAGE_VARIANT_STORAGE', DEFAULT_FILE_STORAGE
+)
+IMAGE_VARIANT_FORMAT = os.environ.get('IMAGE_VARIANT_FORMAT', 'webp')
+IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS', 4))
+
 # CORS and CSRF settings
 CORS_ALLOW_HEADERS = list(default_headers)
 CORS_ALLOW_METHODS = list(default_methods)
@@ -232,6 +341,82 @@ if 'DEV' not in os.environ:
     ]
 
 
+# Seconds a user's set of blocked user ids stays cached. The set is
+# also invalidated whenever one of the user's blocks changes, but with a
+# per-process cache only in the process handling the change, so other
+# workers could keep showing a blocked user until it expires.
+BLOCK_CACHE_TIMEOUT = int(os.environ.get(
+    'BLOCK_CACHE_TIMEOUT', 60 * 60 if SHARED_CACHE else 5
+))
+
+# Seconds a user's cached following and follower id arrays are kept.
+# They are replaced once one of the user's follows changes, but with a
+# per-process cache only in the process handling the change.
+FOLLOW_GRAPH_CACHE_TIMEOUT = int(os.environ.get(
+    'FOLLOW_GRAPH_CACHE_TIMEOUT', 24 * 60 * 60 if SHARED_CACHE else 60
+))
+
+# Materialized home feed: posts by users with more followers than
+# FEED_FANOUT_LIMIT are read at request time instead of fanned out,
+# and FEED_BACKFILL_SIZE recent posts are added when following a user
+FEED_FANOUT_LIMIT = int(os.environ.get('FEED_FANOUT_LIMIT', 1000))
+FEED_BACKFILL_SIZE = int(os.environ.get('FEED_BACKFILL_SIZE', 50))
+
+# Number of "who to follow" recommendations stored per user by the
+# compute_recommendations command, and the most the endpoint returns
+RECOMMENDATIONS_PER_USER = int(
+    os.environ.get('RECOMMENDATIONS_PER_USER', 20)
+)
+
+# Request metrics (drf_api/instrumentation.py): query count, DB,
+# serializer and render time per request, logged as JSON on the
+# 'drf_api.requests' logger at REQUEST_LOG_LEVEL, and returned in a
+# Server-Timing header when SERVER_TIMING_HEADER is on. Query shapes
+# repeated N_PLUS_ONE_THRESHOLD times in a request are logged as a
+# warning.
+REQUEST_METRICS = env_flag('REQUEST_METRICS', True)
+SERVER_TIMING_HEADER = env_flag('SERVER_TIMING_HEADER', DEBUG)
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 5))
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'drf_api.requests': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+# Level of the request metrics log while the tests run (drf_api/testing.py)
+TEST_RUNNER = 'drf_api.testing.TestRunner'
+TEST_REQUEST_LOG_LEVEL = os.environ.get('TEST_REQUEST_LOG_LEVEL', 'WARNING')
+
+# 'wsgi' or 'asgi', see gunicorn.conf.py. Over ASGI the hottest read
+# views run in a pool of ASYNC_VIEW_THREADS threads per worker process
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi')
+ASYNC_VIEW_THREADS = int(os.environ.get('ASYNC_VIEW_THREADS', 16))
+
+# Background tasks (see taskqueue/). In production tasks are queued in
+# the database and run by 'python manage.py run_tasks'; in development
+# they run immediately in the request
+TASKS_BACKEND = os.environ.get(
+    'TASKS_BACKEND',
+    'taskqueue.backends.ImmediateBackend' if 'DEV' in os.environ
+    else 'taskqueue.backends.DatabaseBackend'
+)
+# Modules outside the apps' tasks.py that define tasks
+TASKS_MODULES = ['drf_api.images']
+# Seconds a task may stay running before it is assumed that its worker
+# died and it is queued again
+TASK_VISIBILITY_TIMEOUT = int(
+    os.environ.get('TASK_VISIBILITY_TIMEOUT', 15 * 60)
+)
+
+
 # dj-rest-auth settings
 REST_USE_JWT = True               # To enable token authentication
 JWT_AUTH_COOKIE = 'my-app-auth'   # To ensure tokens sent over HTTPS only
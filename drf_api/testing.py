@@ -0,0 +1,26 @@
+"""
+Test runner for the project, set as TEST_RUNNER in settings.py, so both
+'python manage.py test' and test_runner.py use it.
+
+It lowers the 'drf_api.requests' logger to TEST_REQUEST_LOG_LEVEL while
+the tests run, so the per-request metric lines do not flood the output.
+Tests checking those lines capture them with assertLogs, which sets its
+own level.
+"""
+import logging
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+request_logger = logging.getLogger('drf_api.requests')
+
+
+class TestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.request_log_level = request_logger.level
+        request_logger.setLevel(settings.TEST_REQUEST_LOG_LEVEL)
+
+    def teardown_test_environment(self, **kwargs):
+        request_logger.setLevel(self.request_log_level)
+        super().teardown_test_environment(**kwargs)
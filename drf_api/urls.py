@@ -15,7 +15,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from .views import root_route, logout_route
+from .views import root_route, logout_route, relationships_route
 
 urlpatterns = [
     path('', root_route),
@@ -35,5 +35,8 @@ urlpatterns = [
     path('', include('contacts.urls')),
     path('', include('blocks.urls')),
     path('', include('category.urls')),
+    path('', include('feeds.urls')),
+    path('', include('recommendations.urls')),
+    path('relationships/', relationships_route),
 
 ]
@@ -1,5 +1,8 @@
+from django.db.models import BigIntegerField
 from rest_framework.decorators import api_view
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from .relationships import MAX_STATUS_IDS, relationship_status
 from .settings import (
     JWT_AUTH_COOKIE,
     JWT_AUTH_REFRESH_COOKIE,
@@ -38,3 +41,37 @@ def logout_route(request):
         secure=JWT_AUTH_SECURE,
     )
     return response
+
+
+def id_list(request, name):
+    """
+    Reads a list of ids from a query parameter given as comma-separated
+    values ('?posts=1,2'), repeated ('?posts=1&posts=2') or both.
+    """
+    values = [
+        value.strip()
+        for param in request.query_params.getlist(name)
+        for value in param.split(',') if value.strip()
+    ]
+    error = {name: 'Must be a comma-separated list of ids.'}
+    try:
+        ids = list(dict.fromkeys(int(value) for value in values))
+    except ValueError:
+        raise ValidationError(error)
+    # Out of range ids would fail in the database instead of matching
+    if any(not 0 < id_ <= BigIntegerField.MAX_BIGINT for id_ in ids):
+        raise ValidationError(error)
+    if len(ids) > MAX_STATUS_IDS:
+        raise ValidationError({name: f'At most {MAX_STATUS_IDS} ids.'})
+    return ids
+
+
+@api_view()
+def relationships_route(request):
+    """
+    Returns the logged in user's following and blocking ids for the
+    profiles in '?profiles=' and like ids for the posts in '?posts='.
+    """
+    return Response(relationship_status(
+        request.user, id_list(request, 'profiles'), id_list(request, 'posts')
+    ))
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class FeedsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'feeds'
+
+    def ready(self):
+        # Connect the fan-out signal handlers
+        from . import signals  # noqa: F401
@@ -0,0 +1,202 @@
+"""
+Fan-out logic for the materialized home feed.
+
+New posts are written to the feeds of the owner's followers when they
+are created (fan-out on write). Users with more followers than
+FEED_FANOUT_LIMIT are skipped, as writing one row per follower would
+make posting slow; their posts are read at request time instead
+(fan-out on read) and merged into the feed by home_feed_keys().
+When such a user drops back to FEED_FANOUT_LIMIT followers, their
+recent posts are written to their followers' feeds so they do not
+disappear from them.
+"""
+from django.conf import settings
+from blocks.models import Block, get_blocked_ids
+from followers.models import Follower
+from posts.models import Post
+from profiles.models import Profile
+from .models import FeedEntry
+
+BATCH_SIZE = 500
+
+
+def fanout_limit():
+    """
+    Number of followers above which a user's posts are not fanned out.
+    """
+    return getattr(settings, 'FEED_FANOUT_LIMIT', 1000)
+
+
+def backfill_size():
+    """
+    Number of recent posts added to a feed when a user is followed.
+    """
+    return getattr(settings, 'FEED_BACKFILL_SIZE', 50)
+
+
+def is_pull_author(user_id):
+    """
+    Checks if the user has too many followers for fan-out on write.
+    """
+    return Profile.objects.filter(
+        owner=user_id, followers_count__gt=fanout_limit()
+    ).exists()
+
+
+def recent_posts(author_id):
+    """
+    Returns (id, created_at) pairs of the author's most recent posts.
+    """
+    return list(
+        Post.objects.filter(owner=author_id).order_by(
+            '-created_at'
+        ).values_list('id', 'created_at')[:backfill_size()]
+    )
+
+
+def add_entries(owner_ids, posts):
+    """
+    Inserts a feed entry for every owner and (post id, created_at) pair,
+    skipping existing entries.
+    """
+    FeedEntry.objects.bulk_create(
+        [
+            FeedEntry(
+                owner_id=owner_id, post_id=post_id,
+                post_created_at=post_created_at,
+            )
+            for owner_id in owner_ids
+            for post_id, post_created_at in posts
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out_post(post):
+    """
+    Writes the post to the feed of each follower of its owner, except
+    followers who block the owner.
+    """
+    if is_pull_author(post.owner_id):
+        return
+    blockers = Block.objects.filter(target=post.owner_id).values('owner')
+    follower_ids = Follower.objects.filter(
+        followed=post.owner_id
+    ).exclude(owner__in=blockers).values_list('owner', flat=True)
+    add_entries(follower_ids.iterator(), [(post.id, post.created_at)])
+
+
+def backfill_author(user_id, author_id):
+    """
+    Adds the author's most recent posts to the user's feed, e.g. after
+    the user follows or unblocks the author.
+    """
+    if is_pull_author(author_id):
+        return
+    if Block.objects.filter(owner=user_id, target=author_id).exists():
+        return
+    add_entries([user_id], recent_posts(author_id))
+
+
+def crossed_under_limit(author_id):
+    """
+    Checks if the user has just dropped to FEED_FANOUT_LIMIT followers,
+    so their posts are no longer read at request time.
+    """
+    return Profile.objects.filter(
+        owner=author_id, followers_count=fanout_limit()
+    ).exists()
+
+
+def backfill_followers(author_id):
+    """
+    Adds the author's most recent posts to the feeds of all of their
+    followers, except followers who block the author.
+    """
+    if is_pull_author(author_id):
+        return
+    blockers = Block.objects.filter(target=author_id).values('owner')
+    follower_ids = Follower.objects.filter(
+        followed=author_id
+    ).exclude(owner__in=blockers).values_list('owner', flat=True)
+    add_entries(follower_ids.iterator(), recent_posts(author_id))
+
+
+def remove_author(user_id, author_id):
+    """
+    Removes all of the author's posts from the user's feed.
+    """
+    FeedEntry.objects.filter(owner=user_id, post__owner=author_id).delete()
+
+
+def seek(queryset, created_field, id_field, position, reverse):
+    """
+    Orders the queryset newest first by (created_field, id_field), or
+    oldest first when reverse, starting after position, a (created_at,
+    id) pair or None. Returns the (created_at, id) pairs.
+    """
+    if position is not None:
+        created_at, post_id = position
+        # Rows at the position's time are kept only past its id
+        up_to, back_to = ('gte', 'lte') if reverse else ('lte', 'gte')
+        queryset = queryset.filter(
+            **{f'{created_field}__{up_to}': created_at}
+        ).exclude(**{
+            created_field: created_at, f'{id_field}__{back_to}': post_id,
+        })
+    sign = '' if reverse else '-'
+    return queryset.order_by(
+        f'{sign}{created_field}', f'{sign}{id_field}'
+    ).values_list(created_field, id_field)
+
+
+def home_feed_entries(user, limit, position=None, reverse=False):
+    """
+    Returns one page of the user's materialized feed entries as
+    (post created_at, post id) pairs, read in order from the
+    feed_owner_post_idx index.
+    """
+    return seek(
+        FeedEntry.objects.filter(owner=user),
+        'post_created_at', 'post_id', position, reverse,
+    )[:limit]
+
+
+def home_feed_pulled(user, limit, position=None, reverse=False):
+    """
+    Returns one page of the posts of followed users that are read at
+    request time because they have too many followers, as (created_at,
+    id) pairs.
+    """
+    pull_authors = Follower.objects.filter(
+        owner=user,
+        followed__profile__followers_count__gt=fanout_limit(),
+    ).exclude(followed__in=get_blocked_ids(user)).values('followed')
+    return seek(
+        Post.objects.filter(owner__in=pull_authors),
+        'created_at', 'id', position, reverse,
+    )[:limit]
+
+
+def home_feed_keys(user, limit, position=None, reverse=False):
+    """
+    Returns up to limit (created_at, post id) pairs of the posts in the
+    user's home feed after position, newest first (oldest first when
+    reverse): the materialized entries merged with the pulled posts.
+    """
+    keys = set(home_feed_entries(user, limit, position, reverse))
+    keys.update(home_feed_pulled(user, limit, position, reverse))
+    return sorted(keys, reverse=not reverse)[:limit]
+
+
+def rebuild_feed(user_id):
+    """
+    Rebuilds the user's feed from scratch out of their current follows.
+    """
+    FeedEntry.objects.filter(owner=user_id).delete()
+    followed_ids = Follower.objects.filter(
+        owner=user_id
+    ).values_list('followed', flat=True)
+    for author_id in followed_ids:
+        backfill_author(user_id, author_id)
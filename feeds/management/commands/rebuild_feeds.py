@@ -0,0 +1,23 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from feeds.fanout import rebuild_feed
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized home feeds from the current follows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Only rebuild the feeds of these users'
+        )
+
+    def handle(self, *args, **kwargs):
+        users = User.objects.all()
+        if kwargs['usernames']:
+            users = users.filter(username__in=kwargs['usernames'])
+        count = 0
+        for user_id in users.values_list('id', flat=True).iterator():
+            rebuild_feed(user_id)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} feeds.'))
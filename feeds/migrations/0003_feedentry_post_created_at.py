@@ -0,0 +1,48 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:12
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_post_created_at(apps, schema_editor):
+    FeedEntry = apps.get_model('feeds', 'FeedEntry')
+    Post = apps.get_model('posts', 'Post')
+    FeedEntry.objects.update(post_created_at=Subquery(
+        Post.objects.filter(pk=OuterRef('post')).values('created_at')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0003_post_counters'),
+        ('feeds', '0002_feedentry_feed_owner_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedentry',
+            name='post_created_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(
+            copy_post_created_at, migrations.RunPython.noop
+        ),
+        migrations.AlterField(
+            model_name='feedentry',
+            name='post_created_at',
+            field=models.DateTimeField(),
+        ),
+        migrations.AlterModelOptions(
+            name='feedentry',
+            options={'ordering': ['-post_created_at', '-post']},
+        ),
+        migrations.RemoveIndex(
+            model_name='feedentry',
+            name='feed_owner_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['owner', '-post_created_at', '-post'], name='feed_owner_post_idx'),
+        ),
+    ]
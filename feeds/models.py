@@ -0,0 +1,36 @@
+from django.db import models
+from django.contrib.auth.models import User
+from posts.models import Post
+
+
+class FeedEntry(models.Model):
+    """
+    Materialized home feed: one row per post in a user's feed.
+    'owner' is the User whose feed the entry belongs to and 'post' is
+    a Post by a user they follow. Rows are written when a post is
+    created (fan-out on write) and when follows and blocks change.
+    'post_created_at' copies the post's creation time, so a page of a
+    feed is read from this table's index alone, in feed order.
+    """
+    owner = models.ForeignKey(
+        User, related_name='feed_entries', on_delete=models.CASCADE
+    )
+    post = models.ForeignKey(
+        Post, related_name='feed_entries', on_delete=models.CASCADE
+    )
+    post_created_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-post_created_at', '-post']
+        unique_together = ['owner', 'post']
+        # Feeds are paged newest first by (post_created_at, post)
+        indexes = [
+            models.Index(
+                fields=['owner', '-post_created_at', '-post'],
+                name='feed_owner_post_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.owner} {self.post}'
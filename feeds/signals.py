@@ -0,0 +1,63 @@
+"""
+Signal handlers keeping the materialized home feeds in step with
+posts, follows and blocks. Connected in FeedsConfig.ready().
+Writing entries is queued as a background task; removing them is a
+single delete and stays in the request, so unfollowed or blocked
+posts disappear at once.
+"""
+from django.db.models.signals import post_delete, post_save
+from blocks.models import Block
+from followers.models import Follower
+from posts.models import Post
+from .fanout import crossed_under_limit, remove_author
+from .tasks import backfill_author, backfill_followers, fan_out_post
+
+
+def post_created(sender, instance, created, **kwargs):
+    """
+    Fan a new post out to the feeds of its owner's followers.
+    """
+    if created:
+        fan_out_post.delay(instance.id)
+
+
+def follower_created(sender, instance, created, **kwargs):
+    """
+    Add the followed user's recent posts to the new follower's feed.
+    """
+    if created:
+        backfill_author.delay(instance.owner_id, instance.followed_id)
+
+
+def follower_deleted(sender, instance, **kwargs):
+    """
+    Remove the unfollowed user's posts from the feed. If the unfollowed
+    user is now back under the fan-out limit, write their recent posts
+    to their remaining followers' feeds, as those stop reading them at
+    request time.
+    """
+    remove_author(instance.owner_id, instance.followed_id)
+    if crossed_under_limit(instance.followed_id):
+        backfill_followers.delay(instance.followed_id)
+
+
+def block_created(sender, instance, created, **kwargs):
+    """
+    Remove the blocked user's posts from the blocker's feed.
+    """
+    if created:
+        remove_author(instance.owner_id, instance.target_id)
+
+
+def block_deleted(sender, instance, **kwargs):
+    """
+    Restore the unblocked user's posts if the blocker still follows them.
+    """
+    backfill_author.delay(instance.owner_id, instance.target_id)
+
+
+post_save.connect(post_created, sender=Post)
+post_save.connect(follower_created, sender=Follower)
+post_delete.connect(follower_deleted, sender=Follower)
+post_save.connect(block_created, sender=Block)
+post_delete.connect(block_deleted, sender=Block)
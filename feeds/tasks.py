@@ -0,0 +1,37 @@
+"""
+Background tasks for the materialized home feed. The follow check is
+repeated when a task runs, as the follow may have been removed since
+the task was queued.
+"""
+from followers.models import Follower
+from posts.models import Post
+from taskqueue.registry import task
+from . import fanout
+
+
+@task
+def fan_out_post(post_id):
+    """
+    Writes a new post to the feeds of its owner's followers.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        fanout.fan_out_post(post)
+
+
+@task
+def backfill_author(user_id, author_id):
+    """
+    Adds the author's recent posts to the feed of a user following them.
+    """
+    if Follower.objects.filter(owner=user_id, followed=author_id).exists():
+        fanout.backfill_author(user_id, author_id)
+
+
+@task
+def backfill_followers(author_id):
+    """
+    Writes the recent posts of an author who is back under the fan-out
+    limit to their followers' feeds.
+    """
+    fanout.backfill_followers(author_id)
@@ -0,0 +1,148 @@
+"""
+Test cases for the materialized home feed.
+"""
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from blocks.models import Block
+from followers.models import Follower
+from posts.models import Post
+from .models import FeedEntry
+
+
+class FeedTests(APITestCase):
+    """
+    Tests for fan-out on write and the feed endpoint.
+    """
+    def setUp(self):
+        """
+        Creates a reader and an author with one existing post.
+        """
+        cache.clear()
+        self.reader = User.objects.create_user(
+            username='reader', password='readerpass'
+        )
+        self.author = User.objects.create_user(
+            username='author', password='authorpass'
+        )
+        self.old_post = Post.objects.create(owner=self.author, title='old')
+        self.client.login(username='reader', password='readerpass')
+
+    def feed_titles(self):
+        response = self.client.get(reverse('feed-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [post['title'] for post in response.data['results']]
+
+    def test_follow_backfills_and_new_posts_fan_out(self):
+        """
+        Ensure following adds existing posts and new posts are fanned out.
+        """
+        Follower.objects.create(owner=self.reader, followed=self.author)
+        Post.objects.create(owner=self.author, title='new')
+        self.assertEqual(self.feed_titles(), ['new', 'old'])
+        self.assertEqual(
+            FeedEntry.objects.filter(owner=self.reader).count(), 2
+        )
+
+    def test_unfollow_and_block_remove_posts(self):
+        """
+        Ensure unfollowing or blocking empties the author's posts out
+        of the feed, and unblocking restores them.
+        """
+        follow = Follower.objects.create(
+            owner=self.reader, followed=self.author
+        )
+        block = Block.objects.create(owner=self.reader, target=self.author)
+        self.assertEqual(self.feed_titles(), [])
+
+        block.delete()
+        self.assertEqual(self.feed_titles(), ['old'])
+
+        follow.delete()
+        self.assertEqual(self.feed_titles(), [])
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_authors_over_fanout_limit_are_read_at_request_time(self):
+        """
+        Ensure posts of authors with many followers are not fanned out
+        but still appear in the feed.
+        """
+        Follower.objects.create(owner=self.reader, followed=self.author)
+        Post.objects.create(owner=self.author, title='new')
+        self.assertFalse(FeedEntry.objects.exists())
+        self.assertEqual(self.feed_titles(), ['new', 'old'])
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_author_back_under_fanout_limit_is_backfilled(self):
+        """
+        Ensure the posts of an author who drops back under the limit
+        stay in their followers' feeds.
+        """
+        other = User.objects.create_user(username='other', password='x')
+        Follower.objects.create(owner=self.reader, followed=self.author)
+        follow = Follower.objects.create(owner=other, followed=self.author)
+        Post.objects.create(owner=self.author, title='new')
+        self.assertFalse(
+            FeedEntry.objects.filter(post__title='new').exists()
+        )
+        follow.delete()
+        self.assertEqual(self.feed_titles(), ['new', 'old'])
+        self.assertEqual(
+            FeedEntry.objects.filter(owner=self.reader).count(), 2
+        )
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_cursor_pages_merge_pulled_posts(self):
+        """
+        Ensure next and previous links walk the feed in order, merging
+        materialized entries with the posts of a pulled author, and a
+        page costs the same number of queries however deep it is.
+        """
+        pulled = User.objects.create_user(username='pulled', password='x')
+        other = User.objects.create_user(username='other', password='x')
+        Follower.objects.create(owner=self.reader, followed=self.author)
+        Follower.objects.create(owner=self.reader, followed=pulled)
+        Follower.objects.create(owner=other, followed=pulled)
+        for index in range(12):
+            owner = pulled if index % 3 == 0 else self.author
+            Post.objects.create(owner=owner, title=f'post {index}')
+        expected = [f'post {index}' for index in range(11, -1, -1)]
+        expected.append('old')
+        self.assertTrue(FeedEntry.objects.filter(owner=self.reader).exists())
+
+        titles = []
+        pages = []
+        url = reverse('feed-list')
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            pages.append(response.data)
+            page_queries = len(queries)
+            titles += [post['title'] for post in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(titles, expected)
+        self.assertEqual(len(pages), 2)
+        self.assertIsNone(pages[0]['previous'])
+        response = self.client.get(pages[1]['previous'])
+        self.assertEqual(
+            [post['title'] for post in response.data['results']],
+            expected[:10]
+        )
+        self.assertIsNone(response.data['previous'])
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(reverse('feed-list'))
+        self.assertEqual(page_queries, len(first))
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(reverse('feed-list'), {'cursor': 'cD14'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_feed_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse('feed-list'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
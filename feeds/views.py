@@ -0,0 +1,34 @@
+from functools import partial
+from rest_framework import generics, permissions
+from drf_api.pagination import KeysetCursorPagination
+from drf_api.instrumentation import RequestMetricsMixin
+from posts.serializers import PostSerializer
+from posts.views import get_post_queryset
+from .fanout import home_feed_keys
+
+
+class FeedList(RequestMetricsMixin, generics.ListAPIView):
+    """
+    The logged in user's home feed: posts by the users they follow,
+    newest first. A page of post ids is read in order from the
+    materialized feed table, merged with the posts of followed users
+    that are read at request time, then the posts are loaded by id.
+    Uses cursor pagination so paging stays fast however deep it goes.
+    """
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+
+    def get_queryset(self):
+        return get_post_queryset(self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        keys = self.paginator.paginate_keys(
+            partial(home_feed_keys, request.user), request
+        )
+        posts = self.get_queryset().in_bulk(
+            [post_id for _, post_id in keys]
+        )
+        page = [posts[post_id] for _, post_id in keys if post_id in posts]
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
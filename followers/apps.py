@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FollowersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'followers'
+
+    def ready(self):
+        # Connect the follower graph cache updates
+        from . import graph  # noqa: F401
@@ -0,0 +1,189 @@
+"""
+Follower graph service.
+
+Each user's following and follower ids are cached as sorted arrays of
+64-bit ints, serialized to bytes: 8 bytes per edge, whatever the cache
+backend. Each array's key includes a version number kept per user and
+direction, like the generations of drf_api/response_cache.py. When a
+Follower row is created or deleted, the two affected versions are
+bumped once the transaction commits, so every array cached before the
+change, including one being loaded from rows read before the commit,
+is never read again. Arrays missing from the cache are loaded together
+in one query, under the versions read before that query. Entries
+expire after FOLLOW_GRAPH_CACHE_TIMEOUT seconds.
+
+Mutual followers, "followed by people you follow" and follow
+suggestions are then computed with set intersections in memory instead
+of self-joins of the follower table.
+"""
+import heapq
+import time
+from array import array
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from blocks.models import get_blocked_ids
+from .models import Follower
+
+FOLLOWING = 'following'
+FOLLOWERS = 'followers'
+
+# Column holding the user whose edges are listed, and the other end
+COLUMNS = {
+    FOLLOWING: ('owner_id', 'followed_id'),
+    FOLLOWERS: ('followed_id', 'owner_id'),
+}
+
+# Maximum number of followed users (the most recently registered ones)
+# whose own follows are counted for the suggestions
+SUGGESTION_SOURCES = 500
+
+
+def graph_version_key(direction, user_id):
+    return f'followers:graph-version:{direction}:{user_id}'
+
+
+def graph_cache_key(direction, user_id, version):
+    return f'followers:graph:{direction}:{user_id}:{version}'
+
+
+def unpack(data):
+    ids = array('q')
+    ids.frombytes(data)
+    return ids
+
+
+def cache_timeout():
+    return getattr(settings, 'FOLLOW_GRAPH_CACHE_TIMEOUT', 24 * 60 * 60)
+
+
+def graph_versions(direction, user_ids):
+    """
+    Returns {user id: current version of the user's array}, starting
+    unknown versions at the current time so they never reuse old keys.
+    """
+    keys = {
+        graph_version_key(direction, user_id): user_id
+        for user_id in user_ids
+    }
+    versions = cache.get_many(list(keys))
+    for key in keys:
+        if key not in versions:
+            versions[key] = time.time_ns()
+            cache.add(key, versions[key], cache_timeout())
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_version(direction, user_id):
+    key = graph_version_key(direction, user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), cache_timeout())
+
+
+def adjacency(direction, user_ids):
+    """
+    Returns {user id: sorted array of ids} of the users each user
+    follows (FOLLOWING) or is followed by (FOLLOWERS), reading the
+    cache and loading every missing user in a single query.
+    """
+    versions = graph_versions(direction, user_ids)
+    keys = {
+        graph_cache_key(direction, user_id, versions[user_id]): user_id
+        for user_id in user_ids
+    }
+    cached = cache.get_many(list(keys))
+    arrays = {keys[key]: unpack(data) for key, data in cached.items()}
+    missing = [user_id for user_id in user_ids if user_id not in arrays]
+    if missing:
+        column, other = COLUMNS[direction]
+        loaded = {user_id: array('q') for user_id in missing}
+        rows = Follower.objects.filter(
+            **{f'{column}__in': missing}
+        ).order_by(column, other).values_list(column, other)
+        for user_id, other_id in rows:
+            loaded[user_id].append(other_id)
+        cache.set_many(
+            {
+                graph_cache_key(direction, user_id, versions[user_id]):
+                    ids.tobytes()
+                for user_id, ids in loaded.items()
+            },
+            cache_timeout(),
+        )
+        arrays.update(loaded)
+    return arrays
+
+
+def following_ids(user_id):
+    return adjacency(FOLLOWING, [user_id])[user_id]
+
+
+def follower_ids(user_id):
+    return adjacency(FOLLOWERS, [user_id])[user_id]
+
+
+def follow_changed(owner_id, followed_id):
+    """
+    Bumps the versions of the arrays a created or deleted follow
+    changes, once the current transaction commits.
+    """
+    def bump_versions():
+        bump_version(FOLLOWING, owner_id)
+        bump_version(FOLLOWERS, followed_id)
+
+    transaction.on_commit(bump_versions)
+
+
+def mutual_followers(user_id, other_id):
+    """
+    Ids of the users following both users.
+    """
+    arrays = adjacency(FOLLOWERS, [user_id, other_id])
+    return sorted(set(arrays[user_id]).intersection(arrays[other_id]))
+
+
+def followed_by_followings(user_id, other_id):
+    """
+    Ids of the users the first user follows who follow the other user.
+    """
+    following = following_ids(user_id)
+    return sorted(set(following).intersection(follower_ids(other_id)))
+
+
+def follow_suggestions(user, limit=10):
+    """
+    Returns up to limit (user id, score) pairs: the users followed by
+    the most of the users the given user follows, excluding the user,
+    the users already followed and the users the user blocks.
+    """
+    following = following_ids(user.id)
+    sources = list(following[-SUGGESTION_SOURCES:])
+    scores = Counter()
+    for ids in adjacency(FOLLOWING, sources).values():
+        scores.update(ids)
+    excluded = set(following).union(get_blocked_ids(user), [user.id])
+    return heapq.nsmallest(
+        limit,
+        (
+            (candidate, score) for candidate, score in scores.items()
+            if candidate not in excluded
+        ),
+        key=lambda pair: (-pair[1], pair[0]),
+    )
+
+
+def follower_created(sender, instance, created, **kwargs):
+    if created:
+        follow_changed(instance.owner_id, instance.followed_id)
+
+
+def follower_deleted(sender, instance, **kwargs):
+    follow_changed(instance.owner_id, instance.followed_id)
+
+
+post_save.connect(follower_created, sender=Follower)
+post_delete.connect(follower_deleted, sender=Follower)
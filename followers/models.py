@@ -1,5 +1,9 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 from django.contrib.auth.models import User
+from profiles.models import Profile
+from drf_api.counters import adjust_counter
+from drf_api.response_cache import invalidate_on_change
 
 
 class Follower(models.Model):
@@ -22,6 +26,41 @@ class Follower(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['owner', 'followed']
+        # Followers of a user, newest first ('owner' is covered by
+        # the unique constraint)
+        indexes = [
+            models.Index(
+                fields=['followed', '-created_at'],
+                name='follower_followed_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.owner} {self.followed}'
+
+
+def follower_changed(instance, delta):
+    """
+    Adjust the following_count of the owner and the followers_count
+    of the followed user by delta.
+    """
+    adjust_counter(
+        Profile, 'following_count', delta, owner=instance.owner_id
+    )
+    adjust_counter(
+        Profile, 'followers_count', delta, owner=instance.followed_id
+    )
+
+
+def follower_created(sender, instance, created, **kwargs):
+    if created:
+        follower_changed(instance, 1)
+
+
+def follower_deleted(sender, instance, **kwargs):
+    follower_changed(instance, -1)
+
+
+post_save.connect(follower_created, sender=Follower)
+post_delete.connect(follower_deleted, sender=Follower)
+invalidate_on_change(Follower, 'posts', 'profiles')
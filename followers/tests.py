@@ -1,3 +1,142 @@
-from django.test import TestCase
+"""
+Test cases for the follower graph service and its endpoints.
+"""
+from array import array
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from blocks.models import Block
+from .graph import (
+    FOLLOWERS, FOLLOWING, adjacency, follower_ids, following_ids,
+    graph_cache_key, graph_versions
+)
+from .models import Follower
 
-# Create your tests here.
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class FollowerGraphTests(APITestCase):
+    """
+    Tests for the cached adjacency arrays and the graph endpoints.
+    """
+    def setUp(self):
+        cache.clear()
+        self.viewer, self.alice, self.bob, self.carol, self.dave = [
+            User.objects.create_user(username=name, password='pass')
+            for name in ('viewer', 'alice', 'bob', 'carol', 'dave')
+        ]
+
+    def follow(self, owner, followed):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Follower.objects.create(owner=owner, followed=followed)
+
+    def test_arrays_are_cached_and_dropped_on_change(self):
+        """
+        Ensure the id arrays are loaded in one query for several users,
+        served from the cache, and reloaded after a follow or unfollow.
+        """
+        self.follow(self.viewer, self.carol)
+        self.follow(self.viewer, self.alice)
+        with self.assertNumQueries(1):
+            arrays = adjacency(FOLLOWING, [self.viewer.id, self.bob.id])
+        self.assertEqual(
+            list(arrays[self.viewer.id]), [self.alice.id, self.carol.id]
+        )
+        self.assertEqual(list(arrays[self.bob.id]), [])
+        follower_ids(self.bob.id)
+        with self.assertNumQueries(0):
+            following_ids(self.viewer.id)
+
+        follow = self.follow(self.viewer, self.bob)
+        self.assertEqual(
+            list(following_ids(self.viewer.id)),
+            [self.alice.id, self.bob.id, self.carol.id]
+        )
+        self.assertEqual(
+            list(adjacency(FOLLOWERS, [self.bob.id])[self.bob.id]),
+            [self.viewer.id]
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            follow.delete()
+        self.assertEqual(list(follower_ids(self.bob.id)), [])
+
+    def test_load_racing_a_follow_is_not_served(self):
+        """
+        Ensure an array loaded from rows read before a follow committed
+        is not served once the follow has committed.
+        """
+        # A slow load reads the version and the (empty) rows...
+        version = graph_versions(FOLLOWING, [self.viewer.id])[self.viewer.id]
+        stale = array('q').tobytes()
+        # ...the follow commits, then the load stores what it read
+        self.follow(self.viewer, self.dave)
+        cache.add(graph_cache_key(FOLLOWING, self.viewer.id, version), stale)
+        self.assertEqual(list(following_ids(self.viewer.id)), [self.dave.id])
+
+    def test_mutual_followers_and_followed_by(self):
+        """
+        Ensure the intersections list the right profiles.
+        """
+        # alice and bob follow both the viewer and carol
+        for user in (self.alice, self.bob):
+            self.follow(user, self.viewer)
+            self.follow(user, self.carol)
+        # the viewer follows alice and dave; dave follows carol too
+        self.follow(self.viewer, self.alice)
+        self.follow(self.viewer, self.dave)
+        self.follow(self.dave, self.carol)
+        self.client.force_authenticate(self.viewer)
+        carol_profile = self.carol.profile.id
+
+        response = self.client.get(
+            f'/profiles/{carol_profile}/mutual-followers/'
+        )
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(
+            [profile['owner'] for profile in response.data['results']],
+            ['alice', 'bob']
+        )
+        response = self.client.get(
+            f'/profiles/{carol_profile}/followed-by/?limit=1'
+        )
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(
+            [profile['owner'] for profile in response.data['results']],
+            ['alice']
+        )
+
+    def test_suggestions_rank_friends_of_friends(self):
+        """
+        Ensure suggestions are ranked by how many followed users follow
+        them and exclude followed and blocked users and the viewer.
+        """
+        self.follow(self.viewer, self.alice)
+        self.follow(self.viewer, self.bob)
+        for user in (self.alice, self.bob):
+            self.follow(user, self.carol)
+            self.follow(user, self.viewer)
+        self.follow(self.alice, self.dave)
+        self.follow(self.alice, self.bob)
+        self.client.force_authenticate(self.viewer)
+
+        response = self.client.get('/profiles/suggestions/')
+        self.assertEqual(
+            [
+                (profile['owner'], profile['followed_by_count'])
+                for profile in response.data['results']
+            ],
+            [('carol', 2), ('dave', 1)]
+        )
+        Block.objects.create(owner=self.viewer, target=self.carol)
+        response = self.client.get('/profiles/suggestions/')
+        self.assertEqual(
+            [profile['owner'] for profile in response.data['results']],
+            ['dave']
+        )
+
+    def test_graph_endpoints_require_login(self):
+        response = self.client.get('/profiles/suggestions/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
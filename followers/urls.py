@@ -1,7 +1,19 @@
 from django.urls import path
 from followers import views
+from followers.graph import followed_by_followings, mutual_followers
 
 urlpatterns = [
     path('followers/', views.FollowerList.as_view()),
-    path('followers/<int:pk>/', views.FollowerDetail.as_view())
+    path('followers/<int:pk>/', views.FollowerDetail.as_view()),
+    # Users following both the logged in user and the profile
+    path(
+        'profiles/<int:pk>/mutual-followers/',
+        views.ProfileGraphList.as_view(graph_query=mutual_followers)
+    ),
+    # Users the logged in user follows who follow the profile
+    path(
+        'profiles/<int:pk>/followed-by/',
+        views.ProfileGraphList.as_view(graph_query=followed_by_followings)
+    ),
+    path('profiles/suggestions/', views.FollowSuggestionList.as_view()),
 ]
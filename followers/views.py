@@ -1,10 +1,21 @@
+from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions
+from rest_framework.response import Response
+from blocks.models import get_blocked_ids
+from drf_api.pagination import CursorOrPageNumberPagination, get_limit
 from drf_api.permissions import IsOwnerOrReadOnly
+from drf_api.instrumentation import RequestMetricsMixin
+from profiles.models import Profile, profiles_of_users
+from profiles.serializers import ProfileSerializer
+from .graph import follow_suggestions
 from .models import Follower
 from .serializers import FollowerSerializer
 
+GRAPH_DEFAULT_LIMIT = 10
+GRAPH_MAX_LIMIT = 50
 
-class FollowerList(generics.ListCreateAPIView):
+
+class FollowerList(RequestMetricsMixin, generics.ListCreateAPIView):
     """
     List all followers, i.e. all instances of a user
     following another user'.
@@ -12,7 +23,9 @@ class FollowerList(generics.ListCreateAPIView):
     Perform_create: associate the current logged in user with a follower.
     """
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    queryset = Follower.objects.all()
+    pagination_class = CursorOrPageNumberPagination
+    # Both usernames are serialized for every follower
+    queryset = Follower.objects.select_related('owner', 'followed')
     serializer_class = FollowerSerializer
 
     def perform_create(self, serializer):
@@ -28,3 +41,58 @@ class FollowerDetail(generics.RetrieveDestroyAPIView):
     permission_classes = [IsOwnerOrReadOnly]
     queryset = Follower.objects.all()
     serializer_class = FollowerSerializer
+
+
+class ProfileGraphList(RequestMetricsMixin, generics.GenericAPIView):
+    """
+    List the profiles of users picked from the follower graph (see
+    followers/graph.py) relative to the logged in user and the profile
+    in the URL, without the users they block. 'graph_query' is the
+    graph function called with both user ids, given to as_view() in
+    urls.py. Returns the number of users found and the profiles of the
+    first 'limit' of them.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ProfileSerializer
+    graph_query = None
+
+    def get_other_user_id(self):
+        """
+        Returns the id of the owner of the profile in the URL.
+        """
+        return get_object_or_404(
+            Profile.objects.only('owner_id'), pk=self.kwargs['pk']
+        ).owner_id
+
+    def get(self, request, *args, **kwargs):
+        blocked_ids = set(get_blocked_ids(request.user))
+        user_ids = [
+            user_id for user_id in self.graph_query(
+                request.user.id, self.get_other_user_id()
+            )
+            if user_id not in blocked_ids
+        ]
+        limit = get_limit(request, GRAPH_DEFAULT_LIMIT, GRAPH_MAX_LIMIT)
+        serializer = self.get_serializer(
+            profiles_of_users(user_ids[:limit]), many=True
+        )
+        return Response({'count': len(user_ids), 'results': serializer.data})
+
+
+class FollowSuggestionList(RequestMetricsMixin, generics.GenericAPIView):
+    """
+    Suggest users to follow: the users followed by the most of the
+    users the logged in user follows. Each profile comes with
+    'followed_by_count', the number of those users following it.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ProfileSerializer
+
+    def get(self, request, *args, **kwargs):
+        limit = get_limit(request, GRAPH_DEFAULT_LIMIT, GRAPH_MAX_LIMIT)
+        scores = dict(follow_suggestions(request.user, limit))
+        profiles = profiles_of_users(list(scores))
+        results = self.get_serializer(profiles, many=True).data
+        for profile, data in zip(profiles, results):
+            data['followed_by_count'] = scores[profile.owner_id]
+        return Response({'count': len(results), 'results': results})
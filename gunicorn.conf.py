@@ -0,0 +1,24 @@
+"""
+Gunicorn configuration.
+
+SERVER_MODE selects how the app is served:
+- 'wsgi' (default): sync workers running drf_api.wsgi.
+- 'asgi': uvicorn workers running drf_api.asgi, where the post list and
+  detail, profile detail and comment list views run in a thread pool
+  (see drf_api/asynchronous.py).
+WEB_CONCURRENCY sets the number of worker processes.
+"""
+import os
+
+server_mode = os.environ.get('SERVER_MODE', 'wsgi')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+if server_mode == 'asgi':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    wsgi_app = 'drf_api.asgi:application'
+else:
+    worker_class = 'sync'
+    wsgi_app = 'drf_api.wsgi:application'
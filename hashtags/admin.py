@@ -1,4 +1,5 @@
 from django.contrib import admin
-from .models import Hashtag
+from .models import Hashtag, HashtagUsageBucket
 
 admin.site.register(Hashtag)
+admin.site.register(HashtagUsageBucket)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from hashtags.trending import prune_usage_buckets, rebuild_usage_buckets
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete the hourly hashtag usage buckets that fall outside the '
+        'longest trending window. Run it periodically, e.g. daily.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Recreate the buckets from the tagged posts first'
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            rebuilt = rebuild_usage_buckets()
+            self.stdout.write(f'{rebuilt} usage buckets rebuilt.')
+        deleted = prune_usage_buckets()
+        self.stdout.write(
+            self.style.SUCCESS(f'{deleted} usage buckets pruned.')
+        )
@@ -0,0 +1,44 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:51
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.functions.text
+
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Hashtag = apps.get_model('hashtags', 'Hashtag')
+    PostHashtag = Post.hashtags.through
+    counts = PostHashtag.objects.filter(
+        hashtag=OuterRef('pk')
+    ).order_by().values('hashtag').annotate(total=Count('pk')).values('total')
+    Hashtag.objects.update(posts_count=Coalesce(
+        Subquery(counts, output_field=IntegerField()), 0
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hashtags', '0001_initial'),
+        ('posts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hashtag',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='hashtag',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='hashtag_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hashtag',
+            index=models.Index(fields=['-posts_count'], name='hashtag_posts_count_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
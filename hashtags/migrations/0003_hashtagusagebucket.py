@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hashtags', '0002_hashtag_posts_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HashtagUsageBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_buckets', to='hashtags.hashtag')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='hashtagusagebucket',
+            index=models.Index(fields=['bucket_start'], name='hashtag_usage_bucket_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='hashtagusagebucket',
+            unique_together={('hashtag', 'bucket_start')},
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Lower
+from drf_api.response_cache import invalidate, invalidate_on_change
 
 
 class Hashtag(models.Model):
@@ -7,6 +9,103 @@ class Hashtag(models.Model):
     """
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=50, unique=True)
+    # Denormalized usage counter, maintained by the Post.hashtags signals
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        # Case-insensitive prefix lookups and ranking by usage
+        indexes = [
+            models.Index(Lower('name'), name='hashtag_name_lower_idx'),
+            models.Index(
+                fields=['-posts_count'], name='hashtag_posts_count_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class HashtagUsageBucket(models.Model):
+    """
+    Number of times a hashtag was added to posts during the hour
+    starting at bucket_start. Maintained by hashtags.trending.
+    """
+    hashtag = models.ForeignKey(
+        Hashtag, on_delete=models.CASCADE, related_name='usage_buckets'
+    )
+    bucket_start = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['hashtag', 'bucket_start']
+        indexes = [
+            models.Index(
+                fields=['bucket_start'], name='hashtag_usage_bucket_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.hashtag_id} {self.bucket_start}: {self.count}'
+
+
+def autocomplete_hashtags(prefix, limit=10):
+    """
+    Returns the most used hashtags whose name starts with prefix,
+    case-insensitively. The prefix is matched as a range on the
+    lower-cased name so the expression index is used on every database,
+    instead of a LIKE that PostgreSQL can only index with pattern ops.
+    """
+    prefix = prefix.strip().lstrip('#').lower()
+    queryset = Hashtag.objects.all()
+    if prefix:
+        upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        queryset = queryset.annotate(name_lower=Lower('name')).filter(
+            name_lower__gte=prefix,
+            name_lower__lt=upper_bound,
+            # Exact under collations that do not sort by code point
+            name_lower__startswith=prefix,
+        )
+    return queryset.order_by('-posts_count', 'name')[:limit]
+
+
+def normalize_hashtag_name(name):
+    """
+    Returns the stored form of a hashtag name: no '#', lower case.
+    """
+    return name.strip().lstrip('#').lower()
+
+
+def resolve_hashtags(names):
+    """
+    Returns the hashtags with the given (normalized) names, in the given
+    order, creating the missing ones. Existing hashtags are matched
+    case-insensitively in one query; missing ones are inserted with a
+    single bulk_create and read back with one more query.
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return []
+    hashtags = {
+        hashtag.name_lower: hashtag
+        for hashtag in Hashtag.objects.annotate(
+            name_lower=Lower('name')
+        ).filter(name_lower__in=names)
+    }
+    missing = [name for name in names if name not in hashtags]
+    if missing:
+        # Concurrent requests may insert the same names, hence the
+        # ignored conflicts and the read back
+        Hashtag.objects.bulk_create(
+            [Hashtag(name=name) for name in missing], ignore_conflicts=True
+        )
+        hashtags.update(
+            (hashtag.name, hashtag)
+            for hashtag in Hashtag.objects.filter(name__in=missing)
+        )
+        # bulk_create sends no post_save, so invalidate by hand
+        invalidate('hashtags', 'posts')
+    return [hashtags[name] for name in names if name in hashtags]
+
+
+# Invalidate cached anonymous hashtag and post lists
+invalidate_on_change(Hashtag, 'hashtags', 'posts')
@@ -4,4 +4,11 @@ from .models import Hashtag
 class HashtagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Hashtag
-        fields = ['id', 'name']
\ No newline at end of file
+        fields = ['id', 'name', 'posts_count']
+
+
+class TrendingHashtagSerializer(HashtagSerializer):
+    trending_score = serializers.FloatField(read_only=True)
+
+    class Meta(HashtagSerializer.Meta):
+        fields = HashtagSerializer.Meta.fields + ['trending_score']
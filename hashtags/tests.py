@@ -9,6 +9,7 @@ initialized & configured before executing the tests.
 The test cases are custom coded with inspiration from sources
 listed in the README chapter Credits, Content.
 """
+from django.core.cache import cache
 from django.contrib.auth.models import User
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -26,12 +27,13 @@ class HashtagTests(APITestCase):
         Set up the test environment.
         This method creates a test user and logs in the user.
         """
-    # Create a test user and log in
-    self.user = User.objects.create_user(
-        username='testuser',
-        password='testpassword'
-    )
-    self.client.login(username='testuser', password='testpassword')
+        cache.clear()
+        # Create a test user and log in
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpassword'
+        )
+        self.client.login(username='testuser', password='testpassword')
 
     def tearDown(self):
         """
@@ -67,10 +69,10 @@ class HashtagTests(APITestCase):
 
         - A user can create a post with an associated hashtag.
         - Response contains correct post data, incl title of created post.
-        - Response incl. hashtag_ids field with the ID of the assoc. hashtag
+        - Response incl. hashtags field with the assoc. hashtag
         - This test ensures that posts can be created with hashtags and
           verifies that the hashtag is correctly associated with the post by
-          checking the hashtag_ids in the response.
+          checking the hashtags in the response (hashtag_ids is write only).
         """
         hashtag = Hashtag.objects.create(name='example')
         url = reverse('post-list')
@@ -82,8 +84,8 @@ class HashtagTests(APITestCase):
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data['title'], 'Test Post')
-        self.assertIn('hashtag_ids', response.data)
-        self.assertEqual(response.data['hashtag_ids'][0], hashtag.id)
+        self.assertIn('hashtags', response.data)
+        self.assertEqual(response.data['hashtags'][0]['id'], hashtag.id)
 
     def test_search_post_by_hashtag(self):
         """
@@ -107,8 +109,9 @@ class HashtagTests(APITestCase):
         response = self.client.get(url, {'search': 'example'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['results'][0]['title'], 'Test Post')
-        self.assertIn(
-            hashtag.id, response.data['results'][0]['hashtag_ids'])
+        self.assertIn(hashtag.id, [
+            tag['id'] for tag in response.data['results'][0]['hashtags']
+        ])
 
     def test_add_remove_hashtag_to_post(self):
         """
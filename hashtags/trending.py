@@ -0,0 +1,137 @@
+"""
+Trending hashtags over sliding time windows.
+
+Every time a hashtag is added to a post, the count of the hashtag's
+current hourly bucket is incremented (HashtagUsageBucket). A trending
+lookup reads only the buckets inside the requested window and scores
+each hashtag with exponential decay, so recent use weighs more than
+use at the start of the window. The post/hashtag join table is never
+scanned.
+"""
+import heapq
+from datetime import timedelta
+from django.db.models import F
+from django.utils import timezone
+from .models import Hashtag, HashtagUsageBucket
+
+BUCKET_SIZE = timedelta(hours=1)
+
+# Window length and decay half-life per window name
+WINDOWS = {
+    '1h': (timedelta(hours=1), timedelta(minutes=30)),
+    '24h': (timedelta(hours=24), timedelta(hours=6)),
+    '7d': (timedelta(days=7), timedelta(days=1)),
+}
+DEFAULT_WINDOW = '24h'
+
+
+def bucket_start(moment):
+    """
+    Returns the start of the hourly bucket containing moment.
+    """
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def record_usage(hashtag_ids, amount=1, moment=None):
+    """
+    Adds amount to the current bucket of each hashtag, creating the
+    buckets as needed. Costs one insert and one update.
+    """
+    hashtag_ids = list(hashtag_ids)
+    if not hashtag_ids:
+        return
+    start = bucket_start(moment or timezone.now())
+    HashtagUsageBucket.objects.bulk_create(
+        [
+            HashtagUsageBucket(hashtag_id=hashtag_id, bucket_start=start)
+            for hashtag_id in hashtag_ids
+        ],
+        ignore_conflicts=True,
+    )
+    HashtagUsageBucket.objects.filter(
+        hashtag__in=hashtag_ids, bucket_start=start
+    ).update(count=F('count') + amount)
+
+
+def decay_weight(age, half_life):
+    """
+    Weight of a bucket of the given age, halving every half_life.
+    """
+    return 0.5 ** (max(age, timedelta(0)) / half_life)
+
+
+def trending_scores(window=DEFAULT_WINDOW, now=None):
+    """
+    Returns a {hashtag id: score} dict for the buckets in the window.
+    The age of a bucket is measured from its midpoint, so the bucket
+    in progress is not weighted above its half-elapsed hour.
+    """
+    length, half_life = WINDOWS[window]
+    now = now or timezone.now()
+    buckets = HashtagUsageBucket.objects.filter(
+        bucket_start__gt=bucket_start(now - length)
+    ).values_list('hashtag_id', 'bucket_start', 'count')
+
+    scores = {}
+    for hashtag_id, start, count in buckets:
+        age = now - (start + BUCKET_SIZE / 2)
+        scores[hashtag_id] = (
+            scores.get(hashtag_id, 0) + count * decay_weight(age, half_life)
+        )
+    return scores
+
+
+def trending_hashtags(window=DEFAULT_WINDOW, limit=10, now=None):
+    """
+    Returns the top hashtags of the window, highest score first,
+    each with a 'trending_score' attribute.
+    """
+    scores = trending_scores(window, now)
+    top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+    hashtags = Hashtag.objects.in_bulk([hashtag_id for hashtag_id, _ in top])
+    trending = []
+    for hashtag_id, score in top:
+        hashtag = hashtags.get(hashtag_id)
+        if hashtag is not None:
+            hashtag.trending_score = round(score, 3)
+            trending.append(hashtag)
+    return trending
+
+
+def prune_usage_buckets(now=None):
+    """
+    Deletes the buckets older than the longest window.
+    Returns the number of deleted buckets.
+    """
+    longest = max(length for length, _ in WINDOWS.values())
+    cutoff = bucket_start((now or timezone.now()) - longest)
+    deleted, _ = HashtagUsageBucket.objects.filter(
+        bucket_start__lt=cutoff
+    ).delete()
+    return deleted
+
+
+def rebuild_usage_buckets(now=None):
+    """
+    Recreates the buckets of the longest window from the creation time
+    of the tagged posts. Meant for a one-off backfill, as it reads the
+    join table; the signals keep the buckets up to date afterwards.
+    """
+    Post = Hashtag.posts.rel.related_model
+    longest = max(length for length, _ in WINDOWS.values())
+    since = bucket_start((now or timezone.now()) - longest)
+    counts = {}
+    links = Post.hashtags.through.objects.filter(
+        post__created_at__gte=since
+    ).values_list('hashtag_id', 'post__created_at')
+    for hashtag_id, created_at in links:
+        key = (hashtag_id, bucket_start(created_at))
+        counts[key] = counts.get(key, 0) + 1
+
+    HashtagUsageBucket.objects.filter(bucket_start__gte=since).delete()
+    HashtagUsageBucket.objects.bulk_create([
+        HashtagUsageBucket(hashtag_id=hashtag_id, bucket_start=start,
+                           count=count)
+        for (hashtag_id, start), count in counts.items()
+    ], batch_size=500)
+    return len(counts)
@@ -1,12 +1,68 @@
 from rest_framework import viewsets, permissions
-from .models import Hashtag
-from .serializers import HashtagSerializer
+from rest_framework.exceptions import ValidationError
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from drf_api.pagination import get_limit
+from drf_api.response_cache import AnonymousResponseCacheMixin
+from drf_api.instrumentation import RequestMetricsMixin
+from .models import Hashtag, autocomplete_hashtags
+from .serializers import HashtagSerializer, TrendingHashtagSerializer
+from .trending import DEFAULT_WINDOW, WINDOWS, trending_hashtags
 
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
 
-class HashtagViewSet(viewsets.ModelViewSet):
+
+class HashtagViewSet(RequestMetricsMixin, AnonymousResponseCacheMixin,
+                     viewsets.ModelViewSet):
     """
     A viewset for viewing and editing hashtag instances.
+    Anonymous list responses are cached.
     """
+    cache_namespaces = ('hashtags',)
+    cache_timeout = 300
     serializer_class = HashtagSerializer
     queryset = Hashtag.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    @action(detail=False, pagination_class=None)
+    def autocomplete(self, request):
+        """
+        Return the most used hashtags starting with the 'q' parameter,
+        up to 'limit' of them, in one query. Suggestions are the same
+        for every user, so they are cached for logged in users too.
+        """
+        limit = get_limit(
+            request, AUTOCOMPLETE_DEFAULT_LIMIT, AUTOCOMPLETE_MAX_LIMIT
+        )
+        prefix = request.query_params.get('q', '')
+
+        def respond():
+            hashtags = autocomplete_hashtags(prefix, limit)
+            return Response(self.get_serializer(hashtags, many=True).data)
+
+        return self.cached_response(request, respond, shared=True)
+
+    @action(detail=False, pagination_class=None)
+    def trending(self, request):
+        """
+        Return the top hashtags of the 'window' parameter (1h, 24h or
+        7d), scored from the hourly usage buckets with recent use
+        weighing more. Cached for all users for the view's timeout.
+        """
+        window = request.query_params.get('window', DEFAULT_WINDOW)
+        if window not in WINDOWS:
+            raise ValidationError({
+                'window': f'Choose one of: {", ".join(WINDOWS)}.'
+            })
+        limit = get_limit(
+            request, AUTOCOMPLETE_DEFAULT_LIMIT, AUTOCOMPLETE_MAX_LIMIT
+        )
+
+        def respond():
+            hashtags = trending_hashtags(window, limit)
+            return Response(
+                TrendingHashtagSerializer(hashtags, many=True).data
+            )
+
+        return self.cached_response(request, respond, shared=True)
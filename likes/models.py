@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 from django.contrib.auth.models import User
 from posts.models import Post
+from drf_api.counters import adjust_counter
+from drf_api.response_cache import invalidate_on_change
 
 
 class Like(models.Model):
@@ -18,6 +21,36 @@ class Like(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = ['owner', 'post']
+        # Likes are listed per post, newest first, and the liked posts
+        # filter orders by like time ('likes__created_at')
+        indexes = [
+            models.Index(
+                fields=['post', '-created_at'], name='like_post_created_idx'
+            ),
+            models.Index(
+                fields=['owner', '-created_at'], name='like_owner_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.owner} {self.post}'
+
+
+def like_created(sender, instance, created, **kwargs):
+    """
+    Increment the post's likes_count when a like is created.
+    """
+    if created:
+        adjust_counter(Post, 'likes_count', 1, pk=instance.post_id)
+
+
+def like_deleted(sender, instance, **kwargs):
+    """
+    Decrement the post's likes_count when a like is deleted.
+    """
+    adjust_counter(Post, 'likes_count', -1, pk=instance.post_id)
+
+
+post_save.connect(like_created, sender=Like)
+post_delete.connect(like_deleted, sender=Like)
+invalidate_on_change(Like, 'posts')
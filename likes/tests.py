@@ -8,6 +8,7 @@ before executing the tests.
 The test cases are custom coded with inspiration from sources listed
 in the README chapter Credits, Content.
 """
+from django.core.cache import cache
 from django.contrib.auth.models import User
 from django.urls import reverse
 from rest_framework import status
@@ -26,6 +27,7 @@ class LikeTests(APITestCase):
         Set up the test environment.
         This method creates a test user and a test post.
         """
+        cache.clear()
         self.user = User.objects.create_user(
             username='testuser', password='testpassword'
         )
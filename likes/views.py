@@ -1,18 +1,29 @@
 from rest_framework import generics, permissions
+from blocks.models import exclude_blocked
+from drf_api.pagination import CursorOrPageNumberPagination
 from drf_api.permissions import IsOwnerOrReadOnly
+from drf_api.instrumentation import RequestMetricsMixin
 from likes.models import Like
 from likes.serializers import LikeSerializer
 
 
-class LikeList(generics.ListCreateAPIView):
+class LikeList(RequestMetricsMixin, generics.ListCreateAPIView):
     """ 
     List all likes. Create a like if authenticated. The perform_create
     method associates the like with the logged in user.
     """
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     serializer_class = LikeSerializer
-    queryset = Like.objects.all()
-    
+    pagination_class = CursorOrPageNumberPagination
+    # The owner's username is serialized for every like
+    queryset = Like.objects.select_related('owner')
+
+    def get_queryset(self):
+        """
+        Hide likes by users the logged in user blocks.
+        """
+        return exclude_blocked(self.queryset, self.request.user)
+
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
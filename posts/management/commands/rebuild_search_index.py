@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from posts.models import Post
+from posts.search import index_posts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the full-text search document of every post'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Posts reindexed per batch'
+        )
+
+    def handle(self, *args, **options):
+        post_ids = list(Post.objects.order_by('pk').values_list(
+            'pk', flat=True
+        ))
+        batch_size = options['batch_size']
+        total = 0
+        for start in range(0, len(post_ids), batch_size):
+            total += index_posts(post_ids[start:start + batch_size])
+        self.stdout.write(self.style.SUCCESS(f'{total} posts reindexed.'))
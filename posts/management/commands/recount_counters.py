@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from drf_api.counters import recount_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the denormalized like, comment, post, follower, '
+        'following and block counters on posts and profiles and the '
+        'usage counters on hashtags'
+    )
+
+    def handle(self, *args, **kwargs):
+        recount_counters()
+        self.stdout.write(self.style.SUCCESS('Counters recomputed.'))
@@ -0,0 +1,85 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:49
+
+from django.db import migrations, models
+
+# The search index and document format as of this migration, kept here
+# rather than imported from posts.search so later changes to that
+# module cannot change what this migration does
+FTS_TABLE = 'posts_post_fts'
+POSTGRES_INDEX = 'post_search_document_idx'
+
+
+def build_search_document(username, title, hashtag_names):
+    return ' '.join([username, title, *sorted(hashtag_names)]).lower()
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX {POSTGRES_INDEX} ON posts_post '
+            f"USING GIN (to_tsvector('simple', search_document))"
+        )
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(document)'
+            )
+        except Exception:
+            # SQLite built without FTS5, search falls back to LIKE
+            pass
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {POSTGRES_INDEX}')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        # Forget the table in posts.search's per-connection check
+        schema_editor.connection._posts_fts_available = False
+
+
+def backfill_documents(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    posts = list(
+        Post.objects.select_related('owner').prefetch_related('hashtags')
+    )
+    for post in posts:
+        post.search_document = build_search_document(
+            post.owner.username,
+            post.title,
+            [hashtag.name for hashtag in post.hashtags.all()],
+        )
+    Post.objects.bulk_update(posts, ['search_document'], batch_size=500)
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or not posts:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [FTS_TABLE],
+        )
+        if cursor.fetchone() is None:
+            return
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, document) VALUES (%s, %s)',
+            [[post.pk, post.search_document] for post in posts],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(create_index, drop_index),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+    ]
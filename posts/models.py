@@ -1,7 +1,17 @@
 from django.db import models
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
 from django.contrib.auth.models import User
 from hashtags.models import Hashtag
+from hashtags.trending import record_usage
 from category.models import Category
+from profiles.models import Profile
+from drf_api.counters import adjust_counter
+from drf_api.response_cache import invalidate_on_change
 
 
 class Post(models.Model):
@@ -43,10 +53,98 @@ class Post(models.Model):
     hashtags = models.ManyToManyField(Hashtag, related_name='posts')
     category = models.ForeignKey(Category, null=True, blank=True,
                                  on_delete=models.SET_NULL)
+    # Denormalized counters, maintained by the Like and Comment signals
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    # Resized copies of the image, see drf_api/images.py
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Owner username, title and hashtag names, maintained by posts.search
+    search_document = models.TextField(blank=True, editable=False)
 
     # Order posts by time of posting, starting with the most recent
     class Meta:
         ordering = ['-created_at']
+        # Match the default and cursor ordering, the owner and category
+        # filters, and the count orderings of PostList
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'], name='post_created_idx'
+            ),
+            models.Index(
+                fields=['owner', '-created_at'], name='post_owner_created_idx'
+            ),
+            models.Index(
+                fields=['category', '-created_at'],
+                name='post_category_created_idx'
+            ),
+            models.Index(fields=['-likes_count'], name='post_likes_count_idx'),
+            models.Index(
+                fields=['-comments_count'], name='post_comments_count_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.id} {self.title}'
+
+
+def post_created(sender, instance, created, **kwargs):
+    """
+    Increment the owner's posts_count when a post is created.
+    """
+    if created:
+        adjust_counter(Profile, 'posts_count', 1, owner=instance.owner_id)
+
+
+def post_deleted(sender, instance, **kwargs):
+    """
+    Decrement the owner's posts_count when a post is deleted.
+    """
+    adjust_counter(Profile, 'posts_count', -1, owner=instance.owner_id)
+
+
+def post_deleting(sender, instance, **kwargs):
+    """
+    Decrement the posts_count of the post's hashtags before the post and
+    its hashtag links are deleted.
+    """
+    adjust_counter(
+        Hashtag, 'posts_count', -1, pk__in=instance.hashtags.values('pk')
+    )
+
+
+def post_hashtags_changed(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    """
+    Keep Hashtag.posts_count in step with the hashtags of posts,
+    from either side of the relation, and record added hashtags in
+    the trending usage buckets.
+    """
+    if reverse:
+        if action in ('post_add', 'post_remove') and pk_set:
+            delta = len(pk_set) if action == 'post_add' else -len(pk_set)
+            adjust_counter(Hashtag, 'posts_count', delta, pk=instance.pk)
+            if action == 'post_add':
+                record_usage([instance.pk], len(pk_set))
+        elif action == 'post_clear':
+            Hashtag.objects.filter(pk=instance.pk).update(posts_count=0)
+    elif action in ('post_add', 'post_remove') and pk_set:
+        delta = 1 if action == 'post_add' else -1
+        adjust_counter(Hashtag, 'posts_count', delta, pk__in=pk_set)
+        if action == 'post_add':
+            record_usage(pk_set)
+    elif action == 'pre_clear':
+        adjust_counter(
+            Hashtag, 'posts_count', -1,
+            pk__in=instance.hashtags.values('pk')
+        )
+
+
+post_save.connect(post_created, sender=Post)
+post_delete.connect(post_deleted, sender=Post)
+pre_delete.connect(post_deleting, sender=Post)
+m2m_changed.connect(post_hashtags_changed, sender=Post.hashtags.through)
+
+# Invalidate cached anonymous post and profile lists, and the hashtag
+# lists whose posts_count changes with the tags of posts
+invalidate_on_change(Post, 'posts', 'profiles')
+invalidate_on_change(Post.hashtags.through, 'posts', 'hashtags')
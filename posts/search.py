@@ -0,0 +1,284 @@
+"""
+Full-text search for posts.
+
+Each post stores a precomputed search document (owner username, title
+and hashtag names) which is indexed by the database:
+
+- PostgreSQL: a GIN index on to_tsvector('simple', search_document),
+  queried with a prefix tsquery and ranked with ts_rank.
+- SQLite: an FTS5 table, posts_post_fts, whose rowid is the post id,
+  queried with MATCH and ranked with bm25.
+- Other databases fall back to a LIKE filter on the document, which
+  still avoids joining the hashtags of every post.
+
+The index and table are created by migration 0005_post_search_document.
+Documents are reindexed when a post, its hashtags, a hashtag name or
+the owner's username change (see the signal handlers at the bottom).
+"""
+import re
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from rest_framework.filters import SearchFilter
+from hashtags.models import Hashtag
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+POSTGRES_VECTOR = "to_tsvector('simple', posts_post.search_document)"
+
+
+def build_search_document(username, title, hashtag_names):
+    """
+    Returns the lower-cased text a post is searched by.
+    The username comes first so stale documents are easy to find
+    when a user is renamed.
+    """
+    return ' '.join([username, title, *sorted(hashtag_names)]).lower()
+
+
+def search_tokens(term):
+    """
+    Splits a search term into lower-cased word tokens.
+    """
+    return re.findall(r'\w+', term.lower())
+
+
+def fts_available(using=connection):
+    """
+    Returns True if the SQLite database has the FTS5 search table.
+    """
+    if using.vendor != 'sqlite':
+        return False
+    # Only a positive answer is remembered, the table can be created later
+    if getattr(using, '_posts_fts_available', False):
+        return True
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [FTS_TABLE],
+        )
+        using._posts_fts_available = cursor.fetchone() is not None
+    return using._posts_fts_available
+
+
+def write_fts_rows(documents, using=connection):
+    """
+    Replaces the FTS5 rows for the given {post id: document} mapping.
+    Does nothing on databases without the FTS5 table.
+    """
+    if not documents or not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [[post_id] for post_id in documents],
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, document) VALUES (%s, %s)',
+            list(documents.items()),
+        )
+
+
+def delete_fts_rows(post_ids, using=connection):
+    """
+    Removes the FTS5 rows of deleted posts.
+    """
+    if not post_ids or not fts_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [[post_id] for post_id in post_ids],
+        )
+
+
+def index_posts(post_ids):
+    """
+    Recomputes and stores the search document of the given posts.
+    Costs two reads and one bulk update, plus the FTS5 write on SQLite.
+    """
+    posts = list(
+        Post.objects.filter(pk__in=post_ids)
+        .select_related('owner').prefetch_related('hashtags')
+    )
+    for post in posts:
+        post.search_document = build_search_document(
+            post.owner.username,
+            post.title,
+            [hashtag.name for hashtag in post.hashtags.all()],
+        )
+    Post.objects.bulk_update(posts, ['search_document'])
+    write_fts_rows({post.pk: post.search_document for post in posts})
+    return len(posts)
+
+
+def search_posts(queryset, term):
+    """
+    Filters the queryset to posts matching every token of the term
+    (as a word prefix) and annotates a 'search_rank', higher is better.
+    """
+    tokens = search_tokens(term)
+    if not tokens:
+        return queryset
+
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        return queryset.extra(
+            where=[f"{POSTGRES_VECTOR} @@ to_tsquery('simple', %s)"],
+            params=[tsquery],
+        ).annotate(search_rank=RawSQL(
+            f"ts_rank({POSTGRES_VECTOR}, to_tsquery('simple', %s))",
+            [tsquery],
+        ))
+
+    if fts_available():
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        return queryset.extra(
+            where=[
+                f'posts_post.id IN (SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s)'
+            ],
+            params=[match],
+        ).annotate(search_rank=RawSQL(
+            f'(SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = posts_post.id)',
+            [match],
+        ))
+
+    condition = Q()
+    for token in tokens:
+        condition &= Q(search_document__contains=token)
+    return queryset.filter(condition)
+
+
+class PostSearchFilter(SearchFilter):
+    """
+    Search posts by owner username, title and hashtag names through
+    the full-text index, using the standard 'search' query parameter.
+    Results are ranked by relevance unless an ordering is requested.
+    """
+    def filter_queryset(self, request, queryset, view):
+        term = ' '.join(self.get_search_terms(request))
+        if not term:
+            return queryset
+        queryset = search_posts(queryset, term)
+        ordering_param = getattr(view, 'ordering_param', 'ordering')
+        if (
+            'search_rank' in queryset.query.annotations
+            and not request.query_params.get(ordering_param)
+        ):
+            queryset = queryset.order_by(
+                F('search_rank').desc(), '-created_at'
+            )
+        return queryset
+
+
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Reindex a post after it is saved. A new post has no hashtags yet,
+    so its document is built without reading them.
+    """
+    if raw:
+        return
+    if created:
+        document = build_search_document(
+            instance.owner.username, instance.title, []
+        )
+        Post.objects.filter(pk=instance.pk).update(search_document=document)
+        instance.search_document = document
+        write_fts_rows({instance.pk: document})
+    else:
+        index_posts([instance.pk])
+
+
+def post_deleted(sender, instance, **kwargs):
+    """
+    Remove a deleted post from the FTS5 table.
+    """
+    delete_fts_rows([instance.pk])
+
+
+def post_hashtags_changed(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    """
+    Reindex the affected posts when hashtags are added to or removed
+    from a post, from either side of the relation.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        index_posts([instance.pk])
+    elif pk_set:
+        index_posts(pk_set)
+    elif action == 'post_clear':
+        index_posts(getattr(instance, '_search_post_ids', []))
+
+
+def hashtag_pre_clear(sender, instance, action, reverse, **kwargs):
+    """
+    Remember the posts of a hashtag before they are cleared from it.
+    """
+    if action == 'pre_clear' and reverse:
+        instance._search_post_ids = list(
+            instance.posts.values_list('pk', flat=True)
+        )
+
+
+def hashtag_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Reindex the posts of a renamed hashtag.
+    """
+    if not created and not raw:
+        index_posts(instance.posts.values_list('pk', flat=True))
+
+
+def hashtag_deleting(sender, instance, **kwargs):
+    """
+    Remember the posts of a hashtag before it is deleted.
+    """
+    instance._search_post_ids = list(
+        instance.posts.values_list('pk', flat=True)
+    )
+
+
+def hashtag_deleted(sender, instance, **kwargs):
+    """
+    Reindex the posts of a deleted hashtag.
+    """
+    index_posts(getattr(instance, '_search_post_ids', []))
+
+
+def user_saved(sender, instance, created, raw=False, update_fields=None,
+               **kwargs):
+    """
+    Reindex a renamed user's posts. Only posts whose document does not
+    start with the current username are stale, so a save that does not
+    change the username costs a single query.
+    """
+    if created or raw:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    stale = Post.objects.filter(owner=instance).exclude(
+        search_document__startswith=instance.username.lower() + ' '
+    ).values_list('pk', flat=True)
+    stale = list(stale)
+    if stale:
+        index_posts(stale)
+
+
+post_save.connect(post_saved, sender=Post)
+post_delete.connect(post_deleted, sender=Post)
+m2m_changed.connect(hashtag_pre_clear, sender=Post.hashtags.through)
+m2m_changed.connect(post_hashtags_changed, sender=Post.hashtags.through)
+post_save.connect(hashtag_saved, sender=Hashtag)
+pre_delete.connect(hashtag_deleting, sender=Hashtag)
+post_delete.connect(hashtag_deleted, sender=Hashtag)
+post_save.connect(user_saved, sender=User)
@@ -3,24 +3,109 @@
 # creating and updating posts with associated hashtags and images.
 import re
 from rest_framework import serializers
+from drf_api.images import (
+    ImageVariantsMixin,
+    image_urls,
+    validate_image_upload,
+)
 from posts.models import Post
 from likes.models import Like
-from hashtags.models import Hashtag
+from hashtags.models import Hashtag, normalize_hashtag_name, resolve_hashtags
 from hashtags.serializers import HashtagSerializer
 from category.models import Category
 
 
+class HashtagIdsField(serializers.ListField):
+    """
+    List of hashtag ids, resolved to Hashtag instances with a single
+    query instead of one lookup per id.
+    """
+    child = serializers.IntegerField(min_value=1)
+
+    def to_internal_value(self, data):
+        ids = list(dict.fromkeys(super().to_internal_value(data)))
+        hashtags = Hashtag.objects.in_bulk(ids)
+        missing = [pk for pk in ids if pk not in hashtags]
+        if missing:
+            raise serializers.ValidationError(
+                f'Invalid pk "{missing[0]}" - object does not exist.'
+            )
+        return [hashtags[pk] for pk in ids]
+
+    def to_representation(self, value):
+        return [hashtag.pk for hashtag in value.all()]
+
+
+class HashtagNamesMixin(serializers.Serializer):
+    """
+    Lets a post serializer take hashtags by name as well as by id.
+    Names are normalized, and missing hashtags are created in bulk when
+    the post is saved, so a tagged post is uploaded in one request.
+    """
+    hashtag_names = serializers.ListField(
+        child=serializers.CharField(max_length=31),
+        write_only=True,
+        required=False,
+    )
+
+    def validate_hashtag_names(self, value):
+        """
+        Normalizes the names and checks their length and characters.
+        """
+        names = []
+        for name in map(normalize_hashtag_name, value):
+            if not name:
+                continue
+            if len(name) > 30:
+                raise serializers.ValidationError(
+                    f"Hashtag '{name}' is too long."
+                )
+            if not re.match(r'^\w+$', name):
+                raise serializers.ValidationError(
+                    f"Hashtag '{name}' contains invalid characters."
+                )
+            names.append(name)
+        return names
+
+    def pop_hashtags(self, validated_data):
+        """
+        Removes the hashtags given by id and by name from validated_data
+        and returns them combined, or None if neither was given.
+        """
+        hashtags = validated_data.pop('hashtags', None)
+        names = validated_data.pop('hashtag_names', None)
+        if names is None:
+            return hashtags
+        combined = {hashtag.pk: hashtag for hashtag in hashtags or []}
+        for hashtag in resolve_hashtags(names):
+            combined.setdefault(hashtag.pk, hashtag)
+        return list(combined.values())
+
+    def create(self, validated_data):
+        hashtags = self.pop_hashtags(validated_data)
+        post = super().create(validated_data)
+        if hashtags:
+            post.hashtags.set(hashtags)
+        return post
+
+
 # Serializer for serializing Post instances to JSON,
 # focusing on read operations.
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(ImageVariantsMixin, HashtagNamesMixin,
+                     serializers.ModelSerializer):
     owner = serializers.ReadOnlyField(source='owner.username')
     is_owner = serializers.SerializerMethodField()
     profile_id = serializers.ReadOnlyField(source='owner.profile.id')
     profile_image = serializers.ReadOnlyField(source='owner.profile.image.url')
+    profile_image_urls = serializers.SerializerMethodField()
+    image_urls = serializers.SerializerMethodField()
     like_id = serializers.SerializerMethodField()
     likes_count = serializers.ReadOnlyField()
     comments_count = serializers.ReadOnlyField()
     hashtags = HashtagSerializer(many=True, read_only=True)
+    hashtag_ids = HashtagIdsField(
+        source='hashtags', write_only=True, required=False
+    )
     category_name = serializers.ReadOnlyField(source='category.name')
 
     category = serializers.SlugRelatedField(
@@ -33,19 +118,9 @@ class PostSerializer(serializers.ModelSerializer):
     def validate_image(self, value):
         """
         Validates the image uploaded with the post,
-        checking its size and dimensions.
+        checking its size and dimensions from the image header.
         """
-        if value.size > 2 * 1024 * 1024:
-            raise serializers.ValidationError('Image size larger than 2MB!')
-        if value.image.height > 4096:
-            raise serializers.ValidationError(
-                'Image height larger than 4096px!'
-            )
-        if value.image.width > 4096:
-            raise serializers.ValidationError(
-                'Image width larger than 4096px!'
-            )
-        return value
+        return validate_image_upload(value)
 
     def get_is_owner(self, obj):
         """
@@ -54,11 +129,28 @@ class PostSerializer(serializers.ModelSerializer):
         request = self.context['request']
         return request.user == obj.owner
 
+    def get_image_urls(self, obj):
+        """
+        Returns the avatar, thumbnail, feed and full URLs of the image.
+        """
+        return image_urls(obj.image, obj.image_variants)
+
+    def get_profile_image_urls(self, obj):
+        """
+        Returns the size variant URLs of the owner's profile image.
+        """
+        profile = obj.owner.profile
+        return image_urls(profile.image, profile.image_variants)
+
     def get_like_id(self, obj):
         """
         Retrieves the ID of the current user's like for the post, if any.
+        Uses the 'viewer_like_id' annotation when the queryset provides it
+        and only falls back to a lookup for single, unannotated posts.
         """
         user = self.context['request'].user
+        if hasattr(obj, 'viewer_like_id'):
+            return obj.viewer_like_id if user.is_authenticated else None
         if user.is_authenticated:
             like = Like.objects.filter(
                 owner=user, post=obj
@@ -78,23 +170,22 @@ class PostSerializer(serializers.ModelSerializer):
         model = Post
         fields = [
             'id', 'owner', 'is_owner', 'profile_id',
-            'profile_image', 'created_at', 'updated_at',
-            'title', 'content', 'image', 'image_filter',
+            'profile_image', 'profile_image_urls', 'created_at',
+            'updated_at', 'title', 'content', 'image', 'image_urls',
+            'image_filter',
             'like_id', 'likes_count', 'comments_count',
-            'hashtags', 'category', 'category_name',
+            'hashtags', 'hashtag_ids', 'hashtag_names',
+            'category', 'category_name',
         ]
 
 
 # Serializer for creating & updating Post instances,
-# including associating hashtags via their IDs
-class PostCreateUpdateSerializer(serializers.ModelSerializer):
+# including associating hashtags via their IDs or names
+class PostCreateUpdateSerializer(ImageVariantsMixin, HashtagNamesMixin,
+                                 serializers.ModelSerializer):
     # Allows specifying hashtags by their IDs during
     # creation or update of a post.
-    hashtag_ids = serializers.PrimaryKeyRelatedField(
-        many=True,
-        queryset=Hashtag.objects.all(),
-        source='hashtags',
-    )
+    hashtag_ids = HashtagIdsField(source='hashtags', required=False)
     profile_image = serializers.ReadOnlyField(source='owner.profile.image.url')
 
     category = serializers.SlugRelatedField(
@@ -109,10 +200,17 @@ class PostCreateUpdateSerializer(serializers.ModelSerializer):
         model = Post
         fields = [
             'id', 'title', 'content', 'image',
-            'image_filter', 'hashtag_ids',
+            'image_filter', 'hashtag_ids', 'hashtag_names',
             'profile_image', 'category'
         ]
 
+    def validate_image(self, value):
+        """
+        Validates the image uploaded with the post,
+        checking its size and dimensions from the image header.
+        """
+        return validate_image_upload(value)
+
     def validate_hashtag_ids(self, value):
         """
         Validates the IDs of hashtags being associated with the post.
@@ -131,13 +229,14 @@ class PostCreateUpdateSerializer(serializers.ModelSerializer):
         return value
 
     def create(self, validated_data):
-        hashtags = validated_data.pop('hashtags')
+        hashtags = self.pop_hashtags(validated_data)
         post = Post.objects.create(**validated_data)
-        post.hashtags.set(hashtags)
+        if hashtags:
+            post.hashtags.set(hashtags)
         return post
 
     def update(self, instance, validated_data):
-        hashtags = validated_data.pop('hashtags')
+        hashtags = self.pop_hashtags(validated_data)
         instance.title = validated_data.get('title', instance.title)
         instance.content = validated_data.get('content', instance.content)
         instance.image = validated_data.get('image', instance.image)
@@ -147,5 +246,7 @@ class PostCreateUpdateSerializer(serializers.ModelSerializer):
         )
         instance.category = validated_data.get('category', instance.category)
         instance.save()
-        instance.hashtags.set(hashtags)
+        # A partial update without hashtags keeps the current ones
+        if hashtags is not None:
+            instance.hashtags.set(hashtags)
         return instance
@@ -9,11 +9,38 @@ initialized & configured before executing the tests.
 The test cases are custom coded with inspiration from sources
 listed in the README chapter Credits, Content.
 """
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from asgiref.sync import async_to_sync
+from io import StringIO
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import (
+    RequestFactory, TransactionTestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from .models import Post
+from .views import PostDetail, PostList
+from drf_api.asynchronous import async_view
+from drf_api.images import TRANSFORMATIONS, transformed_urls
+from likes.models import Like
+from comments.models import Comment
+from category.models import Category
+from hashtags.models import Hashtag, HashtagUsageBucket
+from hashtags.trending import record_usage, trending_scores
+from taskqueue.models import Task
 from rest_framework import status
 from rest_framework.test import APITestCase
+from PIL import Image
+
+MEDIA_ROOT = tempfile.mkdtemp()
 
 
 def fail_first(test_func):
@@ -48,6 +75,7 @@ class PostListViewTests(APITestCase):
         Set up necessary preconditions and initialize objects before
         each test is run. Creates a user and logs them in.
         """
+        cache.clear()
         User.objects.create_user(username='albin', password='albinsson1')
         self.client.login(username='albin', password='albinsson1')
         self.fail_case = True
@@ -114,6 +142,7 @@ class PostDetailViewTests(APITestCase):
     posts through the Post detail view.
     """
     def setUp(self):
+        cache.clear()
         self.albin = User.objects.create_user(
             username='albin',
             password='albinsson1'
@@ -213,6 +242,7 @@ class PostDeletionTests(APITestCase):
         Set up necessary preconditions and initialize objects before
         each test is run. Creates users and posts for testing.
         """
+        cache.clear()
         self.user = User.objects.create_user(
             username='testuser', password='testpassword')
         self.other_user = User.objects.create_user(
@@ -249,3 +279,793 @@ class PostDeletionTests(APITestCase):
         url = reverse('post-detail', kwargs={'pk': self.post.id})
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class PostLikeIdTests(APITestCase):
+    """
+    Tests for resolving the current user's like_id on post lists.
+    """
+    def setUp(self):
+        """
+        Creates a user with three posts, two of which the user likes.
+        """
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='albin', password='albinsson1')
+        self.posts = [
+            Post.objects.create(owner=self.user, title=f'title {i}')
+            for i in range(3)
+        ]
+        self.likes = [
+            Like.objects.create(owner=self.user, post=post)
+            for post in self.posts[:2]
+        ]
+        self.client.login(username='albin', password='albinsson1')
+
+    def test_list_returns_like_id_for_each_post(self):
+        """
+        Ensure each post carries the user's like id, or None if unliked.
+        """
+        response = self.client.get('/posts/')
+        like_ids = {
+            post['id']: post['like_id'] for post in response.data['results']
+        }
+        self.assertEqual(like_ids[self.posts[0].id], self.likes[0].id)
+        self.assertEqual(like_ids[self.posts[1].id], self.likes[1].id)
+        self.assertIsNone(like_ids[self.posts[2].id])
+
+    def test_list_does_not_query_likes_per_post(self):
+        """
+        Ensure like ids are resolved within the list query rather than
+        with a separate query per post.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/posts/')
+        like_lookups = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT "likes_like"')
+        ]
+        self.assertEqual(like_lookups, [])
+
+
+class PostCounterTests(APITestCase):
+    """
+    Tests for the denormalized likes_count and comments_count columns.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='albin', password='albinsson1')
+        self.post = Post.objects.create(owner=self.user, title='a title')
+
+    def test_counters_follow_likes_and_comments(self):
+        """
+        Ensure creating and deleting likes and comments keeps the
+        counters in step.
+        """
+        like = Like.objects.create(owner=self.user, post=self.post)
+        Comment.objects.create(
+            owner=self.user, post=self.post, content='first')
+        Comment.objects.create(
+            owner=self.user, post=self.post, content='second')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 1)
+        self.assertEqual(self.post.comments_count, 2)
+
+        like.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 0)
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.posts_count, 1)
+
+    def test_recount_counters_repairs_drift(self):
+        """
+        Ensure the recount_counters command recomputes stale counters.
+        """
+        Like.objects.create(owner=self.user, post=self.post)
+        Post.objects.update(likes_count=7, comments_count=3)
+        call_command('recount_counters', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 1)
+        self.assertEqual(self.post.comments_count, 0)
+
+
+class PostCursorPaginationTests(APITestCase):
+    """
+    Tests for the optional cursor pagination of the post list.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='albin', password='albinsson1')
+        for i in range(15):
+            Post.objects.create(owner=self.user, title=f'title {i}')
+
+    def test_page_number_pagination_is_default(self):
+        """
+        Ensure clients that do not ask for cursors still get counts.
+        """
+        response = self.client.get('/posts/')
+        self.assertEqual(response.data['count'], 15)
+
+    def test_cursor_pages_cover_every_post_without_counting(self):
+        """
+        Ensure following the cursor links returns each post exactly once
+        and that no COUNT query is made.
+        """
+        seen = []
+        url = '/posts/?pagination=cursor'
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.client.get(url)
+                self.assertNotIn('count', response.data)
+                seen += [post['id'] for post in response.data['results']]
+                url = response.data['next']
+        self.assertEqual(
+            seen, list(Post.objects.order_by('-created_at', '-id')
+                       .values_list('id', flat=True))
+        )
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        ))
+
+    def test_mutable_orderings_use_page_numbers(self):
+        """
+        Ensure ordering by a counter that changes between pages falls
+        back to page numbers instead of an unstable cursor.
+        """
+        response = self.client.get(
+            '/posts/?pagination=cursor&ordering=-likes_count'
+        )
+        self.assertEqual(response.data['count'], 15)
+        response = self.client.get(
+            '/posts/?pagination=cursor&ordering=-comments_count'
+        )
+        self.assertEqual(response.data['count'], 15)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class PostListQueryCountTests(APITestCase):
+    """
+    Guards the number of queries needed for a page of the post feed.
+    """
+    def setUp(self):
+        """
+        Creates posts from several users, each with a category and
+        hashtags, so every related object of the feed is exercised.
+        """
+        cache.clear()
+        category = Category.objects.create(name='Travel')
+        hashtags = [
+            Hashtag.objects.create(name=f'tag{i}') for i in range(3)
+        ]
+        self.users = [
+            User.objects.create_user(username=f'user{i}', password='pass')
+            for i in range(5)
+        ]
+        for user in self.users:
+            for i in range(2):
+                post = Post.objects.create(
+                    owner=user, title=f'title {i}', category=category
+                )
+                post.hashtags.set(hashtags)
+                Like.objects.create(owner=self.users[0], post=post)
+
+    def test_feed_query_count_is_fixed(self):
+        """
+        A page of posts takes one count query, one page query and one
+        hashtag prefetch, whether or not the user is logged in, once
+        the user's block set is cached.
+        """
+        with self.assertNumQueries(3):
+            response = self.client.get('/posts/')
+        self.assertEqual(len(response.data['results']), 10)
+
+        self.client.force_authenticate(self.users[0])
+        self.client.get('/posts/')
+        with self.assertNumQueries(3):
+            response = self.client.get('/posts/')
+        self.assertTrue(all(
+            post['like_id'] and post['hashtags'] and post['category_name']
+            for post in response.data['results']
+        ))
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class PostListResponseCacheTests(APITestCase):
+    """
+    Tests for caching the post list for anonymous users.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='albin', password='albinsson1')
+        Post.objects.create(owner=self.user, title='first')
+
+    def test_anonymous_list_is_served_from_cache(self):
+        """
+        Ensure a repeated anonymous request makes no queries, while a
+        different query string is cached separately.
+        """
+        self.client.get('/posts/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/posts/')
+        self.assertEqual(response.data['count'], 1)
+
+        response = self.client.get('/posts/?search=nothing-matches')
+        self.assertEqual(response.data['count'], 0)
+
+    def test_changes_invalidate_cached_list(self):
+        """
+        Ensure creating a post or liking one invalidates the cache.
+        """
+        self.client.get('/posts/')
+        post = Post.objects.create(owner=self.user, title='second')
+        response = self.client.get('/posts/')
+        self.assertEqual(response.data['count'], 2)
+
+        Like.objects.create(owner=self.user, post=post)
+        response = self.client.get('/posts/')
+        self.assertEqual(response.data['results'][0]['likes_count'], 1)
+
+    def test_logged_in_users_are_not_cached(self):
+        """
+        Ensure responses for logged in users bypass the cache.
+        """
+        self.client.force_authenticate(self.user)
+        self.client.get('/posts/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/posts/')
+        self.assertGreater(len(queries), 0)
+
+
+class PostSearchTests(APITestCase):
+    """
+    Tests for the full-text post search.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='albin', password='albinsson1')
+        self.other = User.objects.create_user(
+            username='bertil', password='bertilsson1')
+        self.sunset = Post.objects.create(
+            owner=self.user, title='Sunset over the lake')
+        self.forest = Post.objects.create(
+            owner=self.other, title='Morning forest walk')
+
+    def search(self, term):
+        response = self.client.get('/posts/', {'search': term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [post['id'] for post in response.data['results']]
+
+    def test_search_matches_title_prefix_and_username(self):
+        """
+        Ensure title word prefixes and owner usernames match.
+        """
+        self.assertEqual(self.search('suns'), [self.sunset.id])
+        self.assertEqual(self.search('bertil'), [self.forest.id])
+        self.assertEqual(self.search('lake albin'), [self.sunset.id])
+        self.assertEqual(self.search('nothing'), [])
+
+    def test_hashtag_changes_are_reindexed(self):
+        """
+        Ensure adding, renaming and removing a hashtag updates search
+        results, and a post with several matching hashtags is listed once.
+        """
+        nature = Hashtag.objects.create(name='nature')
+        natural = Hashtag.objects.create(name='natural')
+        self.forest.hashtags.add(nature, natural)
+        self.assertEqual(self.search('natur'), [self.forest.id])
+
+        nature.name = 'outdoors'
+        nature.save()
+        self.assertEqual(self.search('outdoors'), [self.forest.id])
+
+        self.forest.hashtags.remove(nature)
+        self.assertEqual(self.search('outdoors'), [])
+
+        natural.delete()
+        self.assertEqual(self.search('natural'), [])
+
+    def test_renaming_user_reindexes_posts(self):
+        """
+        Ensure posts are found by their owner's new username.
+        """
+        self.user.username = 'cecilia'
+        self.user.save()
+        self.assertEqual(self.search('cecilia'), [self.sunset.id])
+        self.assertEqual(self.search('albin'), [])
+
+    def test_results_are_ranked(self):
+        """
+        Ensure a post matching the term more often is listed first.
+        """
+        lake = Post.objects.create(
+            owner=self.other, title='Lake, lake and another lake')
+        self.assertEqual(self.search('lake'), [lake.id, self.sunset.id])
+
+    def test_deleted_posts_are_not_found(self):
+        """
+        Ensure deleting a post removes it from the search index.
+        """
+        self.sunset.delete()
+        self.assertEqual(self.search('sunset'), [])
+
+    def test_rebuild_search_index_command(self):
+        """
+        Ensure the command restores a document changed behind the
+        signals' back.
+        """
+        Post.objects.filter(pk=self.sunset.pk).update(title='Harbour')
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('2 posts reindexed', out.getvalue())
+        self.assertEqual(self.search('harbour'), [self.sunset.id])
+
+
+class HashtagCounterTests(APITestCase):
+    """
+    Tests for the denormalized Hashtag.posts_count.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='albin', password='albinsson1')
+        self.post = Post.objects.create(owner=self.user, title='first')
+        self.tag = Hashtag.objects.create(name='nature')
+
+    def posts_count(self):
+        self.tag.refresh_from_db()
+        return self.tag.posts_count
+
+    def test_count_follows_added_and_removed_hashtags(self):
+        """
+        Ensure adding, removing and clearing hashtags from either side
+        of the relation keeps the count in step.
+        """
+        self.post.hashtags.add(self.tag)
+        self.post.hashtags.add(self.tag)
+        self.assertEqual(self.posts_count(), 1)
+        other = Post.objects.create(owner=self.user, title='second')
+        self.tag.posts.add(other)
+        self.assertEqual(self.posts_count(), 2)
+        self.post.hashtags.clear()
+        self.assertEqual(self.posts_count(), 1)
+        self.tag.posts.remove(other)
+        self.assertEqual(self.posts_count(), 0)
+
+    def test_deleting_post_decrements_count(self):
+        """
+        Ensure deleting a tagged post decrements the count.
+        """
+        self.post.hashtags.add(self.tag)
+        self.post.delete()
+        self.assertEqual(self.posts_count(), 0)
+
+    def test_recount_counters_restores_count(self):
+        """
+        Ensure the recount command repairs a drifted count.
+        """
+        self.post.hashtags.add(self.tag)
+        Hashtag.objects.update(posts_count=7)
+        call_command('recount_counters', stdout=StringIO())
+        self.assertEqual(self.posts_count(), 1)
+
+
+class HashtagAutocompleteTests(APITestCase):
+    """
+    Tests for the hashtag autocomplete endpoint.
+    """
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(
+            username='albin', password='albinsson1')
+        names = ['Nature', 'natural', 'nat', 'night', 'landscape']
+        self.tags = {
+            name: Hashtag.objects.create(name=name) for name in names
+        }
+        for index in range(3):
+            post = Post.objects.create(owner=user, title=f'post {index}')
+            post.hashtags.add(self.tags['natural'])
+            if index:
+                post.hashtags.add(self.tags['Nature'])
+
+    def autocomplete(self, **params):
+        response = self.client.get('/hashtags/autocomplete/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [tag['name'] for tag in response.data]
+
+    def test_prefix_matches_ranked_by_usage(self):
+        """
+        Ensure matches are case-insensitive and the most used come first.
+        """
+        self.assertEqual(
+            self.autocomplete(q='NAT'), ['natural', 'Nature', 'nat']
+        )
+        self.assertEqual(self.autocomplete(q='#nati'), [])
+        self.assertEqual(self.autocomplete(q='l'), ['landscape'])
+
+    def test_limit_and_empty_prefix(self):
+        """
+        Ensure the limit is applied and an empty prefix returns the
+        most used hashtags.
+        """
+        self.assertEqual(
+            self.autocomplete(q='', limit=2), ['natural', 'Nature']
+        )
+        self.assertEqual(len(self.autocomplete(limit='many')), 5)
+
+    def test_autocomplete_is_one_query(self):
+        """
+        Ensure a suggestion request costs a single query.
+        """
+        with self.assertNumQueries(1):
+            self.client.get('/hashtags/autocomplete/', {'q': 'na'})
+
+    def test_tagging_refreshes_cached_suggestions(self):
+        """
+        Ensure tagging posts invalidates cached suggestions, whose
+        usage counts change without a Hashtag save.
+        """
+        self.assertEqual(self.autocomplete(q='nat')[0], 'natural')
+        user = User.objects.get(username='albin')
+        for index in range(4):
+            post = Post.objects.create(owner=user, title=f'nat {index}')
+            post.hashtags.add(self.tags['nat'])
+        self.assertEqual(self.autocomplete(q='nat')[0], 'nat')
+
+
+class TrendingHashtagTests(APITestCase):
+    """
+    Tests for the trending hashtags buckets and endpoint.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='albin', password='albinsson1')
+        self.hot = Hashtag.objects.create(name='hot')
+        self.steady = Hashtag.objects.create(name='steady')
+
+    def trending(self, **params):
+        response = self.client.get('/hashtags/trending/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [tag['name'] for tag in response.data]
+
+    def test_tagging_posts_fills_the_current_bucket(self):
+        """
+        Ensure tagging from either side of the relation is counted.
+        """
+        post = Post.objects.create(owner=self.user, title='first')
+        post.hashtags.add(self.hot, self.steady)
+        self.hot.posts.add(Post.objects.create(owner=self.user, title='2nd'))
+        counts = dict(
+            HashtagUsageBucket.objects.values_list('hashtag', 'count')
+        )
+        self.assertEqual(counts, {self.hot.id: 2, self.steady.id: 1})
+
+    def test_recent_use_outranks_older_use(self):
+        """
+        Ensure decay ranks three recent uses above four older ones, and
+        the window limits which buckets count.
+        """
+        now = timezone.now()
+        record_usage([self.steady.id], 4, now - timedelta(hours=20))
+        record_usage([self.hot.id], 3, now)
+        self.assertEqual(self.trending(window='24h'), ['hot', 'steady'])
+        self.assertEqual(self.trending(window='1h'), ['hot'])
+        scores = trending_scores('24h', now)
+        self.assertGreater(scores[self.hot.id], scores[self.steady.id])
+
+    def test_trending_does_not_read_the_join_table(self):
+        """
+        Ensure a lookup reads the buckets and the hashtags only.
+        """
+        record_usage([self.hot.id])
+        with CaptureQueriesContext(connection) as queries:
+            self.trending()
+        self.assertEqual(len(queries), 2)
+        for query in queries:
+            self.assertNotIn('posts_post_hashtags', query['sql'])
+
+    def test_invalid_window(self):
+        """
+        Ensure an unknown window is rejected.
+        """
+        response = self.client.get('/hashtags/trending/', {'window': '2y'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_prune_and_rebuild_command(self):
+        """
+        Ensure old buckets are pruned and rebuild restores recent ones.
+        """
+        record_usage([self.hot.id], 1, timezone.now() - timedelta(days=8))
+        post = Post.objects.create(owner=self.user, title='first')
+        post.hashtags.add(self.steady)
+        HashtagUsageBucket.objects.filter(hashtag=self.steady).delete()
+
+        out = StringIO()
+        call_command('prune_hashtag_usage', rebuild=True, stdout=out)
+        self.assertIn('1 usage buckets pruned', out.getvalue())
+        self.assertEqual(
+            list(HashtagUsageBucket.objects.values_list('hashtag', 'count')),
+            [(self.steady.id, 1)]
+        )
+
+
+class PostHashtagNamesTests(APITestCase):
+    """
+    Tests for tagging posts by hashtag name on create and update.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='albin', password='albinsson1')
+        self.client.login(username='albin', password='albinsson1')
+        self.nature = Hashtag.objects.create(name='Nature')
+
+    def test_create_resolves_and_creates_hashtags(self):
+        """
+        Ensure existing hashtags are matched case-insensitively, missing
+        ones are created and duplicates are ignored.
+        """
+        response = self.client.post('/posts/', {
+            'title': 'Forest',
+            'hashtag_names': ['#nature', 'Moss', 'moss', ' ferns '],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            sorted(tag['name'] for tag in response.data['hashtags']),
+            ['Nature', 'ferns', 'moss']
+        )
+        self.assertEqual(Hashtag.objects.count(), 3)
+
+    def test_names_and_ids_are_combined_on_update(self):
+        """
+        Ensure names and ids can be given together when updating.
+        """
+        post = Post.objects.create(owner=self.user, title='Forest')
+        sky = Hashtag.objects.create(name='sky')
+        response = self.client.put(f'/posts/{post.id}/', {
+            'title': 'Forest',
+            'hashtag_ids': [sky.id],
+            'hashtag_names': ['nature', 'clouds'],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(post.hashtags.values_list('name', flat=True)),
+            ['Nature', 'clouds', 'sky']
+        )
+
+    def test_partial_update_keeps_hashtags(self):
+        """
+        Ensure a PATCH without hashtags leaves the post's hashtags alone.
+        """
+        post = Post.objects.create(owner=self.user, title='Forest')
+        post.hashtags.add(self.nature)
+        response = self.client.patch(
+            f'/posts/{post.id}/', {'title': 'Woods'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(post.hashtags.all()), [self.nature])
+
+    def test_invalid_names_and_ids_are_rejected(self):
+        """
+        Ensure bad characters, long names and unknown ids fail validation.
+        """
+        for data in [
+            {'hashtag_names': ['no spaces']},
+            {'hashtag_names': ['x' * 31]},
+            {'hashtag_ids': [9999]},
+        ]:
+            response = self.client.post(
+                '/posts/', {'title': 'Forest', **data}, format='json'
+            )
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+        self.assertFalse(Post.objects.exists())
+
+    def test_hashtag_lookups_do_not_grow_with_tag_count(self):
+        """
+        Ensure resolving ids and names costs the same number of queries
+        for one hashtag as for many.
+        """
+        ids = [
+            Hashtag.objects.create(name=f'tag{index}').id
+            for index in range(5)
+        ]
+
+        def queries_for(data):
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.post(
+                    '/posts/', {'title': 'Forest', **data}, format='json'
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(captured)
+
+        self.assertEqual(
+            queries_for({'hashtag_ids': ids[:1]}),
+            queries_for({'hashtag_ids': ids}),
+        )
+        self.assertEqual(
+            queries_for({'hashtag_names': ['new1']}),
+            queries_for({'hashtag_names': [f'new{i}' for i in range(2, 7)]}),
+        )
+
+
+@override_settings(
+    DEFAULT_FILE_STORAGE='django.core.files.storage.FileSystemStorage',
+    IMAGE_VARIANT_STORAGE='django.core.files.storage.FileSystemStorage',
+    MEDIA_ROOT=MEDIA_ROOT,
+)
+class PostImageTests(APITestCase):
+    """
+    Tests for validating post images and generating their variants.
+    """
+    def setUp(self):
+        cache.clear()
+        User.objects.create_user(username='albin', password='albinsson1')
+        self.client.login(username='albin', password='albinsson1')
+
+    def tearDown(self):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, size):
+        buffer = io.BytesIO()
+        Image.new('L', size).save(buffer, 'PNG')
+        return SimpleUploadedFile('photo.png', buffer.getvalue())
+
+    def test_oversized_dimensions_are_rejected(self):
+        """
+        Ensure an image wider than 4096px is rejected, even though the
+        file itself is small.
+        """
+        response = self.client.post(
+            '/posts/', {'title': 'Wide', 'image': self.upload((5000, 10))},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data['image'], ['Image width larger than 4096px!']
+        )
+
+    def test_created_post_has_variants(self):
+        """
+        Ensure creating a post with an image stores its variants, and a
+        grayscale image is converted for encoding.
+        """
+        response = self.client.post(
+            '/posts/', {'title': 'Tall', 'image': self.upload((500, 1500))},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        variants = Post.objects.get().image_variants
+        self.assertEqual(
+            (variants['thumbnail']['width'], variants['thumbnail']['height']),
+            (107, 320)
+        )
+        self.assertEqual(
+            (variants['full']['width'], variants['full']['height']),
+            (500, 1500)
+        )
+
+    @override_settings(TASKS_BACKEND='taskqueue.backends.DatabaseBackend')
+    def test_new_image_drops_old_variants(self):
+        """
+        Ensure uploading a new image clears the variants of the old one
+        while its own are still queued.
+        """
+        post = Post.objects.create(
+            owner=User.objects.get(), title='Old', image_variants={
+                'feed': {'url': '/media/old.webp', 'width': 1, 'height': 1},
+            }
+        )
+        response = self.client.put(
+            f'/posts/{post.id}/',
+            {'title': 'New', 'image': self.upload((10, 10))},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Post.objects.get().image_variants, {})
+        self.assertTrue(
+            Task.objects.filter(name='images.generate_variants').exists()
+        )
+
+
+class PostImageUrlTests(APITestCase):
+    """
+    Tests for the image size variant URLs on posts.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='albin', password='albinsson1')
+        for index in range(3):
+            Post.objects.create(owner=self.user, title=f'post {index}')
+        transformed_urls.cache_clear()
+
+    def test_urls_use_cloudinary_transformations(self):
+        """
+        Ensure each variant URL carries its transformation.
+        """
+        response = self.client.get('/posts/')
+        post = response.data['results'][0]
+        self.assertEqual(set(post['image_urls']), set(TRANSFORMATIONS))
+        for variant, transformation in TRANSFORMATIONS.items():
+            self.assertIn(
+                f'/upload/{transformation}/',
+                post['profile_image_urls'][variant]
+            )
+
+    def test_urls_are_built_once_per_image_name(self):
+        """
+        Ensure rows sharing an image name reuse the cached URLs.
+        """
+        self.client.get('/posts/')
+        self.assertEqual(transformed_urls.cache_info().misses, 1)
+
+    def test_stored_variants_are_preferred(self):
+        """
+        Ensure variants written by the image pipeline replace the
+        derived URLs.
+        """
+        post = Post.objects.first()
+        Post.objects.filter(pk=post.pk).update(image_variants={
+            'feed': {'url': '/media/feed.webp', 'width': 1, 'height': 1},
+        })
+        response = self.client.get(f'/posts/{post.id}/')
+        self.assertEqual(
+            response.data['image_urls']['feed'], '/media/feed.webp'
+        )
+        self.assertIn('/upload/c_limit,w_320', (
+            response.data['image_urls']['thumbnail']
+        ))
+
+
+class AsyncPostViewTests(TransactionTestCase):
+    """
+    Tests for the async post views served in ASGI mode. They run in
+    their own threads, with their own database connections, so the
+    test data must be committed.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='asyncuser', password='pass'
+        )
+        self.posts = [
+            Post.objects.create(owner=self.user, title=f'title {i}')
+            for i in range(3)
+        ]
+        self.factory = RequestFactory()
+
+    def test_async_list_matches_sync_list(self):
+        """
+        Ensure the async post list returns the same data as the sync one.
+        """
+        view = PostList.as_view()
+        response = async_to_sync(async_view(view))(
+            self.factory.get('/posts/')
+        )
+        self.assertTrue(response.is_rendered)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data, view(self.factory.get('/posts/')).data
+        )
+
+    def test_async_detail_returns_post(self):
+        """
+        Ensure the async post detail finds the post and 404s otherwise.
+        """
+        view = async_to_sync(async_view(PostDetail.as_view()))
+        post = self.posts[0]
+        response = view(self.factory.get(f'/posts/{post.id}/'), pk=post.id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], post.title)
+        response = view(self.factory.get('/posts/999/'), pk=999)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,8 +1,14 @@
 from django.urls import path, include
+from drf_api.asynchronous import serving_view
 from posts import views
 
 urlpatterns = [
-    path('posts/', views.PostList.as_view(), name='post-list'),
-    path('posts/<int:pk>/', views.PostDetail.as_view(), name='post-detail'),
+    path(
+        'posts/', serving_view(views.PostList.as_view()), name='post-list'
+    ),
+    path(
+        'posts/<int:pk>/', serving_view(views.PostDetail.as_view()),
+        name='post-detail'
+    ),
     path('', include('hashtags.urls')),
 ]
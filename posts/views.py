@@ -1,21 +1,64 @@
-from django.db.models import Count
+from django.db.models import OuterRef, Subquery
 from rest_framework import generics, permissions, filters
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_api.pagination import CursorOrPageNumberPagination
+from drf_api.response_cache import AnonymousResponseCacheMixin
+from blocks.models import exclude_blocked
 from drf_api.permissions import IsOwnerOrReadOnly
+from drf_api.instrumentation import RequestMetricsMixin
+from likes.models import Like
 from .models import Post, Category
+from .search import PostSearchFilter
 from .serializers import PostSerializer, PostCreateUpdateSerializer
 
 
-class PostList(generics.ListCreateAPIView):
+def annotate_viewer_like(queryset, user):
+    """
+    Annotate each post with the id of the given user's like, if any.
+    Resolving it in the list query keeps the feed at a constant
+    number of queries instead of one like lookup per post.
+    """
+    viewer_like = Like.objects.filter(
+        owner=user, post=OuterRef('pk')
+    ).values('id')[:1]
+    return queryset.annotate(viewer_like_id=Subquery(viewer_like))
+
+
+def get_post_queryset(user):
+    """
+    Base queryset for reading posts as the given user.
+    Loads the owner, the owner's profile and the category in the main
+    query and the hashtags in one extra query, so a page of posts costs
+    a fixed number of queries. Posts by users the viewer blocks are
+    excluded and the viewer's like id is annotated.
+    """
+    queryset = Post.objects.select_related(
+        'owner__profile', 'category'
+    ).prefetch_related('hashtags').order_by('-created_at')
+
+    if user.is_authenticated:
+        queryset = exclude_blocked(queryset, user)
+        queryset = annotate_viewer_like(queryset, user)
+    return queryset
+
+
+class PostList(RequestMetricsMixin, AnonymousResponseCacheMixin,
+               generics.ListCreateAPIView):
     """
     List posts or create a post if logged in
     The perform_create method associates the post with the logged in user.
+    Anonymous list responses are cached.
+    The 'search' parameter runs a ranked full-text search on the owner's
+    username, the title and the hashtag names.
     """
+    cache_namespaces = ('posts',)
+    cache_timeout = 30
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = CursorOrPageNumberPagination
     filter_backends = [
         filters.OrderingFilter,
-        filters.SearchFilter,
+        PostSearchFilter,
         DjangoFilterBackend,
     ]
     filterset_fields = [
@@ -25,11 +68,6 @@ class PostList(generics.ListCreateAPIView):
         'hashtags__name',
         'category',
     ]
-    search_fields = [
-        'owner__username',
-        'title',
-        'hashtags__name',
-    ]
     ordering_fields = [
         'likes_count',
         'comments_count',
@@ -37,16 +75,7 @@ class PostList(generics.ListCreateAPIView):
     ]
 
     def get_queryset(self):
-        queryset = Post.objects.annotate(
-            likes_count=Count('likes', distinct=True),
-            comments_count=Count('comment', distinct=True)
-        ).order_by('-created_at')
-
-        user = self.request.user
-        if user.is_authenticated:
-            blocked_users = user.blocking.values_list('target', flat=True)
-            queryset = queryset.exclude(owner__in=blocked_users)
-        return queryset
+        return get_post_queryset(self.request.user)
 
     def perform_create(self, serializer):
         """
@@ -60,7 +89,7 @@ class PostList(generics.ListCreateAPIView):
             serializer.save(owner=self.request.user)
 
 
-class PostDetail(generics.RetrieveUpdateDestroyAPIView):
+class PostDetail(RequestMetricsMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve a post and edit or delete it if you own it.
     """
@@ -68,16 +97,7 @@ class PostDetail(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsOwnerOrReadOnly]
 
     def get_queryset(self):
-        queryset = Post.objects.annotate(
-            likes_count=Count('likes', distinct=True),
-            comments_count=Count('comment', distinct=True)
-        ).order_by('-created_at')
-
-        user = self.request.user
-        if user.is_authenticated:
-            blocked_users = user.blocking.values_list('target', flat=True)
-            queryset = queryset.exclude(owner__in=blocked_users)
-        return queryset
+        return get_post_queryset(self.request.user)
 
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
@@ -0,0 +1,75 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:33
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, related_field, outer_field='pk'):
+    counts = model.objects.filter(
+        **{related_field: OuterRef(outer_field)}
+    ).order_by().values(related_field).annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Profile = apps.get_model('profiles', 'Profile')
+    Like = apps.get_model('likes', 'Like')
+    Comment = apps.get_model('comments', 'Comment')
+    Follower = apps.get_model('followers', 'Follower')
+    Block = apps.get_model('blocks', 'Block')
+    Post.objects.update(
+        likes_count=count_of(Like, 'post'),
+        comments_count=count_of(Comment, 'post'),
+    )
+    Profile.objects.update(
+        posts_count=count_of(Post, 'owner', 'owner'),
+        followers_count=count_of(Follower, 'followed', 'owner'),
+        following_count=count_of(Follower, 'owner', 'owner'),
+        blocked_count=count_of(Block, 'target', 'owner'),
+        blocking_count=count_of(Block, 'owner', 'owner'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0001_initial'),
+        ('posts', '0003_post_counters'),
+        ('likes', '0001_initial'),
+        ('comments', '0001_initial'),
+        ('followers', '0001_initial'),
+        ('blocks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='blocked_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='blocking_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.db.models.signals import post_save
 from django.contrib.auth.models import User
+from drf_api.response_cache import invalidate_on_change
 
 
 class Profile(models.Model):
@@ -12,16 +13,46 @@ class Profile(models.Model):
     image = models.ImageField(
         upload_to='images/', default='../pixavibe/default_profile_pbhpua.jpg'
     )
+    # Resized copies of the image, see drf_api/images.py
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Denormalized counters, maintained by the Post, Follower and
+    # Block signals
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
+    following_count = models.PositiveIntegerField(default=0, editable=False)
+    blocked_count = models.PositiveIntegerField(default=0, editable=False)
+    blocking_count = models.PositiveIntegerField(default=0, editable=False)
     # Return instances in reverse order
 
     class Meta:
         ordering = ['-created_at']
+        # Match the default ordering and the most used count ordering
+        indexes = [
+            models.Index(fields=['-created_at'], name='profile_created_idx'),
+            models.Index(
+                fields=['-followers_count'], name='profile_followers_idx'
+            ),
+        ]
 
     # human-readable string with info of who owner is
     def __str__(self):
         return f"{self.owner}'s profile"
 
 
+def profiles_of_users(user_ids):
+    """
+    Returns the profiles, with their owners, of the given users in the
+    order of user_ids, skipping users without a profile.
+    """
+    profiles = {
+        profile.owner_id: profile
+        for profile in Profile.objects.select_related('owner').filter(
+            owner_id__in=user_ids
+        )
+    }
+    return [profiles[user_id] for user_id in user_ids if user_id in profiles]
+
+
 # Define create profile function before passing it as an argument
 def create_profile(sender, instance, created, **kwargs):
     """
@@ -34,3 +65,7 @@ def create_profile(sender, instance, created, **kwargs):
 # Listen for the post_save signal coming from the User model
 # by calling the connect function
 post_save.connect(create_profile, sender=User)
+
+# Invalidate cached anonymous profile lists, and post lists as they
+# show the owner's profile image
+invalidate_on_change(Profile, 'profiles', 'posts')
@@ -8,15 +8,31 @@ user ownership, following status, and blocking status.
 
 """
 from rest_framework import serializers
+from drf_api.images import ImageVariantsMixin, image_urls
+from drf_api.relationships import ViewerRelationships
 from .models import Profile
-from followers.models import Follower
-from blocks.models import Block
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileListSerializer(serializers.ListSerializer):
+    """
+    List serializer that resolves the viewer's follow and block
+    relationships for the whole page up front, so each profile row
+    reads them from memory instead of querying the database.
+    """
+    def to_representation(self, data):
+        profiles = list(data.all() if hasattr(data, 'all') else data)
+        self.context['relationships'] = ViewerRelationships(
+            self.context['request'].user,
+            [profile.owner_id for profile in profiles]
+        )
+        return super().to_representation(profiles)
+
+
+class ProfileSerializer(ImageVariantsMixin, serializers.ModelSerializer):
     """
     Serializer for the Profile model. Includes custom fields to handle
     user ownership, following status, and blocking status.
+    Uploaded images are resized into variants after saving.
     """
     owner = serializers.ReadOnlyField(source='owner.username')
     is_owner = serializers.SerializerMethodField()
@@ -27,6 +43,27 @@ class ProfileSerializer(serializers.ModelSerializer):
     blocking_id = serializers.SerializerMethodField()
     blocking_target = serializers.SerializerMethodField()
     is_blocking = serializers.SerializerMethodField()
+    image_urls = serializers.SerializerMethodField()
+
+    def get_relationships(self, obj):
+        """
+        Returns the viewer's relationships covering the profile owner,
+        loading them for this profile alone when no page-wide map
+        has been prepared (e.g. in the detail view).
+        """
+        relationships = self.context.get('relationships')
+        if relationships is None or not relationships.covers(obj.owner_id):
+            relationships = ViewerRelationships(
+                self.context['request'].user, [obj.owner_id]
+            )
+            self.context['relationships'] = relationships
+        return relationships
+
+    def get_image_urls(self, obj):
+        """
+        Returns the avatar, thumbnail, feed and full URLs of the image.
+        """
+        return image_urls(obj.image, obj.image_variants)
 
     def get_is_owner(self, obj):
         """
@@ -40,13 +77,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         Retrieves the ID of the following relationship if the user is
         following the profile owner.
         """
-        user = self.context['request'].user
-        if user.is_authenticated:
-            following = Follower.objects.filter(
-                owner=user, followed=obj.owner
-            ).first()
-            return following.id if following else None
-        return None
+        return self.get_relationships(obj).following.get(obj.owner_id)
 
     def get_is_blocking(self, obj):
         """
@@ -56,14 +87,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         - bool: True if the request user is blocking the profile owner,
           else False.
         """
-        user = self.context['request'].user
-        if user.is_authenticated:
-            blocking = Block.objects.filter(
-                owner=user,
-                target=obj.owner
-            ).first()
-            return blocking is not None
-        return False
+        return obj.owner_id in self.get_relationships(obj).blocking
 
     def get_blocking_id(self, obj):
         """
@@ -74,14 +98,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         - int or None: The ID of the blocking relationship or None if
           not blocking.
         """
-        user = self.context['request'].user
-        if user.is_authenticated:
-            blocking = Block.objects.filter(
-                owner=user,
-                target=obj.owner
-            ).first()
-            return blocking.id if blocking else None
-        return None
+        return self.get_relationships(obj).blocking.get(obj.owner_id)
 
     def get_blocking_target(self, obj):
         """
@@ -91,21 +108,16 @@ class ProfileSerializer(serializers.ModelSerializer):
         - str or None: The username of the target being blocked or
           None if not blocking.
         """
-        user = self.context['request'].user
-        if user.is_authenticated:
-            blocking = Block.objects.filter(
-                owner=user,
-                target=obj.owner
-            ).first()
-            if blocking:
-                return blocking.target.id
+        if obj.owner_id in self.get_relationships(obj).blocking:
+            return obj.owner_id
         return None
 
     class Meta:
         model = Profile
         fields = [
             'id', 'owner', 'created_at', 'updated_at', 'name',
-            'content', 'image', 'is_owner', 'following_id',
+            'content', 'image', 'image_urls', 'is_owner', 'following_id',
             'blocking_id', 'blocking_target', 'is_blocking',
             'posts_count', 'followers_count', 'following_count',
         ]
+        list_serializer_class = ProfileListSerializer
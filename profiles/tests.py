@@ -0,0 +1,277 @@
+"""
+Test cases for the Profiles functionality in the Django REST application.
+
+The tests cover the profile list and the relationship fields that
+describe how the logged in user relates to each profile owner.
+"""
+import io
+import shutil
+import tempfile
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from blocks.models import Block
+from followers.models import Follower
+from likes.models import Like
+from posts.models import Post
+from drf_api.images import VARIANT_SIZES, variant_storage
+from PIL import Image
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+class ProfileRelationshipTests(APITestCase):
+    """
+    Tests for the following and blocking fields on the profile list.
+    """
+    def setUp(self):
+        """
+        Creates a logged in user who follows one user and blocks another.
+        """
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='albin', password='albinsson1'
+        )
+        self.followed = User.objects.create_user(
+            username='brian', password='briansson'
+        )
+        self.blocked = User.objects.create_user(
+            username='cecil', password='cecilsson'
+        )
+        self.follow = Follower.objects.create(
+            owner=self.user, followed=self.followed
+        )
+        self.block = Block.objects.create(
+            owner=self.user, target=self.blocked
+        )
+        self.client.login(username='albin', password='albinsson1')
+
+    def get_profiles(self):
+        """
+        Returns the profile list results keyed by owner username.
+        """
+        response = self.client.get('/profiles/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {
+            profile['owner']: profile for profile in response.data['results']
+        }
+
+    def test_list_includes_relationship_ids(self):
+        """
+        Ensure following ids match the user's relationships and that
+        blocked users are left out of the list.
+        """
+        profiles = self.get_profiles()
+        self.assertEqual(
+            profiles['brian']['following_id'], self.follow.id
+        )
+        self.assertFalse(profiles['brian']['is_blocking'])
+        self.assertIsNone(profiles['albin']['following_id'])
+        self.assertNotIn('cecil', profiles)
+
+    def test_detail_includes_blocking_ids(self):
+        """
+        Ensure a blocked user's profile shows the blocking relationship.
+        """
+        response = self.client.get(
+            f'/profiles/{self.blocked.profile.id}/'
+        )
+        self.assertEqual(response.data['blocking_id'], self.block.id)
+        self.assertEqual(response.data['blocking_target'], self.blocked.id)
+        self.assertTrue(response.data['is_blocking'])
+
+    def test_list_query_count_does_not_grow_with_page(self):
+        """
+        Ensure adding profiles to the page does not add queries.
+        """
+        # Load the cached blocked ids first
+        self.get_profiles()
+        with CaptureQueriesContext(connection) as small_page:
+            self.get_profiles()
+        for i in range(5):
+            User.objects.create_user(username=f'user{i}', password='pass')
+        with CaptureQueriesContext(connection) as full_page:
+            self.get_profiles()
+        self.assertEqual(len(full_page), len(small_page))
+
+
+class RelationshipStatusTests(APITestCase):
+    """
+    Tests for the bulk relationship status endpoint.
+    """
+    def setUp(self):
+        cache.clear()
+        self.viewer, self.followed, self.blocked = [
+            User.objects.create_user(username=name, password='pass')
+            for name in ('viewer', 'followed', 'blocked')
+        ]
+        self.follow = Follower.objects.create(
+            owner=self.viewer, followed=self.followed
+        )
+        self.block = Block.objects.create(
+            owner=self.viewer, target=self.blocked
+        )
+        self.post = Post.objects.create(owner=self.followed, title='Post')
+        self.other_post = Post.objects.create(
+            owner=self.followed, title='Other'
+        )
+        self.like = Like.objects.create(owner=self.viewer, post=self.post)
+        self.profile_ids = [
+            user.profile.id for user in (self.followed, self.blocked)
+        ]
+
+    def test_relationships_load_in_three_queries(self):
+        """
+        Ensure the follow, block and like ids of every requested id are
+        returned in one query per relationship type.
+        """
+        self.client.force_authenticate(self.viewer)
+        followed_id, blocked_id = self.profile_ids
+        url = (
+            f'/relationships/?profiles={followed_id},{blocked_id}'
+            f'&posts={self.post.id}&posts={self.other_post.id}'
+        )
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.data['profiles'], {
+            followed_id: {'following_id': self.follow.id, 'blocking_id': None},
+            blocked_id: {'following_id': None, 'blocking_id': self.block.id},
+        })
+        self.assertEqual(response.data['posts'], {
+            self.post.id: {'like_id': self.like.id},
+            self.other_post.id: {'like_id': None},
+        })
+
+    def test_anonymous_viewer_has_no_relationships(self):
+        """
+        Ensure an anonymous request gets empty relationships, unqueried.
+        """
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                f'/relationships/?profiles={self.profile_ids[0]}'
+                f'&posts={self.post.id}'
+            )
+        self.assertEqual(
+            response.data['posts'], {self.post.id: {'like_id': None}}
+        )
+
+    def test_invalid_and_too_many_ids_are_rejected(self):
+        """
+        Ensure malformed, out of range or oversized id lists return a 400.
+        """
+        self.client.force_authenticate(self.viewer)
+        for value in ('1,x', '99999999999999999999', '0', '-1'):
+            response = self.client.get(f'/relationships/?posts={value}')
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+        ids = ','.join(str(i) for i in range(1, 102))
+        response = self.client.get(f'/relationships/?profiles={ids}')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProfileCounterTests(APITestCase):
+    """
+    Tests for the denormalized follower and block counters on Profile.
+    """
+    def setUp(self):
+        cache.clear()
+        self.albin = User.objects.create_user(
+            username='albin', password='albinsson1'
+        )
+        self.brian = User.objects.create_user(
+            username='brian', password='briansson'
+        )
+
+    def test_follow_and_block_counters(self):
+        """
+        Ensure follows and blocks adjust both profiles' counters.
+        """
+        follow = Follower.objects.create(
+            owner=self.albin, followed=self.brian
+        )
+        Block.objects.create(owner=self.brian, target=self.albin)
+        self.albin.profile.refresh_from_db()
+        self.brian.profile.refresh_from_db()
+        self.assertEqual(self.albin.profile.following_count, 1)
+        self.assertEqual(self.brian.profile.followers_count, 1)
+        self.assertEqual(self.brian.profile.blocking_count, 1)
+        self.assertEqual(self.albin.profile.blocked_count, 1)
+
+        follow.delete()
+        self.brian.profile.refresh_from_db()
+        self.assertEqual(self.brian.profile.followers_count, 0)
+
+
+@override_settings(
+    DEFAULT_FILE_STORAGE='django.core.files.storage.FileSystemStorage',
+    IMAGE_VARIANT_STORAGE='django.core.files.storage.FileSystemStorage',
+    MEDIA_ROOT=MEDIA_ROOT,
+)
+class ProfileImageVariantTests(APITestCase):
+    """
+    Tests for the resized variants of uploaded profile images.
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='albin', password='albinsson1'
+        )
+        self.client.login(username='albin', password='albinsson1')
+
+    def tearDown(self):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, size, image_format='JPEG', color=(0, 128, 128)):
+        buffer = io.BytesIO()
+        Image.new(f'RGB{"A" * (len(color) - 3)}', size, color).save(
+            buffer, image_format
+        )
+        extension = image_format.lower()
+        return SimpleUploadedFile(f'avatar.{extension}', buffer.getvalue())
+
+    def test_upload_generates_variants(self):
+        """
+        Ensure every variant is written, fits its box and keeps the
+        aspect ratio.
+        """
+        response = self.client.put(
+            f'/profiles/{self.user.profile.id}/',
+            {'image': self.upload((3000, 2000))},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.profile.refresh_from_db()
+        variants = self.user.profile.image_variants
+        self.assertEqual(set(variants), set(VARIANT_SIZES))
+        self.assertEqual(
+            (variants['thumbnail']['width'], variants['thumbnail']['height']),
+            (320, 213)
+        )
+        self.assertEqual(variants['full']['width'], 2048)
+        storage = variant_storage()
+        for variant in variants.values():
+            name = variant['url'][len(settings.MEDIA_URL):]
+            self.assertTrue(storage.exists(name))
+
+    def test_transparent_images_keep_alpha(self):
+        """
+        Ensure a transparent PNG is converted without losing its alpha.
+        """
+        self.client.put(
+            f'/profiles/{self.user.profile.id}/',
+            {'image': self.upload((400, 400), 'PNG', (0, 128, 128, 100))},
+            format='multipart',
+        )
+        self.user.profile.refresh_from_db()
+        name = self.user.profile.image_variants['feed']['url'][
+            len(settings.MEDIA_URL):
+        ]
+        with variant_storage().open(name) as variant:
+            self.assertEqual(Image.open(variant).mode, 'RGBA')
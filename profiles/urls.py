@@ -1,7 +1,8 @@
 from django.urls import path
+from drf_api.asynchronous import serving_view
 from profiles import views
 
 urlpatterns = [
     path('profiles/', views.ProfileList.as_view()),
-    path('profiles/<int:pk>/', views.ProfileDetail.as_view())
+    path('profiles/<int:pk>/', serving_view(views.ProfileDetail.as_view()))
 ]
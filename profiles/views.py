@@ -7,33 +7,33 @@ profile instances. Profiles include information about the
 number of posts, followers, following, and blocking relationships.
 
 """
-from django.db.models import Count
 from rest_framework import generics, filters
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Profile
 from .serializers import ProfileSerializer
 from drf_api.permissions import IsOwnerOrReadOnly
+from drf_api.response_cache import AnonymousResponseCacheMixin
+from drf_api.instrumentation import RequestMetricsMixin
+from blocks.models import exclude_blocked
 
 
-class ProfileList(generics.ListAPIView):
+class ProfileList(RequestMetricsMixin, AnonymousResponseCacheMixin,
+                  generics.ListAPIView):
     """
     List all profiles.
     No create view as profile creation is handled by django signals.
-    Annotations:
+    Anonymous list responses are cached.
+    Counters (denormalized columns on Profile):
     - posts_count: Number of posts created by the profile owner.
     - followers_count: Number of users following the profile owner.
     - following_count: Number of users the profile owner is following.
     - blocked_count: Number of users who have blocked the profile owner.
     - blocking_count: Number of users the profile owner has blocked
     """
-    queryset = Profile.objects.annotate(
-        posts_count=Count('owner__post', distinct=True),
-        followers_count=Count('owner__followed', distinct=True),
-        following_count=Count('owner__following', distinct=True),
-        blocked_count=Count('owner__blocked_by', distinct=True),
-        blocking_count=Count('owner__blocking', distinct=True),
-    ).order_by('-created_at')
+    queryset = Profile.objects.select_related('owner').order_by('-created_at')
     serializer_class = ProfileSerializer
+    cache_namespaces = ('profiles',)
+    cache_timeout = 60
     filter_backends = [
         filters.OrderingFilter,
         DjangoFilterBackend,
@@ -56,11 +56,18 @@ class ProfileList(generics.ListAPIView):
         'owner__blocked__created_at',
     ]
 
+    def get_queryset(self):
+        """
+        Hide the profiles of users the logged in user blocks. They stay
+        reachable through ProfileDetail so they can be unblocked.
+        """
+        return exclude_blocked(self.queryset, self.request.user)
 
-class ProfileDetail(generics.RetrieveUpdateAPIView):
+
+class ProfileDetail(RequestMetricsMixin, generics.RetrieveUpdateAPIView):
     """
     Retrieve, update or delete a profile if you are the owner.
-    Annotations:
+    Counters (denormalized columns on Profile):
     - posts_count: Number of posts created by the profile owner.
     - followers_count: Number of users following the profile owner.
     - following_count: Number of users the profile owner is following.
@@ -68,11 +75,5 @@ class ProfileDetail(generics.RetrieveUpdateAPIView):
     - blocking_count: Number of users the profile owner has blocked.
     """
     permission_classes = [IsOwnerOrReadOnly]
-    queryset = Profile.objects.annotate(
-            posts_count=Count('owner__post', distinct=True),
-            followers_count=Count('owner__followed', distinct=True),
-            following_count=Count('owner__following', distinct=True),
-            blocked_count=Count('owner__blocked_by', distinct=True),
-            blocking_count=Count('owner__blocking', distinct=True)
-        ).order_by('-created_at')
+    queryset = Profile.objects.select_related('owner').order_by('-created_at')
     serializer_class = ProfileSerializer
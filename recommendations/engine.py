@@ -0,0 +1,189 @@
+"""
+Batch "who to follow" scoring.
+
+Users are scored in batches. Each batch loads every edge it needs with
+a fixed number of queries (follows two hops out, blocks both ways, the
+hashtags of the batch's posts with the other users posting them, and
+the batch's likes with the other users liking the same posts), grouped
+into in-memory sets. Each user's candidates are then scored with
+Counter updates over those sets:
+
+- mutual_follows: users the user follows who follow the candidate
+- shared_hashtags: hashtags both have posted with
+- co_likes: posts both have liked
+
+The weighted sum ranks the candidates, excluding the user, the users
+they follow and anyone blocking or blocked by them, and the top
+RECOMMENDATIONS_PER_USER are stored in the Recommendation table,
+replacing the batch's previous rows in one transaction.
+
+Hashtags on more than MAX_HASHTAG_POSTS posts and posts with more than
+MAX_POST_LIKES likes are left out: nearly everyone shares them, so they
+say little about a pair of users and would dominate the work.
+"""
+import heapq
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from blocks.models import Block
+from followers.models import Follower
+from likes.models import Like
+from posts.models import Post
+from .models import Recommendation
+
+WEIGHTS = {
+    'mutual_follows': 3.0,
+    'shared_hashtags': 1.0,
+    'co_likes': 0.5,
+}
+MAX_HASHTAG_POSTS = 1000
+MAX_POST_LIKES = 1000
+BATCH_SIZE = 500
+
+PostHashtag = Post.hashtags.through
+
+
+def group(rows):
+    """
+    Groups (key, value) rows into {key: set of values}.
+    """
+    groups = defaultdict(set)
+    for key, value in rows:
+        groups[key].add(value)
+    return groups
+
+
+def load_edges(user_ids):
+    """
+    Loads the edges needed to score the given users, one query each.
+    """
+    follows = Follower.objects.filter(owner__in=user_ids).order_by()
+    hashtags = PostHashtag.objects.filter(
+        post__owner__in=user_ids,
+        hashtag__posts_count__lte=MAX_HASHTAG_POSTS,
+    ).order_by()
+    likes = Like.objects.filter(
+        owner__in=user_ids, post__likes_count__lte=MAX_POST_LIKES
+    ).order_by()
+    blocking = Block.objects.filter(owner__in=user_ids).order_by()
+    blocked_by = Block.objects.filter(target__in=user_ids).order_by()
+    edges = {
+        'following': group(follows.values_list('owner', 'followed')),
+        'second_hop': group(
+            Follower.objects.filter(
+                owner__in=follows.values('followed')
+            ).order_by().values_list('owner', 'followed')
+        ),
+        'hashtags': group(
+            hashtags.values_list('post__owner', 'hashtag').distinct()
+        ),
+        'hashtag_users': group(
+            PostHashtag.objects.filter(
+                hashtag__in=hashtags.values('hashtag')
+            ).order_by().values_list('hashtag', 'post__owner').distinct()
+        ),
+        'likes': group(likes.values_list('owner', 'post')),
+        'post_likers': group(
+            Like.objects.filter(
+                post__in=likes.values('post')
+            ).order_by().values_list('post', 'owner')
+        ),
+        'blocks': group(blocking.values_list('owner', 'target')),
+    }
+    for user_id, owner_id in blocked_by.values_list('target', 'owner'):
+        edges['blocks'][user_id].add(owner_id)
+    return edges
+
+
+def count_overlaps(keys, members):
+    """
+    Counts, for every user, how many of the given keys list them.
+    """
+    counts = Counter()
+    for key in keys:
+        counts.update(members.get(key, ()))
+    return counts
+
+
+def score_user(user_id, edges, limit):
+    """
+    Returns the user's top limit candidates as (candidate id, score,
+    {signal: count}) tuples, best first.
+    """
+    following = edges['following'].get(user_id, set())
+    signals = {
+        'mutual_follows': count_overlaps(following, edges['second_hop']),
+        'shared_hashtags': count_overlaps(
+            edges['hashtags'].get(user_id, ()), edges['hashtag_users']
+        ),
+        'co_likes': count_overlaps(
+            edges['likes'].get(user_id, ()), edges['post_likers']
+        ),
+    }
+    candidates = set().union(*signals.values())
+    candidates -= following
+    candidates -= edges['blocks'].get(user_id, set())
+    candidates.discard(user_id)
+    scored = (
+        (
+            candidate,
+            sum(
+                WEIGHTS[name] * counts[candidate]
+                for name, counts in signals.items()
+            ),
+            {name: counts[candidate] for name, counts in signals.items()},
+        )
+        for candidate in candidates
+    )
+    return heapq.nsmallest(
+        limit, scored, key=lambda entry: (-entry[1], entry[0])
+    )
+
+
+def recommendations_limit():
+    return getattr(settings, 'RECOMMENDATIONS_PER_USER', 20)
+
+
+def compute_recommendations(user_ids, limit=None):
+    """
+    Scores a batch of users and replaces their stored recommendations.
+    Returns the number of rows stored.
+    """
+    limit = recommendations_limit() if limit is None else limit
+    user_ids = list(user_ids)
+    edges = load_edges(user_ids)
+    rows = [
+        Recommendation(
+            owner_id=user_id,
+            target_id=candidate,
+            rank=rank,
+            score=score,
+            mutual_follows_count=counts['mutual_follows'],
+            shared_hashtags_count=counts['shared_hashtags'],
+            co_likes_count=counts['co_likes'],
+        )
+        for user_id in user_ids
+        for rank, (candidate, score, counts) in enumerate(
+            score_user(user_id, edges, limit)
+        )
+    ]
+    with transaction.atomic():
+        Recommendation.objects.filter(owner__in=user_ids).delete()
+        Recommendation.objects.bulk_create(rows)
+    return len(rows)
+
+
+def refresh_recommendations(users=None, batch_size=BATCH_SIZE, limit=None):
+    """
+    Recomputes the recommendations of the given users (all users by
+    default), batch_size users at a time. Returns (users, rows stored).
+    """
+    users = User.objects.all() if users is None else users
+    user_ids = list(users.order_by('id').values_list('id', flat=True))
+    stored = 0
+    for start in range(0, len(user_ids), batch_size):
+        stored += compute_recommendations(
+            user_ids[start:start + batch_size], limit
+        )
+    return len(user_ids), stored
@@ -0,0 +1,33 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from recommendations.engine import BATCH_SIZE, refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored "who to follow" recommendations'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Only recompute the recommendations of these users'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Number of users scored together'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Recommendations kept per user '
+                 '(default: RECOMMENDATIONS_PER_USER)'
+        )
+
+    def handle(self, *args, **kwargs):
+        users = User.objects.all()
+        if kwargs['usernames']:
+            users = users.filter(username__in=kwargs['usernames'])
+        user_count, stored = refresh_recommendations(
+            users, batch_size=kwargs['batch_size'], limit=kwargs['limit']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {stored} recommendations for {user_count} users.'
+        ))
@@ -0,0 +1,40 @@
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class Recommendation(models.Model):
+    """
+    Precomputed "who to follow" entry: 'target' is recommended to
+    'owner' at position 'rank' (0 first). Rows are rewritten per user
+    by the compute_recommendations command (see engine.py), and
+    dropped when the owner follows or blocks the target, or either
+    blocks the other, so served lists never need filtering.
+    The counts record why the target was recommended.
+    """
+    owner = models.ForeignKey(
+        User, related_name='recommendations', on_delete=models.CASCADE
+    )
+    target = models.ForeignKey(
+        User, related_name='recommended_to', on_delete=models.CASCADE
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    # Users the owner follows who follow the target
+    mutual_follows_count = models.PositiveIntegerField(default=0)
+    # Hashtags both users have posted with
+    shared_hashtags_count = models.PositiveIntegerField(default=0)
+    # Posts both users have liked
+    co_likes_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['owner', 'rank']
+        unique_together = ['owner', 'target']
+        indexes = [
+            models.Index(
+                fields=['owner', 'rank'], name='recommendation_rank_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.owner} {self.target} ({self.rank})'
@@ -0,0 +1,35 @@
+"""
+Signal handlers keeping the stored recommendations servable between
+runs of compute_recommendations. Connected in
+RecommendationsConfig.ready().
+"""
+from django.db.models import Q
+from django.db.models.signals import post_save
+from blocks.models import Block
+from followers.models import Follower
+from .models import Recommendation
+
+
+def follower_created(sender, instance, created, **kwargs):
+    """
+    Drop the recommendation of a user who has just been followed.
+    """
+    if created:
+        Recommendation.objects.filter(
+            owner=instance.owner_id, target=instance.followed_id
+        ).delete()
+
+
+def block_created(sender, instance, created, **kwargs):
+    """
+    Drop the recommendations between the two users, both ways.
+    """
+    if created:
+        Recommendation.objects.filter(
+            Q(owner=instance.owner_id, target=instance.target_id)
+            | Q(owner=instance.target_id, target=instance.owner_id)
+        ).delete()
+
+
+post_save.connect(follower_created, sender=Follower)
+post_save.connect(block_created, sender=Block)
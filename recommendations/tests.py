@@ -0,0 +1,122 @@
+"""
+Test cases for the "who to follow" recommendations.
+"""
+from io import StringIO
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from blocks.models import Block
+from followers.models import Follower
+from hashtags.models import Hashtag
+from likes.models import Like
+from posts.models import Post
+from .engine import compute_recommendations
+from .models import Recommendation
+
+
+class RecommendationTests(APITestCase):
+    """
+    Tests for the batch scoring and the recommendations endpoint.
+    """
+    def setUp(self):
+        """
+        The viewer follows alice and bob, who both follow carol; alice
+        also follows dave and frank, who blocks the viewer. Erin posts
+        with the viewer's hashtag and likes the same post.
+        """
+        cache.clear()
+        self.users = {
+            name: User.objects.create_user(username=name, password='pass')
+            for name in (
+                'viewer', 'alice', 'bob', 'carol', 'dave', 'erin', 'frank'
+            )
+        }
+        users = self.users
+        for owner, followed in [
+            ('viewer', 'alice'), ('viewer', 'bob'), ('alice', 'carol'),
+            ('bob', 'carol'), ('alice', 'dave'), ('alice', 'frank'),
+            ('alice', 'bob'),
+        ]:
+            Follower.objects.create(
+                owner=users[owner], followed=users[followed]
+            )
+        Block.objects.create(owner=users['frank'], target=users['viewer'])
+        hashtag = Hashtag.objects.create(name='python')
+        for name in ('viewer', 'erin'):
+            post = Post.objects.create(owner=users[name], title=name)
+            post.hashtags.add(hashtag)
+        liked = Post.objects.create(owner=users['alice'], title='liked')
+        for name in ('viewer', 'erin'):
+            Like.objects.create(owner=users[name], post=liked)
+
+    def recommended(self):
+        response = self.client.get(reverse('recommendation-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [
+            (
+                profile['owner'], profile['score'],
+                profile['mutual_follows_count'],
+                profile['shared_hashtags_count'],
+                profile['co_likes_count'],
+            )
+            for profile in response.data['results']
+        ]
+
+    def test_scores_and_serves_top_candidates(self):
+        """
+        Ensure candidates are ranked by weighted overlap, excluding the
+        viewer, followed users and users blocking the viewer.
+        """
+        call_command('compute_recommendations', stdout=StringIO())
+        self.client.force_authenticate(self.users['viewer'])
+        self.assertEqual(self.recommended(), [
+            ('carol', 6.0, 2, 0, 0),
+            ('dave', 3.0, 1, 0, 0),
+            ('erin', 1.5, 0, 1, 1),
+        ])
+        response = self.client.get(
+            reverse('recommendation-list'), {'limit': 1}
+        )
+        self.assertEqual(response.data['count'], 1)
+
+    def test_follows_and_blocks_drop_stored_rows(self):
+        """
+        Ensure following or blocking, either way, removes the entry
+        without waiting for the next run.
+        """
+        compute_recommendations([self.users['viewer'].id])
+        Follower.objects.create(
+            owner=self.users['viewer'], followed=self.users['carol']
+        )
+        Block.objects.create(
+            owner=self.users['erin'], target=self.users['viewer']
+        )
+        self.client.force_authenticate(self.users['viewer'])
+        self.assertEqual(
+            [entry[0] for entry in self.recommended()], ['dave']
+        )
+
+    def test_batch_query_count_does_not_grow_with_users(self):
+        """
+        Ensure a batch takes the same number of queries for one user
+        as for every user.
+        """
+        with CaptureQueriesContext(connection) as one_user:
+            compute_recommendations([self.users['viewer'].id])
+        with CaptureQueriesContext(connection) as all_users:
+            compute_recommendations(
+                [user.id for user in self.users.values()]
+            )
+        self.assertEqual(len(one_user), len(all_users))
+        self.assertTrue(
+            Recommendation.objects.filter(owner=self.users['erin']).exists()
+        )
+
+    def test_recommendations_require_login(self):
+        response = self.client.get(reverse('recommendation-list'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
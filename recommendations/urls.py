@@ -0,0 +1,9 @@
+from django.urls import path
+from recommendations import views
+
+urlpatterns = [
+    path(
+        'profiles/recommendations/', views.RecommendationList.as_view(),
+        name='recommendation-list'
+    ),
+]
@@ -0,0 +1,46 @@
+from django.conf import settings
+from rest_framework import generics, permissions
+from rest_framework.response import Response
+from drf_api.instrumentation import RequestMetricsMixin
+from drf_api.pagination import get_limit
+from profiles.models import profiles_of_users
+from profiles.serializers import ProfileSerializer
+from .models import Recommendation
+
+DEFAULT_LIMIT = 10
+
+
+class RecommendationList(RequestMetricsMixin, generics.GenericAPIView):
+    """
+    The logged in user's "who to follow" list, read from the table
+    precomputed by the compute_recommendations command, best first.
+    Each profile comes with its 'score' and the counts behind it:
+    'mutual_follows_count', 'shared_hashtags_count' and
+    'co_likes_count'.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ProfileSerializer
+
+    def get(self, request, *args, **kwargs):
+        limit = get_limit(
+            request, DEFAULT_LIMIT, settings.RECOMMENDATIONS_PER_USER
+        )
+        recommendations = {
+            recommendation.target_id: recommendation
+            for recommendation in Recommendation.objects.filter(
+                owner=request.user
+            ).order_by('rank')[:limit]
+        }
+        profiles = profiles_of_users(list(recommendations))
+        results = self.get_serializer(profiles, many=True).data
+        for profile, data in zip(profiles, results):
+            recommendation = recommendations[profile.owner_id]
+            data['score'] = recommendation.score
+            data['mutual_follows_count'] = (
+                recommendation.mutual_follows_count
+            )
+            data['shared_hashtags_count'] = (
+                recommendation.shared_hashtags_count
+            )
+            data['co_likes_count'] = recommendation.co_likes_count
+        return Response({'count': len(results), 'results': results})
@@ -0,0 +1,16 @@
+from importlib import import_module
+from django.apps import AppConfig
+from django.conf import settings
+from django.utils.module_loading import autodiscover_modules
+
+
+class TaskqueueConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'taskqueue'
+
+    def ready(self):
+        # Register the @task functions defined in each app's tasks.py
+        # and in the modules listed in TASKS_MODULES
+        autodiscover_modules('tasks')
+        for module in getattr(settings, 'TASKS_MODULES', []):
+            import_module(module)
@@ -0,0 +1,41 @@
+"""
+Task queue backends, selected with the TASKS_BACKEND setting.
+
+- DatabaseBackend stores each task as a Task row. The row is written in
+  the caller's transaction, so a task queued by a request that rolls
+  back is never run, and the worker only sees committed tasks.
+- ImmediateBackend runs the task in the calling process straight away.
+  Used in development and tests, where no worker is running.
+
+An external broker can be plugged in by subclassing BaseBackend and
+pointing TASKS_BACKEND at the subclass; its consumer should call
+taskqueue.registry.get_task(name)(*args, **kwargs).
+"""
+from .models import Task
+from .registry import get_task
+
+
+class BaseBackend:
+    """
+    Interface of a task queue backend.
+    """
+    def enqueue(self, name, args, kwargs, max_attempts=3):
+        raise NotImplementedError
+
+
+class ImmediateBackend(BaseBackend):
+    """
+    Runs tasks synchronously when they are queued.
+    """
+    def enqueue(self, name, args, kwargs, max_attempts=3):
+        return get_task(name)(*args, **kwargs)
+
+
+class DatabaseBackend(BaseBackend):
+    """
+    Queues tasks as Task rows for the 'run_tasks' worker.
+    """
+    def enqueue(self, name, args, kwargs, max_attempts=3):
+        return Task.objects.create(
+            name=name, args=args, kwargs=kwargs, max_attempts=max_attempts
+        )
@@ -0,0 +1,49 @@
+import signal
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from taskqueue.worker import delete_finished_tasks, run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Run queued background tasks. Keeps polling for new tasks '
+        'unless --burst is given. SIGTERM stops it after the current '
+        'task.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Exit once the queue is empty'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=10,
+            help='Tasks claimed per poll'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Seconds to wait when the queue is empty'
+        )
+        parser.add_argument(
+            '--max-tasks', type=int, default=None,
+            help='Exit after running this many tasks'
+        )
+        parser.add_argument(
+            '--purge-days', type=int, default=None,
+            help='Delete finished tasks older than this many days first'
+        )
+
+    def handle(self, *args, **options):
+        if options['purge_days'] is not None:
+            deleted = delete_finished_tasks(
+                timedelta(days=options['purge_days'])
+            )
+            self.stdout.write(f'{deleted} finished tasks deleted.')
+        processed = run_worker(
+            batch_size=options['batch_size'],
+            sleep=options['sleep'],
+            burst=options['burst'],
+            max_tasks=options['max_tasks'],
+            stop_signals=(signal.SIGTERM, signal.SIGINT),
+        )
+        self.stdout.write(self.style.SUCCESS(f'{processed} tasks run.'))
@@ -0,0 +1,74 @@
+"""
+Registry of background task functions.
+
+Decorate a function in an app's tasks.py with @task to register it; the
+module is imported at startup by TaskqueueConfig.ready(). The decorated
+function can still be called directly, or queued with .delay():
+
+    @task
+    def fan_out_post(post_id):
+        ...
+
+    fan_out_post.delay(post.id)
+
+Arguments must be JSON-serializable (pass ids, not model instances).
+"""
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+REGISTRY = {}
+
+DEFAULT_BACKEND = 'taskqueue.backends.DatabaseBackend'
+
+
+class UnknownTask(Exception):
+    """
+    Raised when a task name is not registered.
+    """
+
+
+def task(func=None, *, name=None, max_attempts=3):
+    """
+    Registers func as a background task under name (by default its
+    module and function name) and adds a .delay() method that queues it.
+    """
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        REGISTRY[task_name] = func
+        func.task_name = task_name
+        func.max_attempts = max_attempts
+        func.delay = lambda *args, **kwargs: enqueue(
+            task_name, *args, **kwargs
+        )
+        return func
+
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    """
+    Returns the registered function for name.
+    """
+    try:
+        return REGISTRY[name]
+    except KeyError:
+        raise UnknownTask(f'No task is registered as {name!r}.')
+
+
+def get_backend():
+    """
+    Returns an instance of the backend configured in TASKS_BACKEND.
+    """
+    path = getattr(settings, 'TASKS_BACKEND', DEFAULT_BACKEND)
+    return import_string(path)()
+
+
+def enqueue(name, *args, **kwargs):
+    """
+    Queues the registered task with the given arguments on the
+    configured backend.
+    """
+    func = get_task(name)
+    return get_backend().enqueue(
+        name, list(args), kwargs, max_attempts=func.max_attempts
+    )
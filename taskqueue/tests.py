@@ -0,0 +1,208 @@
+"""
+Tests for the background task queue: registration, the database and
+immediate backends, and the worker.
+"""
+import os
+import signal
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from feeds.models import FeedEntry
+from followers.models import Follower
+from posts.models import Post
+from .models import Task
+from .registry import REGISTRY, UnknownTask, enqueue, task
+from .worker import release_stale_tasks, run_task, run_worker
+
+DATABASE_BACKEND = 'taskqueue.backends.DatabaseBackend'
+calls = []
+
+
+@task(name='tests.record')
+def record(value, repeat=1):
+    calls.extend([value] * repeat)
+
+
+@task(name='tests.explode', max_attempts=2)
+def explode():
+    raise ValueError('boom')
+
+
+@task(name='tests.terminate')
+def terminate():
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+@task(name='tests.outlive_batch')
+def outlive_batch():
+    # Another worker finds the rest of the batch past the timeout
+    Task.objects.filter(status=Task.RUNNING).exclude(
+        name='tests.outlive_batch'
+    ).update(started_at=timezone.now() - timedelta(hours=1))
+    release_stale_tasks()
+
+
+class TaskRegistryTests(TestCase):
+    """
+    Tests for registering and queueing tasks.
+    """
+    def setUp(self):
+        calls.clear()
+
+    def test_app_tasks_are_discovered(self):
+        """
+        Ensure the tasks of the apps and TASKS_MODULES are registered.
+        """
+        self.assertIn('feeds.tasks.fan_out_post', REGISTRY)
+        self.assertIn('images.generate_variants', REGISTRY)
+
+    def test_immediate_backend_runs_inline(self):
+        """
+        Ensure the development backend runs the task straight away.
+        """
+        record.delay('a', repeat=2)
+        self.assertEqual(calls, ['a', 'a'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_unknown_task(self):
+        """
+        Ensure queueing an unregistered name fails loudly.
+        """
+        with self.assertRaises(UnknownTask):
+            enqueue('tests.missing')
+
+
+@override_settings(TASKS_BACKEND=DATABASE_BACKEND)
+class DatabaseBackendTests(TestCase):
+    """
+    Tests for queueing tasks in the database and running them.
+    """
+    def setUp(self):
+        calls.clear()
+
+    def test_worker_runs_queued_tasks_in_order(self):
+        """
+        Ensure tasks wait for the worker and then run once each.
+        """
+        record.delay('first')
+        record.delay('second', repeat=2)
+        self.assertEqual(calls, [])
+        self.assertEqual(run_worker(burst=True), 2)
+        self.assertEqual(calls, ['first', 'second', 'second'])
+        self.assertEqual(
+            set(Task.objects.values_list('status', flat=True)), {Task.DONE}
+        )
+        self.assertEqual(run_worker(burst=True), 0)
+
+    def test_future_tasks_wait(self):
+        """
+        Ensure a task is not run before its run_after time.
+        """
+        queued = record.delay('later')
+        Task.objects.filter(pk=queued.pk).update(
+            run_after=timezone.now() + timedelta(minutes=5)
+        )
+        self.assertEqual(run_worker(burst=True), 0)
+
+    def test_failures_are_retried_then_failed(self):
+        """
+        Ensure a failing task is requeued with backoff, then marked
+        failed when it runs out of attempts.
+        """
+        queued = explode.delay()
+        run_worker(burst=True)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.QUEUED)
+        self.assertGreater(queued.run_after, timezone.now())
+        self.assertIn('ValueError: boom', queued.last_error)
+
+        queued.status = Task.RUNNING
+        queued.attempts += 1
+        run_task(queued)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertIsNotNone(queued.finished_at)
+
+    def test_feed_fan_out_is_deferred(self):
+        """
+        Ensure a new post reaches followers' feeds once the worker runs.
+        """
+        author = User.objects.create_user(username='albin', password='x')
+        reader = User.objects.create_user(username='brian', password='x')
+        Follower.objects.create(owner=reader, followed=author)
+        run_worker(burst=True)
+        post = Post.objects.create(owner=author, title='deferred')
+        self.assertFalse(FeedEntry.objects.filter(post=post).exists())
+        run_worker(burst=True)
+        self.assertTrue(
+            FeedEntry.objects.filter(owner=reader, post=post).exists()
+        )
+
+    def test_run_tasks_command(self):
+        """
+        Ensure the worker command runs the queue in burst mode.
+        """
+        record.delay('command')
+        out = StringIO()
+        call_command('run_tasks', burst=True, stdout=out)
+        self.assertIn('1 tasks run', out.getvalue())
+        self.assertEqual(calls, ['command'])
+
+    @override_settings(TASK_VISIBILITY_TIMEOUT=60)
+    def test_stale_running_tasks_are_claimed_again(self):
+        """
+        Ensure tasks left running by a dead worker run again once the
+        visibility timeout has passed, or fail if out of attempts.
+        """
+        stale = record.delay('stale')
+        recent = record.delay('recent')
+        exhausted = record.delay('exhausted')
+        now = timezone.now()
+        Task.objects.filter(pk__in=[stale.pk, exhausted.pk]).update(
+            status=Task.RUNNING, attempts=1,
+            started_at=now - timedelta(minutes=5)
+        )
+        Task.objects.filter(pk=exhausted.pk).update(attempts=3)
+        Task.objects.filter(pk=recent.pk).update(
+            status=Task.RUNNING, attempts=1, started_at=now
+        )
+        self.assertEqual(run_worker(burst=True), 1)
+        self.assertEqual(calls, ['stale'])
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.attempts), (Task.DONE, 2))
+        recent.refresh_from_db()
+        self.assertEqual(recent.status, Task.RUNNING)
+        exhausted.refresh_from_db()
+        self.assertEqual(exhausted.status, Task.FAILED)
+
+    def test_sigterm_stops_after_current_task(self):
+        """
+        Ensure SIGTERM lets the current task finish and returns the rest
+        of the claimed batch to the queue.
+        """
+        terminate.delay()
+        queued = record.delay('after')
+        previous = signal.getsignal(signal.SIGTERM)
+        processed = run_worker(burst=True, stop_signals=(signal.SIGTERM,))
+        self.assertEqual(processed, 1)
+        self.assertEqual(calls, [])
+        self.assertIs(signal.getsignal(signal.SIGTERM), previous)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Task.QUEUED, 0))
+        self.assertEqual(run_worker(burst=True), 1)
+        self.assertEqual(calls, ['after'])
+
+    def test_tasks_released_while_waiting_in_batch_run_once(self):
+        """
+        Ensure a task queued again while it waited behind a slow task
+        of its batch is not also run by the worker that claimed it.
+        """
+        outlive_batch.delay()
+        queued = record.delay('after')
+        self.assertEqual(run_worker(burst=True), 2)
+        self.assertEqual(calls, ['after'])
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Task.DONE, 2))
@@ -0,0 +1,197 @@
+"""
+Worker loop for the DatabaseBackend.
+
+Due tasks are claimed in small batches with SELECT ... FOR UPDATE SKIP
+LOCKED, so several workers can poll the same table without running a
+task twice (SQLite, which has no row locks, runs a single worker).
+Failed tasks are retried with exponential backoff until they run out
+of attempts.
+
+A task left RUNNING for longer than TASK_VISIBILITY_TIMEOUT seconds is
+assumed to belong to a worker that died, and is queued again (or failed
+if it has no attempts left). Each task of a batch is timed from when it
+starts, and skipped if it was queued again while it waited behind the
+slower tasks of its batch. A worker asked to stop with SIGTERM, as
+Heroku does when restarting dynos, finishes its current task and puts
+the rest of its claimed batch back in the queue.
+"""
+import logging
+import signal
+import time
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Task
+from .registry import get_task
+
+logger = logging.getLogger(__name__)
+
+
+def visibility_timeout():
+    return timedelta(
+        seconds=getattr(settings, 'TASK_VISIBILITY_TIMEOUT', 15 * 60)
+    )
+
+
+def release_stale_tasks():
+    """
+    Queues again the tasks left running for longer than the visibility
+    timeout, or fails them if they are out of attempts.
+    Returns the number of tasks queued again.
+    """
+    now = timezone.now()
+    stale = Task.objects.filter(
+        status=Task.RUNNING, started_at__lt=now - visibility_timeout()
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, finished_at=now,
+        last_error='Worker stopped while running the task',
+    )
+    if failed:
+        logger.error('%s stale tasks out of attempts failed', failed)
+    return stale.update(status=Task.QUEUED, run_after=now)
+
+
+def release_tasks(tasks):
+    """
+    Puts claimed tasks that were not started back in the queue.
+    """
+    Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+        status=Task.QUEUED, attempts=F('attempts') - 1, started_at=None
+    )
+
+
+def claim_tasks(batch_size=10):
+    """
+    Marks up to batch_size due tasks as running and returns them.
+    """
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True).filter(
+                status=Task.QUEUED, run_after__lte=timezone.now()
+            ).order_by('run_after', 'id')[:batch_size]
+        )
+        now = timezone.now()
+        for task in tasks:
+            task.status = Task.RUNNING
+            task.attempts += 1
+            task.started_at = now
+        Task.objects.bulk_update(
+            tasks, ['status', 'attempts', 'started_at']
+        )
+    return tasks
+
+
+def start_task(task):
+    """
+    Marks a claimed task as started now. Returns False if it is no
+    longer this worker's to run: it waited longer than the visibility
+    timeout behind its batch and was queued again, or run elsewhere.
+    """
+    now = timezone.now()
+    started = Task.objects.filter(
+        pk=task.pk, status=Task.RUNNING, attempts=task.attempts
+    ).update(started_at=now)
+    task.started_at = now
+    return bool(started)
+
+
+def retry_delay(attempts):
+    """
+    Seconds to wait before the next attempt: 2, 4, 8, ...
+    """
+    return timedelta(seconds=2 ** attempts)
+
+
+def run_task(task):
+    """
+    Runs a claimed task and records its outcome.
+    Returns True if the task succeeded.
+    """
+    try:
+        with transaction.atomic():
+            get_task(task.name)(*task.args, **task.kwargs)
+    except Exception:
+        task.last_error = traceback.format_exc()
+        if task.attempts < task.max_attempts:
+            task.status = Task.QUEUED
+            task.run_after = timezone.now() + retry_delay(task.attempts)
+        else:
+            task.status = Task.FAILED
+            task.finished_at = timezone.now()
+            logger.exception('Task %s (%s) failed', task.id, task.name)
+        task.save(update_fields=[
+            'status', 'run_after', 'finished_at', 'last_error'
+        ])
+        return False
+    task.status = Task.DONE
+    task.finished_at = timezone.now()
+    task.save(update_fields=['status', 'finished_at'])
+    return True
+
+
+class StopRequest:
+    """
+    Signal handler recording that the worker was asked to stop.
+    """
+    def __init__(self):
+        self.requested = False
+
+    def __call__(self, signum, frame):
+        logger.info('Signal %s received, stopping after this task', signum)
+        self.requested = True
+
+
+def run_worker(batch_size=10, sleep=1.0, burst=False, max_tasks=None,
+               stop_signals=()):
+    """
+    Claims and runs tasks until stopped, or until the queue is empty
+    when burst is True, or after max_tasks tasks. Receiving one of
+    stop_signals stops the worker once the current task is done.
+    Returns the number of tasks run.
+    """
+    stop = StopRequest()
+    previous_handlers = {
+        signum: signal.signal(signum, stop) for signum in stop_signals
+    }
+    processed = 0
+    try:
+        while not stop.requested and (
+            max_tasks is None or processed < max_tasks
+        ):
+            close_old_connections()
+            release_stale_tasks()
+            limit = batch_size
+            if max_tasks is not None:
+                limit = min(batch_size, max_tasks - processed)
+            tasks = claim_tasks(limit)
+            if not tasks:
+                if burst:
+                    break
+                time.sleep(sleep)
+                continue
+            for index, task in enumerate(tasks):
+                if stop.requested:
+                    release_tasks(tasks[index:])
+                    break
+                if not start_task(task):
+                    continue
+                run_task(task)
+                processed += 1
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+    return processed
+
+
+def delete_finished_tasks(older_than=timedelta(days=7)):
+    """
+    Deletes finished tasks older than the given age.
+    """
+    deleted, _ = Task.objects.filter(
+        status=Task.DONE, finished_at__lt=timezone.now() - older_than
+    ).delete()
+    return deleted
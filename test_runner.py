@@ -29,7 +29,10 @@ if __name__ == '__main__':
 
      # Run the tests in the specified modules
     failures = test_runner.run_tests(
-        ['comments.tests', 'hashtags.tests', 'posts.tests']
+        ['comments.tests', 'hashtags.tests', 'posts.tests',
+         'benchmarks.tests', 'taskqueue.tests', 'profiles.tests',
+         'feeds.tests', 'blocks.tests', 'followers.tests',
+         'recommendations.tests']
     )
 
     # Exit the script with a status code based on the test results